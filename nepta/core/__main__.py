@@ -1,7 +1,6 @@
 #!/usr/bin/python3
 # coding=utf8
 import sys
-import importlib
 import os
 import argparse
 import logging
@@ -13,7 +12,16 @@ from typing import Type
 
 from nepta.core import strategies, synchronization, model
 from nepta.core.strategies.generic import CompoundStrategy
+from nepta.core.model.snapshot import ConfigurationSnapshot, import_modules
+from nepta.core.model.selector import ComponentSelector, PathSelector
+from nepta.core.model.bundles import TreeWriter
 from nepta.core.distribution.env import Environment, Hardware
+from nepta.core.distribution.command import SSHConnectionPool
+from nepta.core.distribution.probe import ProbeCache
+from nepta.core.distribution.rusage import ResourceAccounting
+from nepta.core.distribution.trace import Tracer
+from nepta.core.distribution.timeseries import TimeSeries
+from nepta.core.distribution.cassette import Cassette
 
 from nepta.dataformat import Section, DataPackage
 
@@ -88,34 +96,10 @@ def init_root_store():
     return Section("host", store_params)
 
 
-def filter_conf(conf, exclude_components):
-    modules_of_models = [getattr(model, x) for x in dir(model) if not x.startswith("__")]
-
-    for class_name in exclude_components:
-        for x in modules_of_models:
-            if hasattr(x, class_name):
-                obj = getattr(x, class_name)
-                conf.filter_components(lambda x: type(x) != obj)
-                break
-        else:  # if no break
-            logger.info("Object <\"%s\"> does not exist in models" % class_name)
-
-
-def delete_subtree(conf, deleting_subtrees):
-    for full_sub_tree_path in deleting_subtrees:
-        current_node = conf
-        tree_path = full_sub_tree_path.split(".")
-        for subtree in tree_path[1:-1]:  # ignoring the first and the last node name,
-            # the last name is used after for cycle
-            if current_node.has_node(subtree):
-                current_node = getattr(current_node, subtree)
-            else:  # if there is a wrong name of subtree, end searching
-                logger.info("%s sub tree was NOT found", full_sub_tree_path)
-                break
-        else:  # no break
-            if current_node.has_node(tree_path[-1]):
-                logger.info("Deleting: %s", full_sub_tree_path)
-                delattr(current_node, tree_path[-1])
+def subtree_selector(full_sub_tree_path: str) -> PathSelector:
+    # the first name of the path denotes the configuration itself, so it is ignored
+    tree_path = full_sub_tree_path.split(".", 1)
+    return PathSelector(tree_path[-1])
 
 
 def create_desynchronize_strategy(strategy: CompoundStrategy, package: DataPackage) -> CompoundStrategy:
@@ -239,19 +223,47 @@ def main():
         "-f",
         "--filter",
         action="append",
-        metavar="FILTERED_CLASS",
-        help="Filter current configuration of these model object types.",
+        default=[],
+        type=ComponentSelector,
+        metavar="SELECTOR",
+        help="Filter model objects matching selector [PATH:]TYPE[PREDICATE,...] out of current configuration, e.g. "
+        "'Package', 'intf.**:Interface+[mtu=9000]' or 'IPsecTunnel[cipher~=^aes]'. TYPE is glob of class name, "
+        "trailing + matches also subclasses.",
     )
     parser.add_argument(
         "-d",
         "--delete-tree",
         action="append",
+        default=[],
+        type=subtree_selector,
         metavar="SUBTREE_PATH",
-        help="Specify which sub-tree of configuration tree will be deleted.",
+        help="Specify which sub-tree of configuration tree will be deleted. Path names are globs, ** matches any "
+        "number of names, e.g. 'conf.intf.eth*' or 'conf.**.ipsec'. The first name denotes the configuration.",
     )
     parser.add_argument(
         "-p", "--print", action="store_true", help="Print current configuration in tree format and exit."
     )
+    parser.add_argument(
+        "--print-depth",
+        action="store",
+        type=int,
+        metavar="DEPTH",
+        help="Print only nodes of configuration tree up to this depth.",
+    )
+    parser.add_argument(
+        "--print-type",
+        action="append",
+        default=[],
+        type=ComponentSelector,
+        metavar="SELECTOR",
+        help="Print only model objects matching selector (see --filter) and nodes leading to them.",
+    )
+    parser.add_argument(
+        "--print-format",
+        choices=["tree", "json"],
+        default="tree",
+        help="Format of printed configuration, json prints one JSON object per line [Default: %(default)s].",
+    )
     parser.add_argument(
         "-i",
         "--import",
@@ -261,12 +273,64 @@ def main():
         metavar=("MODULE_NAME", "PATH"),
         help="Dynamically import python modules with optional path.",
     )
+    parser.add_argument(
+        "--conf-snapshot",
+        action="store",
+        metavar="DIR",
+        help="Cache configuration built by imported modules in this directory and reuse it while the modules "
+        "and the host environment are not changed.",
+    )
     parser.add_argument(
         "-t",
         "--tag",
         action="append",
         help="Filter testing paths by specifying HW or SW tag. Only paths with specified tag will be tested.",
     )
+    parser.add_argument(
+        "--no-ssh-multiplexing",
+        action="store_true",
+        help="Open a new SSH connection for each remote command instead of sharing one connection per host.",
+    )
+    parser.add_argument(
+        "--probe-cache",
+        action="store",
+        metavar="FILE",
+        help="Store outputs of system probes (uname, rpm, lscpu, ...) in this file and reuse them in following "
+        "phases until the machine is rebooted.",
+    )
+    parser.add_argument(
+        "--resource-usage",
+        action="store_true",
+        help="Store CPU time, memory and context switches of executed commands (iperf3, mpstat, ssh, ...) into "
+        "results of each scenario.",
+    )
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help="Store trace of executed commands, strategies and scenarios into package (Chrome trace JSON, can be "
+        "opened in Perfetto UI).",
+    )
+    parser.add_argument(
+        "--time-series",
+        nargs="?",
+        const="compressed",
+        choices=["compressed", "uncompressed"],
+        help="Store per-interval data of each run (iperf3 intervals, mpstat samples, interrupts) into package as NumPy "
+        "archives. Uncompressed archives can be memory-mapped by readers.",
+    )
+    cassette_group = parser.add_mutually_exclusive_group()
+    cassette_group.add_argument(
+        "--record-commands",
+        action="store",
+        metavar="FILE",
+        help="Record outputs of all executed commands and reads of /proc and /sys into cassette file.",
+    )
+    cassette_group.add_argument(
+        "--replay-commands",
+        action="store",
+        metavar="FILE",
+        help="Do not execute any command or read /proc and /sys, replay outputs recorded by --record-commands instead.",
+    )
     parser.add_argument(
         "--pcp",
         action="store_true",
@@ -296,20 +360,26 @@ def main():
 
     # setting log level
     std_handler.setLevel(args.log)
+    SSHConnectionPool.enabled = not args.no_ssh_multiplexing
+    if args.probe_cache:
+        ProbeCache.persist(args.probe_cache)
+    ResourceAccounting.enabled = args.resource_usage
+    Tracer.enabled = args.trace
+    TimeSeries.enabled = args.time_series is not None
+    TimeSeries.compress = args.time_series != "uncompressed"
+    if args.record_commands:
+        Cassette.open(args.record_commands, Cassette.RECORD)
+    if args.replay_commands:
+        Cassette.open(args.replay_commands, Cassette.REPLAY)
+        # remote hosts are not contacted during replay
+        SSHConnectionPool.enabled = False
 
     # import modules defined on CLI
     if args.imp:
-        for arg in args.imp:
-            module = arg[0]
-            if len(arg) == 1:
-                logger.info(f'Importing {module}')
-                importlib.import_module(module)
-            else:
-                path = arg[1]
-                sys.path.insert(0, path)
-                logger.info(f'Importing {module} from {path}')
-                importlib.import_module(module)
-                sys.path.pop(0)
+        if args.conf_snapshot:
+            ConfigurationSnapshot(args.conf_snapshot, args.imp).import_configuration()
+        else:
+            import_modules(args.imp)
 
     # overriding environments
     if args.environment:
@@ -322,17 +392,17 @@ def main():
     package = init_package(args.configuration, timestamp)
     final_strategy = CompoundStrategy()
 
-    if args.filter:
-        filter_conf(conf, args.filter)
-
-    if args.delete_tree:
-        delete_subtree(conf, args.delete_tree)
-
+    # all filters are applied in a single traversal of configuration tree
+    filtered_components = list(args.filter)
     if not (args.pcp or args.remote_pcp):
-        conf.filter_components(lambda x: type(x) != model.system.PCPConfiguration)
+        filtered_components.append(ComponentSelector("PCPConfiguration"))
+    conf.prune(filtered_components, args.delete_tree)
+    for selector in args.filter + args.delete_tree:
+        if not selector.hits:
+            logger.info("%s does not match anything in configuration", selector)
 
     if args.print:
-        print(conf.str_tree())
+        TreeWriter(args.print_depth, args.print_type).write(conf, sys.stdout, json_lines=args.print_format == "json")
         return
 
     extra_meta = {
@@ -377,6 +447,9 @@ def main():
     if args.store_logs:
         final_strategy += strategies.save.attachments.SaveAttachments(conf, package)
 
+    if args.trace:
+        final_strategy += strategies.save.save_package.SaveTrace(package)
+
     # store dataformat package
     final_strategy += strategies.save.save_package.Save(package)
 
@@ -406,6 +479,9 @@ def main():
         desync = create_desynchronize_strategy(final_strategy, package)
         desync()
         raise e
+    finally:
+        SSHConnectionPool.close_all()
+        Cassette.close()
 
     result = True
     for strategy in final_strategy.strategies:
@@ -0,0 +1,94 @@
+import tempfile
+from typing import Union
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+class OutputCapture(object):
+    """
+    Storage of raw command output. The output is stored as bytes and it is decoded only once, when it is requested.
+    """
+
+    def write(self, data: Buffer):
+        raise NotImplementedError
+
+    def getvalue(self) -> bytes:
+        raise NotImplementedError
+
+    def decode(self) -> str:
+        return self.getvalue().decode(errors="replace")
+
+    def close(self):
+        pass
+
+
+class BufferCapture(OutputCapture):
+    """
+    Whole output in a growing bytearray, appending is amortized O(1).
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def write(self, data: Buffer):
+        self._buffer += data
+
+    def getvalue(self) -> bytes:
+        return bytes(self._buffer)
+
+    def __len__(self):
+        return len(self._buffer)
+
+
+class RingBufferCapture(OutputCapture):
+    """
+    Only the last `size` bytes of output are kept in preallocated buffer, so memory does not grow with the output.
+    """
+
+    def __init__(self, size: int = 64 * 1024):
+        self.size = size
+        self._buffer = bytearray(size)
+        self._end = 0  # position where next byte is written
+        self.total = 0  # number of all written bytes
+
+    def write(self, data: Buffer):
+        self.total += len(data)
+        data = memoryview(data)[-self.size :]
+        first = min(len(data), self.size - self._end)
+        self._buffer[self._end : self._end + first] = data[:first]
+        self._buffer[: len(data) - first] = data[first:]
+        self._end = (self._end + len(data)) % self.size
+
+    @property
+    def truncated(self) -> int:
+        """
+        :return: number of bytes which were dropped from the beginning of output
+        """
+        return max(0, self.total - self.size)
+
+    def getvalue(self) -> bytes:
+        if self.total < self.size:
+            return bytes(self._buffer[: self._end])
+        return bytes(self._buffer[self._end :] + self._buffer[: self._end])
+
+
+class SpooledCapture(OutputCapture):
+    """
+    Output is kept in memory until it exceeds `max_size` bytes, then it is spilled into a temporary file.
+    """
+
+    def __init__(self, max_size: int = 16 * 1024 * 1024):
+        self._file = tempfile.SpooledTemporaryFile(max_size=max_size)
+
+    def write(self, data: Buffer):
+        self._file.write(data)
+
+    def getvalue(self) -> bytes:
+        position = self._file.tell()
+        self._file.seek(0)
+        value = self._file.read()
+        self._file.seek(position)
+        return value
+
+    def close(self):
+        self._file.close()
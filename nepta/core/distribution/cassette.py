@@ -0,0 +1,215 @@
+"""
+Record and replay of command executions. In record mode outputs and return codes of all executed commands are stored
+into a cassette file. In replay mode commands are not executed at all, they get recorded outputs instead, so the
+whole framework (scheduling, parsing, building of result sections) can run without testing hardware.
+
+Commands are identified by their command line and host. Repeated executions of the same command are replayed in the
+order they were recorded, the last recording is reused when they are exhausted. Commands which could not be started
+(e.g. missing program) are replayed by raising the same `OSError`.
+
+Direct reads of the local system state, which replace probing commands (/proc, /sys, uname), are recorded in the same
+way by `Cassette.read`, keyed by their source.
+"""
+
+import io
+import json
+import signal
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CassetteKey = Tuple[Optional[str], str]
+
+
+class CassetteMiss(LookupError):
+    pass
+
+
+class ReplayProcess(object):
+    """
+    Popen-like process which outputs recorded output. Process which was running when the recording ended stays
+    running until it is terminated.
+    """
+
+    pid = None
+
+    def __init__(self, output: bytes, returncode: Optional[int]):
+        self.stdout = io.BytesIO(output)
+        self.returncode = returncode
+
+    def poll(self) -> Optional[int]:
+        return self.returncode
+
+    def wait(self) -> int:
+        if self.returncode is None:
+            logger.warning("Replayed process did not finish during recording, considering it terminated")
+            self.terminate()
+        return self.returncode
+
+    def terminate(self):
+        if self.returncode is None:
+            self.returncode = -signal.SIGTERM
+
+    def kill(self):
+        if self.returncode is None:
+            self.returncode = -signal.SIGKILL
+
+
+class AsyncReplayProcess(ReplayProcess):
+    """
+    Replayed process with interface of `asyncio.subprocess.Process`.
+    """
+
+    def __init__(self, output: bytes, returncode: Optional[int]):
+        super().__init__(b"", returncode)
+        self.stdout = asyncio.StreamReader()
+        self.stdout.feed_data(output)
+        self.stdout.feed_eof()
+
+    async def wait(self) -> int:
+        return ReplayProcess.wait(self)
+
+
+class Cassette(object):
+    """
+    Run-wide storage of recorded commands. Mode is None (commands are executed), RECORD or REPLAY.
+
+    Usage:
+        -> Cassette.open('commands.json', Cassette.RECORD)
+        -> ... run commands ...
+        -> Cassette.save()
+    """
+
+    RECORD = "record"
+    REPLAY = "replay"
+
+    mode: Optional[str] = None
+    path: Optional[str] = None
+    _records: List[dict] = []
+    _reads: List[dict] = []
+    _replay: Dict[CassetteKey, List[dict]] = {}
+    _replay_reads: Dict[str, List[dict]] = {}
+
+    @classmethod
+    def open(cls, path: str, mode: str):
+        cls.path = path
+        cls.mode = mode
+        cls._records = []
+        cls._reads = []
+        cls._replay = {}
+        cls._replay_reads = {}
+        if mode == cls.REPLAY:
+            with open(path) as f:
+                content = json.load(f)
+            for record in content["commands"]:
+                cls._replay.setdefault((record["host"], record["cmdline"]), []).append(record)
+            for record in content.get("reads", []):
+                cls._replay_reads.setdefault(record["source"], []).append(record)
+            logger.info(f'Replaying commands from {path}')
+        else:
+            logger.info(f'Recording commands into {path}')
+
+    @classmethod
+    def close(cls):
+        if cls.mode == cls.RECORD:
+            cls.save()
+        cls.mode = None
+        cls.path = None
+
+    @staticmethod
+    def _key(host, cmdline: str) -> CassetteKey:
+        return None if host is None else str(host), cmdline
+
+    @classmethod
+    def start(cls, host, cmdline: str) -> dict:
+        """
+        Start recording of the command.
+        :return: record, which is completed by `finish`
+        """
+        host, cmdline = cls._key(host, cmdline)
+        record = {"host": host, "cmdline": cmdline, "output": "", "returncode": None}
+        cls._records.append(record)
+        return record
+
+    @classmethod
+    def fail(cls, host, cmdline: str, error: OSError):
+        """
+        Record the command which could not be started.
+        """
+        cls.start(host, cmdline)["error"] = cls._error_record(error)
+
+    @staticmethod
+    def _error_record(error: OSError) -> dict:
+        return {"errno": error.errno, "strerror": error.strerror, "filename": error.filename}
+
+    @staticmethod
+    def _error(record: dict) -> OSError:
+        # OSError constructor returns the subclass matching errno, e.g. FileNotFoundError
+        return OSError(record["errno"], record["strerror"], record["filename"])
+
+    @staticmethod
+    def finish(record: dict, returncode: Optional[int], output: Optional[bytes] = None):
+        """
+        :param output: output of the command, None keeps the previous one (e.g. when output was not read)
+        """
+        record["returncode"] = returncode
+        if output is not None:
+            # surrogates keep arbitrary bytes in JSON string
+            record["output"] = output.decode("utf-8", "surrogateescape")
+
+    @classmethod
+    def _next(cls, host, cmdline: str) -> dict:
+        key = cls._key(host, cmdline)
+        records = cls._replay.get(key)
+        if not records:
+            raise CassetteMiss(f'Command "{cmdline}" on host {key[0]} is not recorded in {cls.path}')
+        record = records.pop(0) if len(records) > 1 else records[0]
+        if record.get("error") is not None:
+            raise cls._error(record["error"])
+        return record
+
+    @classmethod
+    def replay(cls, host, cmdline: str) -> ReplayProcess:
+        record = cls._next(host, cmdline)
+        return ReplayProcess(record["output"].encode("utf-8", "surrogateescape"), record["returncode"])
+
+    @classmethod
+    def replay_async(cls, host, cmdline: str) -> AsyncReplayProcess:
+        record = cls._next(host, cmdline)
+        return AsyncReplayProcess(record["output"].encode("utf-8", "surrogateescape"), record["returncode"])
+
+    @classmethod
+    def read(cls, source: str, reader: Callable[[], Any]) -> Any:
+        """
+        Record or replay direct read of the local system state.
+        :param source: identification of the read, e.g. path of the file
+        :param reader: function which does the read, its result has to be serializable into JSON
+        :return: result of the reader, `OSError` raised by the reader is recorded and raised again in replay
+        """
+        if cls.mode == cls.REPLAY:
+            records = cls._replay_reads.get(source)
+            if not records:
+                raise CassetteMiss(f'Read of {source} is not recorded in {cls.path}')
+            record = records.pop(0) if len(records) > 1 else records[0]
+            if record.get("error") is not None:
+                raise cls._error(record["error"])
+            return record["result"]
+        if cls.mode != cls.RECORD:
+            return reader()
+
+        record = {"source": source, "result": None}
+        cls._reads.append(record)
+        try:
+            record["result"] = reader()
+        except OSError as e:
+            record["error"] = cls._error_record(e)
+            raise
+        return record["result"]
+
+    @classmethod
+    def save(cls):
+        with open(cls.path, "w") as f:
+            json.dump({"commands": cls._records, "reads": cls._reads}, f, indent=1)
+        logger.info(f'{len(cls._records)} commands recorded into {cls.path}')
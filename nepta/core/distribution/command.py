@@ -1,9 +1,111 @@
+import os
+import time
+import shutil
+import signal
+import atexit
+import asyncio
+import tempfile
+import threading
 import subprocess
 import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+from nepta.core.distribution.capture import OutputCapture, BufferCapture
+from nepta.core.distribution.rusage import ResourceUsage, ResourceAccounting, exit_code
+from nepta.core.distribution.trace import Tracer
+from nepta.core.distribution.cassette import Cassette
 
 logger = logging.getLogger(__name__)
 
 
+class SSHConnectionPool(object):
+    """
+    Pool of persistent SSH connections. The first remote command for a host starts a background ControlMaster
+    connection and all following commands are multiplexed over it, so they do not pay for a new key exchange.
+    Master connections live until `close_all` is called (at the latest on interpreter exit). If the master
+    connection cannot be established, commands for that host use plain SSH connections and the master connection is
+    tried again by the first command after `RETRY_INTERVAL`.
+    """
+
+    SSH_OPTIONS = "-o LogLevel=ERROR"
+    MASTER_TIMEOUT = 30  # seconds to establish master connection
+    RETRY_INTERVAL = 60  # seconds after failed attempt, before the master connection is started again
+
+    enabled = True
+    _control_dir: Optional[str] = None
+    _masters: Dict[str, bool] = {}  # host -> master connection is established
+    _failures: Dict[str, float] = {}  # host -> time of the last failed attempt to start master connection
+
+    @classmethod
+    def _control_path(cls) -> str:
+        if cls._control_dir is None:
+            # unix socket path length is limited, so the directory has to be short
+            cls._control_dir = tempfile.mkdtemp(prefix="nepta-ssh-")
+            atexit.register(cls.close_all)
+        return os.path.join(cls._control_dir, "%C")
+
+    @classmethod
+    def _start_master(cls, host: str) -> bool:
+        cmdline = (
+            f'ssh {cls.SSH_OPTIONS} -o ControlMaster=yes -o ControlPersist=yes -o ControlPath={cls._control_path()} '
+            f'-N -f {host}'
+        ).split()
+        logger.debug(f'Starting SSH master connection to {host}')
+        try:
+            # master goes to background after authentication, it must not inherit our pipes
+            ret = subprocess.run(
+                cmdline,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=cls.MASTER_TIMEOUT,
+            ).returncode
+        except (OSError, subprocess.TimeoutExpired) as e:
+            logger.warning(f'Cannot start SSH master connection to {host}: {e}')
+            return False
+        if ret:
+            logger.warning(f'Cannot start SSH master connection to {host}, exit code {ret}')
+        return ret == 0
+
+    @classmethod
+    def ssh_prefix(cls, host) -> str:
+        """
+        :return: ssh command prefix which executes the rest of command line on the host
+        """
+        host = str(host)
+        if cls.enabled and not cls._masters.get(host):
+            last_failure = cls._failures.get(host)
+            if last_failure is None or time.monotonic() - last_failure >= cls.RETRY_INTERVAL:
+                cls._masters[host] = cls._start_master(host)
+                if cls._masters[host]:
+                    cls._failures.pop(host, None)
+                else:
+                    cls._failures[host] = time.monotonic()
+        if cls.enabled and cls._masters.get(host):
+            return f'ssh {cls.SSH_OPTIONS} -o ControlMaster=no -o ControlPath={cls._control_path()} {host}'
+        return f'ssh {cls.SSH_OPTIONS} {host}'
+
+    @classmethod
+    def close_all(cls):
+        """
+        Close all master connections and remove their control sockets.
+        """
+        for host, established in cls._masters.items():
+            if established:
+                logger.debug(f'Closing SSH master connection to {host}')
+                subprocess.run(
+                    f'ssh {cls.SSH_OPTIONS} -o ControlPath={cls._control_path()} -O exit {host}'.split(),
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                )
+        cls._masters.clear()
+        cls._failures.clear()
+        if cls._control_dir is not None:
+            shutil.rmtree(cls._control_dir, ignore_errors=True)
+            cls._control_dir = None
+
+
 class Command(object):
     """
     This object abstracts an execution of shell command. It uses the subprocess library to fork a system process
@@ -13,16 +115,37 @@ class Command(object):
         -> cmd = Command('tuned-adm active')
         -> cmd.run()
         -> out, ret_code = cmd.get_output()
+
+    The process is reaped by wait4, so its resource usage is available in `usage` when it finishes.
+
+    When `Cassette` is in record or replay mode, the output is recorded or the process is replayed from the cassette.
     """
 
-    def __init__(self, cmdline, enable_debug_log=True, host=None, stderr=subprocess.STDOUT):
-        if host is not None:
-            cmdline = f'ssh -o LogLevel=ERROR {host} {cmdline}'
+    READ_CHUNK_SIZE = 64 * 1024
 
-        self._cmdline = cmdline.split()
+    def __init__(
+        self,
+        cmdline,
+        enable_debug_log=True,
+        host=None,
+        stderr=subprocess.STDOUT,
+        capture: Callable[[], OutputCapture] = BufferCapture,
+    ):
+        """
+        :param capture: factory of output storage, e.g. `RingBufferCapture` keeps only the end of long output
+        """
+        self.host = host
+        self.cmdline = cmdline  # without ssh prefix, it is added by `_resolve_cmdline` when the command is started
+        self._cmdline = self._format_cmdline(cmdline)
         self._command_handle = None
         self.enable_debug = enable_debug_log
         self.stderr = stderr
+        self.capture = capture
+        self.started: Optional[float] = None  # wall-clock timestamps
+        self.finished: Optional[float] = None
+        self.usage: Optional[ResourceUsage] = None
+        self.output_size: Optional[int] = None  # bytes read by watch_output
+        self._recording: Optional[dict] = None
 
     def __str__(self):
         return "{cls}: {cmd}".format(cls=self.__class__.__name__, cmd=self._cmd_str())
@@ -43,26 +166,97 @@ class Command(object):
     def _cmd_str(self):
         return " ".join(self._cmdline)
 
+    @staticmethod
+    def _format_cmdline(cmdline: str):
+        return cmdline.split()
+
+    def _resolve_cmdline(self):
+        """
+        Prepend ssh prefix to the command line of remote command. It is resolved only when the command is started,
+        because the first remote command for a host starts SSH master connection.
+        """
+        if self.host is not None:
+            self._cmdline = self._format_cmdline(f'{SSHConnectionPool.ssh_prefix(self.host)} {self.cmdline}')
+
+    @property
+    def program(self) -> str:
+        """
+        :return: name of executed program, ssh for remote commands
+        """
+        return os.path.basename(self._cmd_str().split(maxsplit=1)[0])
+
+    def _popen(self, shell=False):
+        if Cassette.mode == Cassette.REPLAY:
+            return Cassette.replay(self.host, self.cmdline)
+        self._resolve_cmdline()
+        try:
+            handle = subprocess.Popen(self._cmdline, stdout=subprocess.PIPE, stderr=self.stderr, shell=shell)
+        except OSError as e:
+            if Cassette.mode == Cassette.RECORD:
+                Cassette.fail(self.host, self.cmdline, e)
+            raise
+        if Cassette.mode == Cassette.RECORD:
+            self._recording = Cassette.start(self.host, self.cmdline)
+        return handle
+
     def run(self):
         self.log_debug("Running %s", self)
-        self._command_handle = subprocess.Popen(self._cmdline, stdout=subprocess.PIPE, stderr=self.stderr)
+        self.started = time.time()
+        self._command_handle = self._popen()
         return self
 
+    def _reap(self, block: bool) -> Optional[int]:
+        """
+        Wait for the process by wait4, which returns its resource usage together with its exit status.
+        :param block: wait until the process finishes
+        :return: return code, None if the process is running
+        """
+        handle = self._command_handle
+        if handle.returncode is not None:
+            return handle.returncode
+        if not isinstance(handle, subprocess.Popen):  # replayed process
+            return handle.wait() if block else handle.poll()
+        try:
+            pid, status, rusage = os.wait4(handle.pid, 0 if block else os.WNOHANG)
+        except ChildProcessError:  # process was already reaped by someone else, usage is lost
+            return handle.wait() if block else handle.poll()
+        if pid == 0:
+            return None
+        handle.returncode = exit_code(status)
+        self.finished = time.time()
+        self.usage = ResourceUsage.from_rusage(self.started, self.finished, rusage)
+        ResourceAccounting.record(self.program, self.usage)
+        self._trace()
+        if self._recording is not None:
+            Cassette.finish(self._recording, handle.returncode)
+        return handle.returncode
+
+    def _trace(self):
+        Tracer.command(
+            self._cmd_str(), self.started, self.finished, self.host, self._command_handle.returncode, self.output_size
+        )
+
     def wait(self):
         self.log_debug(f'Waiting to finish: {self}')
-        self._command_handle.wait()
+        self._reap(block=True)
         return self
 
     def poll(self):
-        return self._command_handle.poll()
+        return self._reap(block=False)
 
-    def _read_line_from_pipe(self):
-        self._command_handle.stdout.flush()
-        return self._command_handle.stdout.readline().decode()
+    def _log_chunk(self, pending: bytes, chunk) -> bytes:
+        """
+        Log complete lines of the output chunk.
+        :param pending: incomplete last line of previous chunk
+        :return: incomplete last line of this chunk
+        """
+        *lines, pending = (pending + bytes(chunk)).split(b"\n")
+        for line in lines:
+            logger.debug(line.decode(errors="replace"))
+        return pending
 
-    def _read_whole_pipe(self):
-        self._command_handle.stdout.flush()
-        return self._command_handle.stdout.read().decode()
+    def _debug_output(self):
+        return self.enable_debug and logger.isEnabledFor(logging.DEBUG)
 
     def get_output(self):
         """
@@ -77,22 +271,33 @@ class Command(object):
 
     def watch_output(self):
         """
-        This method continuously logs an output generated by the executed command.
+        This method continuously reads (and logs) an output generated by the executed command. The output is read by
+        chunks into one preallocated buffer and stored in the capture, it is decoded only once at the end.
         :return: command output and return code
         """
         logger.info(f'Watching output of >> {self}')
-        output_buffer = ""
-
-        while self.poll() is None:
-            line = self._read_line_from_pipe()
-            self.log_debug(line.replace("\n", ""))
-            output_buffer += line
-        else:  # the end of the cycle
-            line = self._read_whole_pipe()
-            self.log_debug(line.replace("\n", ""))
-            output_buffer += line
-
-        return output_buffer, self.poll()
+        capture = self.capture()
+        debug_output = self._debug_output()
+        buffer = memoryview(bytearray(self.READ_CHUNK_SIZE))
+        pending = b""
+        self.output_size = 0
+        try:
+            while True:
+                size = self._command_handle.stdout.readinto1(buffer)
+                if not size:
+                    break
+                self.output_size += size
+                capture.write(buffer[:size])
+                if debug_output:
+                    pending = self._log_chunk(pending, buffer[:size])
+            if pending:
+                logger.debug(pending.decode(errors="replace"))
+            self._reap(block=True)
+            if self._recording is not None:
+                Cassette.finish(self._recording, self.poll(), capture.getvalue())
+            return capture.decode(), self.poll()
+        finally:
+            capture.close()
 
     def terminate(self):
         self._command_handle.terminate()
@@ -110,14 +315,243 @@ class ShellCommand(Command):
     is necessary for command with unix pipes or other shell utilities.
     """
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self._cmdline = " ".join(self._cmdline)
+    @staticmethod
+    def _format_cmdline(cmdline: str):
+        return " ".join(cmdline.split())
 
     def _cmd_str(self):
         return self._cmdline
 
     def run(self):
         self.log_debug("Running command: %s", self._cmdline)
-        self._command_handle = subprocess.Popen(self._cmdline, stdout=subprocess.PIPE, stderr=self.stderr, shell=True)
+        self.started = time.time()
+        self._command_handle = self._popen(shell=True)
         return self
+
+
+class _ReapedProcess(object):
+    """
+    Process with interface of `asyncio.subprocess.Process`. It is reaped by wait4 in a helper thread instead of the
+    asyncio child watcher, so its resource usage is available in `rusage` when it finishes.
+    """
+
+    def __init__(self, handle: subprocess.Popen, stdout: asyncio.StreamReader, loop: asyncio.AbstractEventLoop):
+        self._handle = handle
+        self.pid = handle.pid
+        self.stdout = stdout
+        self.rusage = None
+        self._exited = loop.create_future()
+        threading.Thread(target=self._reap, args=(loop,), name=f'reaper-{self.pid}', daemon=True).start()
+
+    @classmethod
+    async def create(cls, cmdline: List[str], stderr) -> "_ReapedProcess":
+        loop = asyncio.get_event_loop()
+        handle = subprocess.Popen(cmdline, stdout=subprocess.PIPE, stderr=stderr)
+        stdout = asyncio.StreamReader()
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(stdout), handle.stdout)
+        return cls(handle, stdout, loop)
+
+    @property
+    def returncode(self) -> Optional[int]:
+        return self._handle.returncode
+
+    def _reap(self, loop: asyncio.AbstractEventLoop):
+        try:
+            _, status, rusage = os.wait4(self.pid, 0)
+            returncode = exit_code(status)
+        except ChildProcessError:  # process was already reaped by someone else, usage is lost
+            returncode, rusage = self._handle.wait(), None
+
+        def exited():
+            self._handle.returncode = returncode
+            self.rusage = rusage
+            if not self._exited.done():
+                self._exited.set_result(returncode)
+
+        try:
+            loop.call_soon_threadsafe(exited)
+        except RuntimeError:  # event loop was closed before the process finished
+            self._handle.returncode = returncode
+
+    async def wait(self) -> int:
+        # shielded, so cancelled waiting (e.g. timeout) does not cancel the end of the process
+        return await asyncio.shield(self._exited)
+
+    def send_signal(self, sig: int):
+        # Popen.send_signal polls the process and it could reap the process before the helper thread
+        if self.returncode is None:
+            os.kill(self.pid, sig)
+
+    def terminate(self):
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self):
+        self.send_signal(signal.SIGKILL)
+
+
+class AsyncCommand(Command):
+    """
+    This class executes the command as asyncio subprocess, so a single event loop can supervise many concurrently
+    running commands. The output is read by chunks, so the pipe cannot be filled up and a line length is not limited.
+
+    Usage:
+        -> cmd = AsyncCommand('iperf3 -c host')
+        -> await cmd.run_async()
+        -> out, ret_code = await cmd.watch_output_async(timeout=60)
+
+    Synchronous methods are thin wrappers which drive the event loop where the process was started. They cannot be
+    used while the loop is running or after it was closed. When the process is started by a synchronous method, the
+    event loop is owned by the command and it is closed once the process finished and its output was read.
+
+    The process is reaped by wait4 in a helper thread (see `_ReapedProcess`), so its resource usage is available in
+    `usage` when it finishes, the same as for `Command`.
+    """
+
+    TERMINATE_TIMEOUT = 5  # seconds to wait for terminated process before it is killed
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._own_loop = False  # loop was created by synchronous wrapper
+
+    async def _create_process(self):
+        if Cassette.mode == Cassette.REPLAY:
+            return Cassette.replay_async(self.host, self.cmdline)
+        self._resolve_cmdline()
+        try:
+            process = await _ReapedProcess.create(self._cmdline, self.stderr)
+        except OSError as e:
+            if Cassette.mode == Cassette.RECORD:
+                Cassette.fail(self.host, self.cmdline, e)
+            raise
+        if Cassette.mode == Cassette.RECORD:
+            self._recording = Cassette.start(self.host, self.cmdline)
+        return process
+
+    async def run_async(self):
+        self.log_debug("Running %s", self)
+        self._loop = asyncio.get_event_loop()
+        self.started = time.time()
+        self._command_handle = await self._create_process()
+        return self
+
+    async def _wait_process(self):
+        await self._command_handle.wait()
+        if self.finished is None:
+            self.finished = time.time()
+            rusage = getattr(self._command_handle, "rusage", None)  # replayed process has no usage
+            if rusage is not None:
+                self.usage = ResourceUsage.from_rusage(self.started, self.finished, rusage)
+                ResourceAccounting.record(self.program, self.usage)
+            self._trace()
+            if self._recording is not None:
+                Cassette.finish(self._recording, self._command_handle.returncode)
+
+    async def wait_async(self):
+        self.log_debug(f'Waiting to finish: {self}')
+        await self._wait_process()
+        return self
+
+    async def _read_output(self, capture: OutputCapture):
+        debug_output = self._debug_output()
+        pending = b""
+        self.output_size = 0
+        while True:
+            chunk = await self._command_handle.stdout.read(self.READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            self.output_size += len(chunk)
+            capture.write(chunk)
+            if debug_output:
+                pending = self._log_chunk(pending, chunk)
+        if pending:
+            logger.debug(pending.decode(errors="replace"))
+        await self._wait_process()
+
+    async def watch_output_async(self, timeout: Optional[float] = None) -> Tuple[str, Optional[int]]:
+        """
+        Read the whole output of the command and wait for its end. When the timeout expires or the waiting is
+        cancelled, the process is terminated.
+        :param timeout: maximal time in seconds to wait for the end of the command, None means no limit
+        :return: command output and return code
+        """
+        logger.info(f'Watching output of >> {self}')
+        capture = self.capture()
+        try:
+            await asyncio.wait_for(self._read_output(capture), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f'{self} did not finish in {timeout} seconds, terminating it')
+            await self.terminate_async()
+        except asyncio.CancelledError:
+            await self.terminate_async()
+            raise
+        finally:
+            if self._recording is not None:
+                Cassette.finish(self._recording, self.poll(), capture.getvalue())
+            output = capture.decode()
+            capture.close()
+        return output, self.poll()
+
+    async def terminate_async(self):
+        """
+        Terminate the process and wait for its end, the process is killed if it ignores the termination.
+        """
+        self.terminate()
+        try:
+            await asyncio.wait_for(self._wait_process(), self.TERMINATE_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning(f'Killing process {self}!')
+            try:
+                self._command_handle.kill()
+            except ProcessLookupError:
+                pass
+            await self._wait_process()
+
+    def _run_sync(self, coroutine):
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            self._own_loop = True
+        if self._loop.is_closed() or self._loop.is_running():
+            coroutine.close()
+            raise RuntimeError(f'{self} is driven by another event loop, use asynchronous methods')
+        try:
+            return self._loop.run_until_complete(coroutine)
+        finally:
+            if self._own_loop and self._is_done():
+                self._close_loop()
+
+    def _is_done(self) -> bool:
+        """
+        :return: True if the process finished and its output was read, so the event loop is not needed anymore
+        """
+        handle = self._command_handle
+        if handle is None or handle.returncode is None:
+            return False
+        return handle.stdout is None or handle.stdout.at_eof()
+
+    def _close_loop(self):
+        loop, self._loop, self._own_loop = self._loop, None, False
+        try:
+            # let transports of the finished process close their pipes
+            loop.run_until_complete(asyncio.sleep(0))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            loop.close()
+
+    def run(self):
+        return self._run_sync(self.run_async())
+
+    def wait(self):
+        return self._run_sync(self.wait_async())
+
+    def watch_output(self):
+        return self._run_sync(self.watch_output_async())
+
+    def poll(self):
+        return self._command_handle.returncode
+
+    def terminate(self):
+        try:
+            self._command_handle.terminate()
+        except ProcessLookupError:  # process has already finished
+            pass
@@ -11,6 +11,7 @@ from abc import ABC, abstractmethod
 
 from nepta.core import model
 from nepta.core.model import network as net_model
+from nepta.core.model.slots import fields_dict
 from nepta.core.distribution import env
 from nepta.core.distribution.utils.fs import Fs
 
@@ -103,16 +104,20 @@ class GenericIPsecFile(JinjaConfFile, ABC):
 
 class IPsecConnFile(GenericIPsecFile):
     TEMPLATE = "ipsec_rhel8_conn.jinja2"
-    # Use different ipsec template for RHEL7
-    if env.RedhatRelease.version.startswith("7"):
-        TEMPLATE = "ipsec_conn.jinja2"
+    RHEL7_TEMPLATE = "ipsec_conn.jinja2"
     SUFFIX = "conf"
 
+    def __init__(self, connection: net_model.IPsecTunnel):
+        super().__init__(connection)
+        # Use different ipsec template for RHEL7
+        if env.RedhatRelease.version.startswith("7"):
+            self.template = self.RHEL7_TEMPLATE
+
     def _make_jinja_context(self):
         return {
             "name": self.connection.name,
             "family": self.connection.family,
-            **self.connection.__dict__,
+            **fields_dict(self.connection),
         }
 
 
@@ -138,7 +143,7 @@ class WireGuardConnectionFile(JinjaConfFile):
         self.connection = connection
 
     def _make_jinja_context(self):
-        return self.connection.__dict__
+        return fields_dict(self.connection)
 
     def _make_path(self):
         return os.path.join(self.CONF_DIR, f'{self.connection.name}{self.SUFFIX}')
@@ -5,6 +5,8 @@ from logging import getLogger
 
 from nepta.core.distribution.utils.system import Uname, RPMTool
 from nepta.core.distribution.command import Command
+from nepta.core.distribution.cassette import Cassette
+from nepta.core.distribution.utils.procfs import ProcFs, SysFs
 
 logger = getLogger(__name__)
 
@@ -14,36 +16,90 @@ class _MetaPrintedType(type):
         return (
             self.__name__
             + "\n\t"
-            + "\n\t".join([f'{k} => {v}' for k, v in self.__dict__.items() if not k.startswith("_")])
+            + "\n\t".join([f'{k} => {getattr(self, k)}' for k in list(self.__dict__) if not k.startswith("_")])
         )
 
 
+class _lazy(object):
+    """
+    Class attribute computed by decorated function on the first access. The value replaces the descriptor in the
+    class, so it is computed only once and it can be overridden by plain `setattr`.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.name = func.__name__
+
+    def __get__(self, instance, owner):
+        value = self.func(owner)
+        setattr(owner, self.name, value)
+        return value
+
+
 class RedhatRelease(metaclass=_MetaPrintedType):
     _RELEASE_FILE_PATH = "/etc/redhat-release"
 
     _splitting_regex = r"(.*) (release) ([0-9\.]*) ?\(?(.*)\)?"
-    with open(_RELEASE_FILE_PATH, "r") as _fd:
-        _release_file_content = _fd.read()
-    _m = re.match(_splitting_regex, _release_file_content)
-    if _m is not None:
-        brand = _m.group(1)
-        version = _m.group(3)
-        codename = _m.group(4)
+
+    @staticmethod
+    def _read_release_file(path):
+        with open(path, "r") as fd:
+            return fd.read()
+
+    @_lazy
+    def _m(cls):
+        try:
+            content = Cassette.read(cls._RELEASE_FILE_PATH, lambda: cls._read_release_file(cls._RELEASE_FILE_PATH))
+            return re.match(cls._splitting_regex, content)
+        except OSError as e:
+            logger.warning(f'Cannot read distribution release: {e}')
+            return None
+
+    @_lazy
+    def brand(cls):
+        return cls._m.group(1) if cls._m else ""
+
+    @_lazy
+    def version(cls):
+        return cls._m.group(3) if cls._m else ""
+
+    @_lazy
+    def codename(cls):
+        return cls._m.group(4) if cls._m else ""
 
 
 class Environment(metaclass=_MetaPrintedType):
     _env = os.environ
-    kernel_src_rpm = RPMTool.get_src_name_from_file(f'/boot/vmlinuz-{Uname.get_version()}')
-    kernel = "kernel-" + Uname.get_version()
-    _match = None
-    if kernel_src_rpm:
-        _match = re.search(r"(?P<src_name>.+)-(.+)-(.+)\.*\.src\.rpm", kernel_src_rpm)
-        if _match is not None:
-            kernel = _match.group("src_name") + "-" + Uname.get_version()
-    fqdn = Uname.get_hostname()
+
+    @_lazy
+    def kernel_src_rpm(cls):
+        try:
+            return RPMTool.get_src_name_from_file(f'/boot/vmlinuz-{Uname.get_version()}')
+        except FileNotFoundError as e:
+            logger.warning(f'Cannot find kernel source package: {e}')
+            return None
+
+    @_lazy
+    def kernel(cls):
+        if cls.kernel_src_rpm:
+            match = re.search(r"(?P<src_name>.+)-(.+)-(.+)\.*\.src\.rpm", cls.kernel_src_rpm)
+            if match is not None:
+                return match.group("src_name") + "-" + Uname.get_version()
+        return "kernel-" + Uname.get_version()
+
+    @_lazy
+    def fqdn(cls):
+        return Uname.get_hostname()
+
+    @_lazy
+    def rhel_version(cls):
+        return RedhatRelease.version
+
+    @_lazy
+    def hostname(cls):
+        return cls.fqdn.split(".")[0]
+
     distro = _env.get("RSTRNT_OSDISTRO", "Linux")
-    rhel_version = RedhatRelease.version
-    hostname = fqdn.split(".")[0]
     whiteboard = _env.get("BEAKER_JOB_WHITEBOARD")
     hub = _env.get("BEAKER_HUB_URL")
     job_id = _env.get("RSTRNT_JOBID") or _env.get("TESTING_FARM_REQUEST_ID")
@@ -58,14 +114,33 @@ class Environment(metaclass=_MetaPrintedType):
 
 
 class Hardware(metaclass=_MetaPrintedType):
-    try:
-        with Command("nproc") as _cmd:
-            nproc = int(_cmd.watch_output()[0].strip())
+    @_lazy
+    def nproc(cls):
+        try:
+            return ProcFs.nproc()
+        except OSError as e:
+            logger.debug(f'Cannot read number of CPUs, using command: {e}')
+        with Command("nproc") as cmd:
+            return int(cmd.watch_output()[0].strip())
 
-        with Command("grep MemTotal /proc/meminfo") as _cmd:
-            total_memory = int(_cmd.watch_output()[0].split()[1]) * 1024  # convert to bytes
+    @_lazy
+    def total_memory(cls):
+        try:
+            return ProcFs.total_memory()
+        except OSError as e:
+            logger.debug(f'Cannot read /proc/meminfo, using command: {e}')
+        with Command("grep MemTotal /proc/meminfo") as cmd:
+            return int(cmd.watch_output()[0].split()[1]) * 1024  # convert to bytes
 
-        with Command("ip -j link") as _cmd:
-            interfaces = {x["ifname"]: x for x in json.loads(_cmd.watch_output()[0])}
-    except FileNotFoundError as e:
-        logger.error(e)
+    @_lazy
+    def interfaces(cls):
+        try:
+            return SysFs.interfaces()
+        except OSError as e:
+            logger.debug(f'Cannot read interfaces from sysfs, using command: {e}')
+        try:
+            with Command("ip -j link") as cmd:
+                return {x["ifname"]: x for x in json.loads(cmd.watch_output()[0])}
+        except FileNotFoundError as e:
+            logger.error(e)
+            return {}
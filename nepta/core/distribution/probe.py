@@ -0,0 +1,128 @@
+import os
+import json
+import time
+import logging
+from typing import Dict, Optional, Tuple
+
+from nepta.core.distribution.command import Command
+
+logger = logging.getLogger(__name__)
+
+ProbeKey = Tuple[str, Optional[str]]
+
+
+class ProbeCache(object):
+    """
+    Cache of outputs of system probing commands (uname, rpm, lscpu, ...) keyed by command line and host, so the same
+    probe is executed only once during its time to live. Commands changing the probed state have to invalidate the
+    affected entries, e.g. `Tuned.set_profile` invalidates `tuned-adm active`.
+
+    Optionally the cache is persisted in JSON file, so also following phases (separate nepta executions) reuse the
+    results. The file is ignored after reboot of the local machine.
+
+    Failed probes (non-zero return code) are often transient, e.g. unreachable host or package manager lock, so they
+    are cached only for `FAILURE_TTL` and they are never persisted.
+
+    Usage:
+        -> out, ret_code = ProbeCache.run('uname -a')
+        -> ProbeCache.invalidate('rpm ')
+    """
+
+    DEFAULT_TTL = 3600.0  # seconds
+    FAILURE_TTL = 10.0  # seconds, upper limit of time to live of failed probes
+    BOOT_ID_PATH = "/proc/sys/kernel/random/boot_id"
+
+    _entries: Dict[ProbeKey, Tuple[float, str, int]] = {}  # key -> (expiration time, output, return code)
+    _path: Optional[str] = None
+
+    @classmethod
+    def run(cls, cmdline: str, host: Optional[str] = None, ttl: Optional[float] = None) -> Tuple[str, int]:
+        """
+        :param host: remote host where the probe is executed, None means local machine
+        :param ttl: time to live of the result in seconds, None means `DEFAULT_TTL`
+        :return: output and return code of the command, possibly cached
+        """
+        key = (cmdline, None if host is None else str(host))
+        now = time.time()
+        entry = cls._entries.get(key)
+        if entry is not None and entry[0] > now:
+            logger.debug(f'Using cached output of probe: {cmdline}')
+            return entry[1], entry[2]
+
+        cmd = Command(cmdline, host=host)
+        cmd.run()
+        out, ret_code = cmd.watch_output()
+        ttl = cls.DEFAULT_TTL if ttl is None else ttl
+        if ret_code:
+            ttl = min(ttl, cls.FAILURE_TTL)
+        cls._entries[key] = (now + ttl, out, ret_code)
+        if not ret_code:
+            cls._save()
+        return out, ret_code
+
+    @classmethod
+    def invalidate(cls, *prefixes: str, host: Optional[str] = None):
+        """
+        Drop cached results of commands starting with any of given prefixes, all results are dropped if no prefix is
+        given. Host limits invalidation to the probes of one host.
+        """
+        host = None if host is None else str(host)
+        for key in list(cls._entries):
+            cmdline, key_host = key
+            if host is not None and key_host != host:
+                continue
+            if not prefixes or cmdline.startswith(prefixes):
+                del cls._entries[key]
+        cls._save()
+
+    @classmethod
+    def _boot_id(cls) -> str:
+        try:
+            with open(cls.BOOT_ID_PATH) as f:
+                return f.read().strip()
+        except OSError:
+            return ""
+
+    @classmethod
+    def persist(cls, path: str):
+        """
+        Load cached results from the file and store all following changes into it.
+        """
+        cls._path = path
+        try:
+            with open(path) as f:
+                content = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f'Cannot load probe cache {path}: {e}')
+            return
+
+        if content.get("boot_id") != cls._boot_id():
+            logger.info(f'Probe cache {path} was created before reboot, ignoring it')
+            return
+        now = time.time()
+        for cmdline, host, expiration, out, ret_code in content.get("entries", []):
+            if expiration > now and not ret_code:
+                cls._entries.setdefault((cmdline, host), (expiration, out, ret_code))
+
+    @classmethod
+    def _save(cls):
+        if cls._path is None:
+            return
+        entries = [[*key, *value] for key, value in cls._entries.items() if not value[2]]
+        tmp_path = f'{cls._path}.tmp'
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({"boot_id": cls._boot_id(), "entries": entries}, f)
+            os.replace(tmp_path, cls._path)
+        except OSError as e:
+            logger.warning(f'Cannot store probe cache {cls._path}: {e}')
+
+    @classmethod
+    def clear(cls):
+        """
+        Drop all results and stop persisting the cache.
+        """
+        cls._entries.clear()
+        cls._path = None
@@ -0,0 +1,98 @@
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+
+def exit_code(status: int) -> int:
+    """
+    Convert wait status into return code in the same way as `subprocess.Popen.returncode`.
+    """
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+@dataclass(frozen=True)
+class ResourceUsage:
+    """
+    Resources consumed by one or more finished processes. Times are in seconds, start and end are wall-clock
+    timestamps. Usage of remote command is usage of its local ssh client.
+    """
+
+    start: float
+    end: float
+    user_time: float = 0.0
+    system_time: float = 0.0
+    max_rss: int = 0  # bytes
+    voluntary_switches: int = 0
+    involuntary_switches: int = 0
+    count: int = 1  # number of processes
+
+    @classmethod
+    def from_rusage(cls, start: float, end: float, rusage) -> "ResourceUsage":
+        return cls(
+            start=start,
+            end=end,
+            user_time=rusage.ru_utime,
+            system_time=rusage.ru_stime,
+            max_rss=rusage.ru_maxrss * 1024,  # linux reports kilobytes
+            voluntary_switches=rusage.ru_nvcsw,
+            involuntary_switches=rusage.ru_nivcsw,
+        )
+
+    @property
+    def wall_time(self) -> float:
+        return self.end - self.start
+
+    @property
+    def cpu_time(self) -> float:
+        return self.user_time + self.system_time
+
+    def __add__(self, other: "ResourceUsage") -> "ResourceUsage":
+        return ResourceUsage(
+            start=min(self.start, other.start),
+            end=max(self.end, other.end),
+            user_time=self.user_time + other.user_time,
+            system_time=self.system_time + other.system_time,
+            max_rss=max(self.max_rss, other.max_rss),
+            voluntary_switches=self.voluntary_switches + other.voluntary_switches,
+            involuntary_switches=self.involuntary_switches + other.involuntary_switches,
+            count=self.count + other.count,
+        )
+
+
+class ResourceAccounting(object):
+    """
+    Run-wide record of resource usage of finished commands. Recording is disabled by default.
+
+    Usage:
+        -> ResourceAccounting.enabled = True
+        -> ... run commands ...
+        -> per_program = ResourceAccounting.summarize(ResourceAccounting.collect())
+    """
+
+    enabled = False
+    _records: List[Tuple[str, ResourceUsage]] = []
+
+    @classmethod
+    def record(cls, program: str, usage: ResourceUsage):
+        if cls.enabled:
+            cls._records.append((program, usage))
+
+    @classmethod
+    def collect(cls) -> List[Tuple[str, ResourceUsage]]:
+        """
+        :return: records since the last collection, the records are removed
+        """
+        records, cls._records = cls._records, []
+        return records
+
+    @staticmethod
+    def summarize(records: List[Tuple[str, ResourceUsage]]) -> Dict[str, ResourceUsage]:
+        """
+        :return: usage aggregated per program name
+        """
+        summary: Dict[str, ResourceUsage] = {}
+        for program, usage in records:
+            summary[program] = summary[program] + usage if program in summary else usage
+        return summary
@@ -0,0 +1,138 @@
+"""
+Compact storage of per-run time series (iPerf3 intervals, mpstat samples, interrupt counters) in the package. Arrays
+of each run are written once, when the run is finished, into one NumPy `.npz` archive. Index file maps archives and
+their arrays back to scenario/path/test_case/run.
+
+Archives are compressed by default. Uncompressed archives are bigger, but readers can memory-map their arrays.
+"""
+
+import os
+import json
+import struct
+import zipfile
+import logging
+import numpy as np
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TimeSeries(object):
+    """
+    Run-wide storage of time series. Storing is disabled by default.
+
+    Usage:
+        -> TimeSeries.open('package/attachments/timeseries')
+        -> TimeSeries.add('iperf3_0', intervals.aggregate)
+        -> TimeSeries.flush('Iperf3TCPStream', path.id, test_case_uuid, 0)
+        -> TimeSeries.close()
+        -> ...
+        -> for entry in TimeSeries.read_index(directory):
+        ->     TimeSeries.load(directory, entry['file'], 'iperf3_0')
+    """
+
+    INDEX_NAME = "index.json"
+    LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")  # zip local file header
+
+    enabled = False
+    compress = True
+    directory: Optional[str] = None
+    _pending: Dict[str, np.ndarray] = {}
+    _index: List[Dict[str, Any]] = []
+
+    @classmethod
+    def open(cls, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        cls.directory = directory
+        cls._pending = {}
+        cls._index = []
+        logger.info(f'Storing time series into {directory}')
+
+    @classmethod
+    def close(cls):
+        cls._pending.clear()
+        cls.directory = None
+
+    @classmethod
+    def add(cls, name: str, array):
+        """
+        Add array to the archive of the current run.
+        """
+        if cls.enabled and cls.directory is not None:
+            cls._pending[name] = np.asarray(array)
+
+    @classmethod
+    def flush(cls, scenario: str, path: Any, test_case: Any, run: int) -> Optional[str]:
+        """
+        Write arrays of the finished run into new archive and add it into the index. Arrays of failed runs are not
+        added, so they are dropped here.
+        :return: name of written archive or None if there is nothing to store
+        """
+        if not cls._pending or cls.directory is None:
+            cls._pending.clear()
+            return None
+
+        file_name = f'{len(cls._index):05d}.npz'
+        save = np.savez_compressed if cls.compress else np.savez
+        save(os.path.join(cls.directory, file_name), **cls._pending)
+
+        cls._index.append(
+            {
+                "file": file_name,
+                "scenario": scenario,
+                "path": str(path),
+                "test_case": str(test_case),
+                "run": run,
+                "arrays": {
+                    name: {"shape": list(array.shape), "dtype": array.dtype.str} for name, array in cls._pending.items()
+                },
+            }
+        )
+        cls._pending.clear()
+        cls._save_index()
+        return file_name
+
+    @classmethod
+    def _save_index(cls):
+        path = os.path.join(cls.directory, cls.INDEX_NAME)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"runs": cls._index}, f, indent=1)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def read_index(cls, directory: str) -> List[Dict[str, Any]]:
+        with open(os.path.join(directory, cls.INDEX_NAME)) as f:
+            return json.load(f)["runs"]
+
+    @classmethod
+    def load(cls, directory: str, file_name: str, name: str, mmap_mode: Optional[str] = "r") -> np.ndarray:
+        """
+        Read one array of the archive. Arrays of uncompressed archives are memory-mapped, compressed arrays are read
+        into memory.
+        :param mmap_mode: mode of `numpy.memmap`, None reads the array into memory
+        """
+        path = os.path.join(directory, file_name)
+        with zipfile.ZipFile(path) as archive:
+            info = archive.getinfo(name + ".npy")
+            with archive.open(info) as f:
+                version = np.lib.format.read_magic(f)
+                if version == (1, 0):
+                    shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+                else:
+                    shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+                stored = info.compress_type == zipfile.ZIP_STORED and not dtype.hasobject and 0 not in shape
+                if mmap_mode is None or not stored:
+                    f.seek(0)
+                    return np.lib.format.read_array(f, allow_pickle=False)
+                array_offset = f.tell()
+
+        # stored member is a plain .npy file placed after its local header
+        with open(path, "rb") as f:
+            f.seek(info.header_offset)
+            header = cls.LOCAL_HEADER.unpack(f.read(cls.LOCAL_HEADER.size))
+        name_length, extra_length = header[-2:]
+        offset = info.header_offset + cls.LOCAL_HEADER.size + name_length + extra_length + array_offset
+        return np.memmap(
+            path, dtype=dtype, mode=mmap_mode, offset=offset, shape=shape, order="F" if fortran_order else "C"
+        )
@@ -0,0 +1,124 @@
+"""
+Run-wide trace of executed commands, strategies and scenarios in Chrome trace event format, which can be opened in
+Perfetto UI (https://ui.perfetto.dev) or chrome://tracing.
+
+Strategies and scenarios are nested spans on the first track. Commands are spread over following tracks, so
+concurrently running commands do not overlap.
+"""
+
+import os
+import time
+import json
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, TextIO
+
+
+class Tracer(object):
+    """
+    Recorder of trace events. Recording is disabled by default.
+
+    Usage:
+        -> Tracer.enabled = True
+        -> with Tracer.span('RunScenarios.run_scenarios', 'strategy'):
+        ->     Command('uname -r').run().wait()
+        -> Tracer.dump(stream)
+    """
+
+    enabled = False
+    _events: List[Dict[str, Any]] = []
+    _context: List[str] = []
+
+    @staticmethod
+    def _us(timestamp: float) -> int:
+        return int(timestamp * 1e6)
+
+    @classmethod
+    @contextmanager
+    def span(cls, name: str, category: str, **args: Any) -> Iterator[None]:
+        """
+        Record duration of the block as span, which is also context of commands executed inside the block.
+        """
+        if not cls.enabled:
+            yield
+            return
+        cls._context.append(name)
+        start = time.time()
+        try:
+            yield
+        finally:
+            end = time.time()
+            cls._context.pop()
+            cls._events.append(
+                {
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    "ts": cls._us(start),
+                    "dur": cls._us(end) - cls._us(start),
+                    "pid": os.getpid(),
+                    "tid": 0,
+                    "args": args,
+                }
+            )
+
+    @classmethod
+    def command(
+        cls,
+        cmdline: str,
+        start: float,
+        end: float,
+        host: Optional[str] = None,
+        exit_code: Optional[int] = None,
+        output_size: Optional[int] = None,
+    ):
+        """
+        Record finished command in the current context.
+        """
+        if not cls.enabled:
+            return
+        cls._events.append(
+            {
+                "name": cmdline.split(maxsplit=1)[0] if cmdline else cmdline,
+                "cat": "command",
+                "ph": "X",
+                "ts": cls._us(start),
+                "dur": cls._us(end) - cls._us(start),
+                "pid": os.getpid(),
+                "args": {
+                    "cmdline": cmdline,
+                    "host": host,
+                    "exit_code": exit_code,
+                    "output_size": output_size,
+                    "context": " > ".join(cls._context),
+                },
+            }
+        )
+
+    @classmethod
+    def events(cls) -> List[Dict[str, Any]]:
+        """
+        :return: recorded events, commands are assigned to the first track where they do not overlap other command
+        """
+        events = sorted(cls._events, key=lambda e: e["ts"])
+        track_ends: List[int] = []  # end of the last command on each track
+        for event in events:
+            if event["cat"] != "command":
+                continue
+            for track, track_end in enumerate(track_ends):
+                if track_end <= event["ts"]:
+                    break
+            else:
+                track = len(track_ends)
+                track_ends.append(0)
+            track_ends[track] = event["ts"] + event["dur"]
+            event["tid"] = track + 1
+        return events
+
+    @classmethod
+    def dump(cls, stream: TextIO):
+        json.dump({"traceEvents": cls.events(), "displayTimeUnit": "ms"}, stream)
+
+    @classmethod
+    def clear(cls):
+        cls._events.clear()
+        cls._context.clear()
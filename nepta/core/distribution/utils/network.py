@@ -6,6 +6,7 @@ from nepta.core import model
 from nepta.core.model.network import Interface
 from nepta.core.distribution.command import Command
 from nepta.core.distribution.utils.system import Uname, SystemD
+from nepta.core.distribution.utils.procfs import SysFs
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +15,10 @@ class IpCommand:
     class Link:
         @classmethod
         def get_interface_name(cls, mac):
+            try:
+                return SysFs.interface_by_mac(mac)
+            except OSError as e:
+                logger.debug(f'Cannot read interfaces from sysfs: {e}')
             mac_regex = r"[0-9]*: (.*):.*\n.*link/ether (%s)" % mac
             link_cmd = Command("ip link")
             link_cmd.run()
@@ -26,6 +31,10 @@ class IpCommand:
         @classmethod
         def get_all_interfaces(cls):
             logger.debug("Getting all interfaces")
+            try:
+                return list(SysFs.link_names().values())
+            except OSError as e:
+                logger.debug(f'Cannot read interfaces from sysfs: {e}')
             link_cmd = Command("ip link")
             link_cmd.run()
 
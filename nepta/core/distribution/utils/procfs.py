@@ -0,0 +1,152 @@
+import os
+from typing import Dict, List, Optional
+
+from nepta.core.distribution.cassette import Cassette
+
+
+class ProcFs:
+    """
+    Readers of local /proc files, which replace spawning of commands like `nproc` or `cat /proc/interrupts`. Methods
+    raise `OSError` when the file is not available, so callers can fall back to the commands. Reads are recorded and
+    replayed by `Cassette` the same as commands.
+    """
+
+    ROOT = "/proc"
+
+    @staticmethod
+    def _read_file(path: str) -> str:
+        with open(path, "r") as fd:
+            return fd.read()
+
+    @classmethod
+    def read(cls, name: str) -> str:
+        path = os.path.join(cls.ROOT, name)
+        return Cassette.read(path, lambda: cls._read_file(path))
+
+    @staticmethod
+    def nproc() -> int:
+        """
+        :return: number of CPUs available to this process, the same number as `nproc` prints
+        """
+        return Cassette.read("sched_getaffinity", lambda: len(os.sched_getaffinity(0)))
+
+    @classmethod
+    def meminfo(cls) -> Dict[str, int]:
+        """
+        :return: values of /proc/meminfo, sizes are converted to bytes
+        """
+        info = {}
+        for line in cls.read("meminfo").splitlines():
+            key, _, value = line.partition(":")
+            value, *unit = value.split()
+            info[key] = int(value) * 1024 if unit == ["kB"] else int(value)
+        return info
+
+    @classmethod
+    def total_memory(cls) -> int:
+        return cls.meminfo()["MemTotal"]
+
+    @classmethod
+    def interrupts(cls) -> str:
+        return cls.read("interrupts")
+
+
+class SysFs:
+    """
+    Readers of local /sys files. Methods raise `OSError` when the files are not available. Reads are recorded and
+    replayed by `Cassette` the same as commands.
+    """
+
+    NET_ROOT = "/sys/class/net"
+
+    # subset of ARPHRD_* constants, see linux/if_arp.h
+    LINK_TYPES = {1: "ether", 24: "ieee1394", 32: "infiniband", 512: "ppp", 772: "loopback", 65534: "none"}
+    # subset of IFF_* flags in the order used by `ip link`, see linux/if.h
+    FLAGS = [
+        ("LOOPBACK", 0x8),
+        ("BROADCAST", 0x2),
+        ("POINTOPOINT", 0x10),
+        ("NOARP", 0x80),
+        ("PROMISC", 0x100),
+        ("MULTICAST", 0x1000),
+        ("UP", 0x1),
+        ("LOWER_UP", 0x10000),
+    ]
+
+    @staticmethod
+    def _read_attr(path: str) -> Optional[str]:
+        try:
+            with open(path, "r") as fd:
+                return fd.read().strip()
+        except OSError:
+            # some attributes cannot be read when the interface is down (e.g. speed)
+            return None
+
+    @classmethod
+    def _read_net(cls, ifname: str, attr: str) -> Optional[str]:
+        path = os.path.join(cls.NET_ROOT, ifname, attr)
+        return Cassette.read(path, lambda: cls._read_attr(path))
+
+    @classmethod
+    def interface_names(cls) -> List[str]:
+        """
+        :return: names of network interfaces ordered by their index
+        """
+        names = Cassette.read(cls.NET_ROOT, lambda: os.listdir(cls.NET_ROOT))
+        return sorted(names, key=lambda name: int(cls._read_net(name, "ifindex") or 0))
+
+    @classmethod
+    def link_names(cls) -> Dict[str, str]:
+        """
+        Stacked interfaces (VLAN, macvlan, veth, ...) are named with their parent in `ip link` output, e.g.
+        `eth0.100@eth0`. Parent in other network namespace is shown as `if<index>` and missing parent as `NONE`.
+        :return: interface names mapped to the names used by `ip link`, ordered by interface index
+        """
+        names = cls.interface_names()
+        indexes = {cls._read_net(name, "ifindex"): name for name in names}
+        link_names = {}
+        for name in names:
+            iflink = cls._read_net(name, "iflink")
+            if iflink is None or iflink == cls._read_net(name, "ifindex"):
+                link_names[name] = name
+            elif iflink == "0":
+                link_names[name] = f'{name}@NONE'
+            else:
+                link_names[name] = f'{name}@{indexes.get(iflink, "if" + iflink)}'
+        return link_names
+
+    @classmethod
+    def interface(cls, ifname: str) -> dict:
+        """
+        :return: description of the interface with the same keys as `ip -j link` uses
+        """
+        flags = int(cls._read_net(ifname, "flags") or "0", 16)
+        if cls._read_net(ifname, "carrier") == "1":
+            flags |= 0x10000  # IFF_LOWER_UP is not exported in sysfs flags
+        link_type = int(cls._read_net(ifname, "type") or 0)
+        return {
+            "ifindex": int(cls._read_net(ifname, "ifindex") or 0),
+            "ifname": ifname,
+            "flags": [name for name, bit in cls.FLAGS if flags & bit],
+            "mtu": int(cls._read_net(ifname, "mtu") or 0),
+            "operstate": (cls._read_net(ifname, "operstate") or "unknown").upper(),
+            "link_type": cls.LINK_TYPES.get(link_type, str(link_type)),
+            "address": cls._read_net(ifname, "address"),
+            "broadcast": cls._read_net(ifname, "broadcast"),
+        }
+
+    @classmethod
+    def interfaces(cls) -> Dict[str, dict]:
+        return {name: cls.interface(name) for name in cls.interface_names()}
+
+    @classmethod
+    def interface_by_mac(cls, mac: str) -> Optional[str]:
+        """
+        :return: name of the interface with the hardware address as `ip link` shows it, None if there is no such
+            interface
+        """
+        mac = mac.lower()
+        for name, link_name in cls.link_names().items():
+            if cls._read_net(name, "address") == mac:
+                return link_name
+        return None
@@ -1,10 +1,13 @@
 import logging
+import os
 import re
 import abc
 from enum import Enum
 from typing import Tuple, Optional
 
 from nepta.core.distribution.command import Command
+from nepta.core.distribution.cassette import Cassette
+from nepta.core.distribution.probe import ProbeCache
 from nepta.core.model.system import SystemService, KernelModule, TimeZone
 
 logger = logging.getLogger(__name__)
@@ -19,9 +22,12 @@ class Uname:
 
     @classmethod
     def _exec(cls):
-        uname_command = Command(cls.UNAME_CMD).run()
-        uname_string = uname_command.get_output()[0]
-        return uname_string.split()
+        try:
+            # os.uname fields are in the same order as `uname -a` output
+            return Cassette.read("uname", lambda: list(os.uname()))
+        except AttributeError:
+            uname_string = ProbeCache.run(cls.UNAME_CMD)[0]
+            return uname_string.split()
 
     @classmethod
     def get_version(cls):
@@ -37,9 +43,7 @@ class RPMTool:
 
     @classmethod
     def get_src_name(cls, pkg_nvr) -> Optional[str]:
-        rpm_cmd = Command("%s -q -i %s" % (cls.CMD_RPM, pkg_nvr))
-        rpm_cmd.run()
-        out, _ = rpm_cmd.get_output()
+        out, _ = ProbeCache.run("%s -q -i %s" % (cls.CMD_RPM, pkg_nvr))
         re_match = re.search(r"Source\s+RPM\s*:\s+(?P<all_src_name>.*[^\n])", out, re.MULTILINE)
         if re_match:
             src_name = re_match.group("all_src_name")
@@ -49,8 +53,7 @@ class RPMTool:
 
     @classmethod
     def get_src_name_from_file(cls, path) -> Optional[str]:
-        rpm_cmd = Command(f'{cls.CMD_RPM} -qif {path}').run()
-        out, _ = rpm_cmd.get_output()
+        out, _ = ProbeCache.run(f'{cls.CMD_RPM} -qif {path}')
         re_match = re.search(r"Source\s+RPM\s*:\s+(?P<all_src_name>.*[^\n])", out, re.MULTILINE)
         if re_match:
             return re_match.group("all_src_name")
@@ -59,9 +62,7 @@ class RPMTool:
 
     @classmethod
     def get_package_version(cls, package) -> Optional[str]:
-        rpm_cmd = Command("%s -q %s" % (cls.CMD_RPM, package))
-        rpm_cmd.run()
-        out, ret_code = rpm_cmd.watch_output()
+        out, ret_code = ProbeCache.run("%s -q %s" % (cls.CMD_RPM, package))
         if ret_code == 0 and len(out):
             first_match = out.split()[0]  # strip whitespaces
             #  "kernel-4.18.0-67.el8.x86_64".split("kernel-") -> [[], ['4.18.0-67.el8.x86_64']]
@@ -73,9 +74,7 @@ class RPMTool:
 class SELinux:
     @staticmethod
     def getenforce():
-        cmd = Command("getenforce")
-        cmd.run()
-        out, ret_code = cmd.get_output()
+        out, ret_code = ProbeCache.run("getenforce")
         out = out.split()[0]  # skipping new line character
         return out
 
@@ -84,6 +83,7 @@ class SELinux:
         cmd = Command("setenforce %s" % level)
         cmd.run()
         out, ret_code = cmd.watch_output()
+        ProbeCache.invalidate("getenforce")
         return out
 
 
@@ -92,13 +92,14 @@ class Tuned(object):
     def set_profile(profile):
         cmd = Command("tuned-adm profile %s" % profile)
         cmd.run()
-        return cmd.watch_output()
+        try:
+            return cmd.watch_output()
+        finally:
+            ProbeCache.invalidate("tuned-adm active")
 
     @staticmethod
     def get_profile():
-        cmd = Command("tuned-adm active")
-        cmd.run()
-        out, ret = cmd.watch_output()
+        out, ret = ProbeCache.run("tuned-adm active")
         if ret:
             return None
         re_match = re.search(r".*: (.*)\n", out)
@@ -111,10 +112,8 @@ class Tuned(object):
 class Lscpu:
     @staticmethod
     def parse_output_into_dict():
-        cmd = Command("lscpu")
         ret_dict = {}
-        cmd.run()
-        out, ret_code = cmd.watch_output()
+        out, ret_code = ProbeCache.run("lscpu")
         for line in out.split("\n"):
             if line:  # skip blank line
                 first_double_dot = line.find(":")
@@ -1,4 +1,5 @@
 from nepta.core.distribution.command import Command, ShellCommand
+from nepta.core.distribution.probe import ProbeCache
 from packaging import version
 
 import re
@@ -38,9 +39,7 @@ class Tuna:
 
     @staticmethod
     def get_version() -> version.Version:
-        rpm_cmd = Command("rpm -q tuna")
-        rpm_cmd.run()
-        out, ret_code = rpm_cmd.watch_output()
+        out, ret_code = ProbeCache.run("rpm -q tuna")
         nevra = split_nevra(out)
         ver = version.parse("%s-%s" % (nevra.version, nevra.release.split(".")[0]))
         return ver
@@ -1,9 +1,13 @@
 import copy
+import json
+import heapq
 import logging
 import itertools
-from collections import OrderedDict, defaultdict
+import weakref
+from collections import OrderedDict, defaultdict, deque
 from nepta.core.model.system import Value
-from typing import Dict
+from nepta.core.model.selector import ComponentSelector, PathSelector, first_match
+from typing import Callable, Dict, Iterator, Optional, Sequence, TextIO
 
 logger = logging.getLogger(__name__)
 
@@ -20,13 +24,135 @@ class DupliciteConfException(BundleException):
     pass
 
 
+class _StructureIndex(object):
+    """
+    Structure flag of a tree (see `Bundle._scan_structure`) cached until the tree is modified. It is replaced by
+    `_TypeIndex` when components of the tree are queried.
+    """
+
+    def __init__(self, root):
+        self.aliased = any(root._scan_structure())
+
+
+class _TypeIndex(object):
+    """
+    Index of all components reachable from a bundle. Components are grouped by their exact type, so class queries
+    only have to check each indexed type once and the rest of the lookup is proportional to the result size.
+    """
+
+    def __init__(self, root):
+        self.nodes = []  # reachable bundles in BFS order
+        self.parents = {root: (None, None)}  # spanning tree, node -> (parent, attribute name)
+        self.entries = []  # (order, node, attribute name or None for local components, component)
+        self.by_type = OrderedDict()  # type -> entries of components with exactly this type
+        self.aliased = False  # some node is reachable by more than one path (bypass or cycle)
+        self._lookups = {}
+
+        queue = deque([root])
+        while queue:
+            node = queue.popleft()
+            self.nodes.append(node)
+            for component in node._components:
+                self._add(node, None, component)
+            for name, child in node._bundles.items():
+                if isinstance(child, Bundle):
+                    if child in self.parents:
+                        self.aliased = True
+                    else:
+                        self.parents[child] = (node, name)
+                        queue.append(child)
+                elif type(child) == list:
+                    for item in child:
+                        self._add(node, name, item)
+                else:
+                    self._add(node, name, child)
+
+    def _add(self, node, name, component):
+        entry = (len(self.entries), node, name, component)
+        self.entries.append(entry)
+        self.by_type.setdefault(type(component), []).append(entry)
+
+    @staticmethod
+    def _type_matches(c_type, m_class, m_type, exclude):
+        if m_class and m_type:
+            return (issubclass(c_type, m_class) and c_type == m_type) ^ exclude
+        elif m_class:
+            return issubclass(c_type, m_class) ^ exclude
+        elif m_type:
+            return (c_type == m_type) ^ exclude
+        else:
+            return False ^ exclude
+
+    def lookup(self, m_class=None, m_type=None, exclude=False):
+        key = (m_class, m_type, exclude)
+        if key not in self._lookups:
+            matching = [
+                entries
+                for c_type, entries in self.by_type.items()
+                if self._type_matches(c_type, m_class, m_type, exclude)
+            ]
+            # keep the traversal order of the tree, same as `get_all_components`
+            self._lookups[key] = matching[0] if len(matching) == 1 else list(heapq.merge(*matching))
+        return self._lookups[key]
+
+    def subset(self, m_class=None, m_type=None, exclude=False):
+        """
+        Build a new tree which contains only matching components and the nodes on the paths leading to them.
+        """
+        entries = self.lookup(m_class, m_type, exclude)
+        needed = set()
+        for _, node, _, _ in entries:
+            while node is not None and node not in needed:
+                needed.add(node)
+                node = self.parents[node][0]
+
+        root = self.nodes[0]
+        lookup_table = {root: Bundle()}
+        for node in self.nodes[1:]:  # parents are always created before their children
+            if node in needed:
+                parent, name = self.parents[node]
+                lookup_table[node] = Bundle()
+                setattr(lookup_table[parent], name, lookup_table[node])
+
+        for _, node, name, component in entries:
+            new = lookup_table[node]
+            if name is None:
+                new._components.append(component)
+            elif type(node._bundles[name]) == list:
+                new._bundles.setdefault(name, []).append(component)
+            else:
+                new._bundles[name] = component
+        return lookup_table[root]
+
+
 class Bundle(object):
-    _properties = ["_bundles", "_components", "_parents", "__deepcopy__", "__getstate__"]
+    """
+    Tree of configuration objects. Copies created by `copy` (and `Bundle(other)`, `a + b`) are copy-on-write. A copied
+    node keeps a reference to its source node (`_cow_source`) and its own components and children are created only
+    when they are accessed for the first time. Any modification of the source node materializes all pending copies
+    first, so the copies always hold the tree structure at the time of copying. Objects are shared by copies anyway,
+    `clone` copies the whole tree with its objects immediately.
+    """
+
+    _properties = [
+        "_bundles",
+        "_components",
+        "_parents",
+        "_index",
+        "_cow_source",
+        "_cow_dependents",
+        "__deepcopy__",
+        "__getstate__",
+        "__setstate__",
+    ]
 
     def __init__(self, clone=None):
         self._components = []  # configuration objects of this bundle
         self._bundles = OrderedDict()  # tree nodes (children)
         self._parents = []
+        self._index = None  # lazily built `_TypeIndex` or `_StructureIndex` of the whole subtree
+        self._cow_source = None  # source node of not yet materialized copy
+        self._cow_dependents = None  # weak references to pending copies of this node
         if clone is not None:
             self += clone
 
@@ -41,6 +167,8 @@ class Bundle(object):
 
     def __getattr__(self, key):
         if key in self.__class__._properties:
+            if key in ("_components", "_bundles") and self.__dict__.get("_cow_source") is not None:
+                self._cow_resolve()
             return super().__getattribute__(key)
         else:
             if key not in self._bundles:
@@ -49,6 +177,7 @@ class Bundle(object):
 
     def __setattr__(self, key, value):
         if key not in self.__class__._properties:
+            self._prepare_write()
             new_item = not (key in self._bundles and value == self._bundles[key])
             if isinstance(value, list):
                 self._bundles[key] = Bundle().add_multiple_components(*value)
@@ -63,6 +192,7 @@ class Bundle(object):
 
     def __delattr__(self, item):
         if item not in self.__class__._properties:
+            self._prepare_write()
             poped = self._bundles.pop(item)
             if isinstance(poped, Bundle):
                 poped._parents.remove(self)
@@ -95,6 +225,17 @@ class Bundle(object):
                     setattr(new, local_child_name, copy.deepcopy(local_child_value))
         return lookup_table[self]
 
+    def __getstate__(self):
+        if self.__dict__.get("_cow_source") is not None:
+            self._cow_resolve()
+        state = dict(self.__dict__)
+        state["_index"] = None
+        state["_cow_dependents"] = None  # weak references cannot be pickled and copies are materialized anyway
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
     def has_node(self, node_name):
         return node_name in self._bundles
 
@@ -106,10 +247,12 @@ class Bundle(object):
         return len(self.get_all_components())
 
     def add_component(self, component):
+        self._prepare_write()
         self._components.append(component)
         return self
 
     def add_multiple_components(self, *args):
+        self._prepare_write()
         self._components.extend(list(args))
         return self
 
@@ -122,17 +265,141 @@ class Bundle(object):
         Configuration objects from each tree node are appended to `component_list`.
         :return: List of all configuration object in tree structure.
         """
-        components_list = []
+        return [component for _, _, _, component in self._get_index().entries]
+
+    def find_components(self, m_class=None, m_type=None, exclude=False):
+        """
+        Find components of the whole tree by their class (including subclasses) and/or exact type. The lookup uses
+        type index of the tree, so it does not copy or traverse the tree again.
+        :return: List of matching configuration objects in the same order as `get_all_components`.
+        """
+        return [component for _, _, _, component in self._get_index().lookup(m_class, m_type, exclude)]
+
+    def _get_index(self):
+        if not isinstance(self._index, _TypeIndex):
+            self._index = _TypeIndex(self)
+        return self._index
+
+    def _get_structure(self):
+        """
+        Structure flags of the tree. Cached index is used if it exists, otherwise the tree is scanned without
+        materializing pending copies and the result is cached until the tree is modified.
+        """
+        if self._index is None:
+            self._index = _StructureIndex(self)
+        return self._index
 
-        for node in self._serialize_by_bfs():
-            if isinstance(node, Bundle):
-                components_list.extend([model for model in node.get_local_components()])
+    def _ancestors(self):
+        """
+        :return: List of this node and all nodes which contain it in their subtree.
+        """
+        if not self._parents:
+            return [self]
+        stack = [self]
+        visited = {self}
+        ancestors = []
+        while stack:
+            node = stack.pop()
+            ancestors.append(node)
+            for parent in node._parents:
+                if parent not in visited:
+                    visited.add(parent)
+                    stack.append(parent)
+        return ancestors
+
+    def _prepare_write(self):
+        """
+        Called before every modification of the node. Pending copies of the node and of its ancestors would see the
+        modification, so they are materialized first.
+        """
+        ancestors = self._ancestors()
+        for node in ancestors:
+            node._detach_dependents()
+        for node in ancestors:
+            node._index = None
+
+    def _detach_dependents(self):
+        """
+        Materialize pending copies of this node, so they no longer depend on its state.
+        """
+        if not self._cow_dependents:
+            return
+        dependents, self._cow_dependents = self._cow_dependents, None
+        for ref in dependents:
+            node = ref()
+            if node is not None and node._cow_source is self:
+                node._cow_resolve_all()
+
+    def _add_dependent(self, node):
+        if self._cow_dependents is None:
+            self._cow_dependents = []
+        self._cow_dependents.append(weakref.ref(node))
+
+    def _remove_dependent(self, node):
+        self._cow_dependents = [ref for ref in self._cow_dependents or [] if ref() not in (node, None)] or None
+
+    def _cow_copy(self):
+        new = Bundle.__new__(Bundle)
+        new._parents = []
+        new._index = None
+        new._cow_source = self
+        new._cow_dependents = None
+        self._add_dependent(new)
+        return new
+
+    def _cow_resolve(self):
+        """
+        Materialize one level of pending copy. Children of the node become pending copies of source children.
+        """
+        source = self._cow_source
+        self._cow_source = None
+        source._remove_dependent(self)
+
+        self._components = list(source._components)
+        self._bundles = OrderedDict()
+        for name, child in source._bundles.items():
+            if isinstance(child, Bundle):
+                new_child = child._cow_copy()
+                new_child._parents.append(self)
+                self._bundles[name] = new_child
             else:
-                components_list.append(node)
+                self._bundles[name] = child
+
+    def _cow_resolve_all(self):
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node.__dict__.get("_cow_source") is not None:
+                node._cow_resolve()
+                stack.extend(child for child in node._bundles.values() if isinstance(child, Bundle))
 
-        return components_list
+    def _has_aliases(self):
+        return self._get_structure().aliased
+
+    def _scan_structure(self):
+        """
+        Traverse nodes of the tree without materializing pending copies. It is O(tree), use `_get_structure` to
+        cache the result.
+        :return: Generator of flags whether the node is reachable more than once.
+        """
+        open_q = deque([self])
+        visited = {self}
+        while open_q:
+            node = open_q.popleft()
+            if node.__dict__.get("_cow_source") is not None:  # pending copy has the same structure as its source
+                yield from node._cow_source._scan_structure()
+                continue
+            yield False
+            for child in node._bundles.values():
+                if isinstance(child, Bundle):
+                    if child in visited:
+                        yield True
+                    else:
+                        visited.add(child)
+                        open_q.append(child)
 
     def flush_components(self):
+        self._prepare_write()
         self._components = []
         self._bundles = {}
         return self
@@ -146,22 +413,28 @@ class Bundle(object):
 
     def copy(self):
         """
-        Create a new tree strucutre of Bundles, but objects pointers are the same.
+        Create a new tree strucutre of Bundles, but objects pointers are the same. Nodes are shared with the original
+        tree until one of them is modified. Trees with bypasses or cycles are copied immediately, checking the tree
+        for them is O(tree) and its result is cached until the tree is modified.
         :return:
         """
-        return copy.copy(self)
+        if self._has_aliases():
+            return copy.copy(self)
+        return self._cow_copy()
 
     def _serialize_by_bfs(self, bundles_only=False):
-        open_q = {self}  # set
+        open_q = deque([self])
+        visited = {self}  # set of already queued bundles, so each bundle is traversed only once
         closed_q = []
         while len(open_q):
-            bundle = open_q.pop()
+            bundle = open_q.popleft()
             closed_q.append(bundle)
 
             for child in bundle._bundles.values():
                 if isinstance(child, Bundle):
-                    if child not in closed_q:  # append state into open queue only if it is not already traversed
-                        open_q.add(child)
+                    if child not in visited:  # append state into open queue only if it is not already traversed
+                        visited.add(child)
+                        open_q.append(child)
                 elif not bundles_only:
                     if type(child) == list:
                         closed_q.extend(child)
@@ -170,7 +443,10 @@ class Bundle(object):
         return closed_q
 
     def filter_components(self, filter_func):
+        self._prepare_write()
         for node in self._serialize_by_bfs(bundles_only=True):
+            node._detach_dependents()
+            node._index = None
             node._components = [cmp for cmp in node._components if filter_func(cmp)]
             for child_name, child_node in list(node._bundles.items()):
                 if not isinstance(child_node, Bundle):
@@ -179,22 +455,59 @@ class Bundle(object):
 
         return self
 
+    def prune(self, components: Sequence[ComponentSelector] = (), subtrees: Sequence[PathSelector] = ()):
+        """
+        Remove components and subtrees matching given selectors (see `nepta.core.model.selector`). All selectors are
+        applied in a single BFS traversal of the tree. Node reachable by more than one path is visited only by the
+        first one.
+        :param components: selectors of removed components
+        :param subtrees: selectors of removed subtrees and named components
+        """
+        self._prepare_write()
+        open_q = deque([(self, "")])
+        visited = {self}
+        while open_q:
+            node, path = open_q.popleft()
+            node._detach_dependents()
+            node._index = None
+            if components:
+                node._components = [cmp for cmp in node._components if not first_match(components, path, cmp)]
+            for child_name, child_node in list(node._bundles.items()):
+                child_path = f'{path}.{child_name}' if path else child_name
+                if first_match(subtrees, child_path) or (
+                    not isinstance(child_node, Bundle) and first_match(components, child_path, child_node)
+                ):
+                    logger.debug("Pruning: %s", child_path)
+                    node._bundles.pop(child_name)
+                    if isinstance(child_node, Bundle):
+                        child_node._parents.remove(node)
+                elif isinstance(child_node, Bundle) and child_node not in visited:
+                    visited.add(child_node)
+                    open_q.append((child_node, child_path))
+        return self
+
     def get_subset(self, m_class=None, m_type=None, exclude=False):
+        """
+        Select components by their class and/or exact type.
+        :return: Lazy read-only `BundleView` of this tree, which becomes a real Bundle once it is modified.
+        """
+        return BundleView(self, m_class, m_type, exclude)
+
+    def _filtered_copy(self, m_class=None, m_type=None, exclude=False):
+        index = self._get_index()
+        if not index.aliased:
+            return index.subset(m_class, m_type, exclude)
+
+        # bypasses and cycles have to be preserved, so the whole tree structure is copied and filtered
         def class_and_type_filter(component):
-            if m_class and m_type:
-                return (isinstance(component, m_class) and type(component) == m_type) ^ exclude
-            elif m_class:
-                return (isinstance(component, m_class)) ^ exclude
-            elif m_type:
-                return (type(component) == m_type) ^ exclude
-            else:
-                return False ^ exclude
+            return _TypeIndex._type_matches(type(component), m_class, m_type, exclude)
 
         ret_bundle = self.copy()
         ret_bundle.filter_components(class_and_type_filter)
         return ret_bundle
 
     def merge_bundles(self, other):
+        self._prepare_write()
         self._components.extend(other._components)
         for attr_name, value in other._bundles.items():
             if isinstance(value, Bundle):
@@ -231,11 +544,113 @@ class Bundle(object):
         return new_bundle
 
     def str_tree(self):
-        return "\n".join([str(x) for x in DisplayableNode.from_bundle("RootBundle", self)])
+        return "\n".join(TreeWriter().lines(self))
+
+
+class BundleView(object):
+    """
+    Read-only view of components of a bundle tree selected by class and/or type. The selection is evaluated on
+    demand from the type index of the viewed tree, so the view always reflects current state of the tree. Reading
+    subtrees returns nested views and never creates new nodes in the viewed tree. The first modification of the view
+    turns it into a real Bundle (filtered copy of the tree) and all following operations are delegated to it.
+    """
+
+    def __init__(self, source, m_class=None, m_type=None, exclude=False, parent=None, name=None):
+        super().__setattr__("_source", source)  # viewed Bundle or None if the subtree does not exist
+        super().__setattr__("_filter", (m_class, m_type, exclude))
+        super().__setattr__("_parent", parent)
+        super().__setattr__("_name", name)
+        super().__setattr__("_bundle", None)  # materialized Bundle
+
+    def _matches(self, component):
+        return _TypeIndex._type_matches(type(component), *self._filter)
+
+    def _select(self):
+        if self._bundle is not None:
+            return self._bundle.get_all_components()
+        if self._source is None:
+            return []
+        return self._source.find_components(*self._filter)
+
+    def _materialize(self):
+        if self._bundle is None:
+            if self._parent is not None:
+                bundle = getattr(self._parent._materialize(), self._name)
+            elif self._source is not None:
+                bundle = self._source._filtered_copy(*self._filter)
+            else:
+                bundle = Bundle()
+            super().__setattr__("_bundle", bundle)
+        return self._bundle
+
+    def __iter__(self):
+        return iter(self._select())
+
+    def __len__(self):
+        return len(self._select())
+
+    def __getitem__(self, item):
+        return self._select()[item]
+
+    def __contains__(self, item):
+        return item in self._select()
+
+    def __str__(self):
+        return "Configuration bundle view : \n" + "\n".join([str(x) for x in self._select()])
+
+    def __getattr__(self, key):
+        if self._bundle is not None or key.startswith("_") or hasattr(Bundle, key):
+            return getattr(self._materialize(), key)
+
+        child = self._source._bundles.get(key) if self._source is not None else None
+        if child is None or isinstance(child, Bundle):
+            return BundleView(child, *self._filter, parent=self, name=key)
+        if self._matches(child):
+            return child
+        return BundleView(None, *self._filter, parent=self, name=key)
+
+    def __setattr__(self, key, value):
+        setattr(self._materialize(), key, value)
+
+    def __delattr__(self, item):
+        delattr(self._materialize(), item)
+
+    def __iadd__(self, other):
+        bundle = self._materialize()
+        bundle += other
+        return self
+
+    def __add__(self, other):
+        return self._materialize() + other
+
+    def get_all_components(self):
+        return self._select()
+
+    def get_local_components(self):
+        if self._bundle is not None:
+            return self._bundle.get_local_components()
+        if self._source is None:
+            return []
+        return [cmp for cmp in self._source.get_local_components() if self._matches(cmp)]
+
+    def has_node(self, node_name):
+        if self._bundle is not None:
+            return self._bundle.has_node(node_name)
+        if self._source is None or node_name not in self._source._bundles:
+            return False
+        child = self._source._bundles[node_name]
+        return len(getattr(self, node_name)) > 0 if isinstance(child, Bundle) else self._matches(child)
+
+    def str_tree(self):
+        if self._bundle is not None:
+            return self._bundle.str_tree()
+        return (self._source._filtered_copy(*self._filter) if self._source is not None else Bundle()).str_tree()
 
 
-class DisplayableNode(object):
+class TreeWriter(object):
     """
+    Streaming renderer of bundle tree. Lines are generated during depth first traversal and prefixes are carried
+    down the recursion, so rendering is linear in the size of the tree and no intermediate nodes are kept.
     Inspired by : https://stackoverflow.com/questions/9727673/list-directory-tree-structure-in-python
     """
 
@@ -244,88 +659,167 @@ class DisplayableNode(object):
     parent_prefix_middle = "|   "
     parent_prefix_last = "    "
 
-    def __init__(self, name, label, parent, is_last):
-        self.name = name
-        self.label = label
-        self.parent = parent
-        self.parent_prefix = self.get_parent_prefix()
-        self.is_last = is_last
+    COMPONENT_LIST_NAME = "legacy component list"
 
-    @classmethod
-    def from_bundle(cls, name, node, parent=None, is_last=False, closed=None):
-        if closed is None:
-            closed = {}
+    def __init__(self, max_depth: Optional[int] = None, selectors: Sequence[ComponentSelector] = ()):
+        """
+        :param max_depth: nodes deeper than this are not rendered, root has depth 0
+        :param selectors: render only components matching some of the selectors and nodes leading to them
+        """
+        self.max_depth = max_depth
+        self.selectors = selectors
 
-        if node in closed:
-            root = cls(name, closed[node] + " [cycle]", parent, is_last)
-            yield root
-            return
-        else:
-            closed[node] = name
-            root = cls(name, None, parent, is_last)
-            yield root
+    def _selected(self, path, component):
+        return not self.selectors or first_match(self.selectors, path, component) is not None
+
+    def _has_selected(self, root):
+        """
+        :return: set of nodes whose subtree contains some selected component
+        """
+        if not self.selectors:
+            return None
+        spanning_tree = {root: (None, "")}
+        selected = set()
+        open_q = deque([root])
+        while open_q:
+            node = open_q.popleft()
+            path = spanning_tree[node][1]
+            found = any(self._selected(path, cmp) for cmp in node._components)
+            for name, child in node._bundles.items():
+                child_path = f'{path}.{name}' if path else name
+                if isinstance(child, Bundle):
+                    if child not in spanning_tree:
+                        spanning_tree[child] = (node, child_path)
+                        open_q.append(child)
+                elif hasattr(child, "__iter__"):
+                    found = found or any(self._selected(child_path, item) for item in child)
+                else:
+                    found = found or self._selected(child_path, child)
+            while found and node is not None and node not in selected:
+                selected.add(node)
+                node = spanning_tree[node][0]
+        return selected
 
-        i = 0
-        last_id = len(node._bundles.keys()) + len(node.get_local_components()) - 1
+    def _walk(self, name, root):
+        """
+        Generate items (depth, path, name, label, prefix, is_last, kind, obj) of the tree in depth first order.
+        """
+        yield 0, "", name, None, "", True, "root", root
+        yield from self._walk_children(root, "", "", 1, {root: name}, self._has_selected(root))
+
+    def _walk_children(self, node, path, prefix, depth, closed, selected):
+        children = []
         for name, child in node._bundles.items():
+            child_path = f'{path}.{name}' if path else name
             if isinstance(child, Bundle):
-                yield from cls.from_bundle(name, child, root, i == last_id, closed)
+                if selected is None or child in selected:
+                    children.append((name, child_path, child))
             elif hasattr(child, "__iter__"):
-                yield from cls.from_list(name, child, root, i == last_id)
-
+                items = [item for item in child if self._selected(child_path, item)]
+                if items or not self.selectors:
+                    children.append((name, child_path, (child, items)))
+            elif self._selected(child_path, child):
+                children.append((name, child_path, child))
+        components = [cmp for cmp in node._components if self._selected(path, cmp)]
+
+        last_id = len(children) - 1
+        for i, (name, child_path, child) in enumerate(children):
+            is_last = i == last_id and not components
+            if isinstance(child, Bundle):
+                if child in closed:
+                    yield depth, child_path, name, closed[child], prefix, is_last, "cycle", child
+                    continue
+                closed[child] = name
+                yield depth, child_path, name, None, prefix, is_last, "bundle", child
+                if self.max_depth is None or depth < self.max_depth:
+                    yield from self._walk_children(
+                        child, child_path, prefix + self._continuation(is_last), depth + 1, closed, selected
+                    )
+            elif isinstance(child, tuple):
+                yield from self._walk_list(name, child_path, child[0], child[1], prefix, depth, is_last)
             else:
-                yield cls(name, str(child), root, i == last_id)
-            i += 1
+                yield depth, child_path, name, str(child), prefix, is_last, "component", child
 
-        if len(node.get_local_components()):
-            yield from cls.from_list("legacy component list", node.get_local_components(), root, True)
-
-    @classmethod
-    def from_list(cls, name, container, parent, is_last):
-        local_list = cls("{}  #{!s}".format(name, type(container)), None, parent, is_last)
-        last_id = len(container) - 1
-        yield local_list
-        for index, model in enumerate(container):
-            yield cls(index, str(model), local_list, index == last_id)
-
-    def format_label_str(self, kv_separator=" -> ", extra_indent="\t"):
-        model_string = str(self.label)
-        striped_bundle = [x.strip() for x in model_string.split("\n")]
-        parent_continuation = self.parent_prefix_last if self.is_last else self.parent_prefix_middle
-        line_delimiter = "\n{}{}{}".format(self.parent_prefix, parent_continuation, extra_indent)
-        return kv_separator + line_delimiter.join(striped_bundle)
+        if components:
+            yield from self._walk_list(
+                self.COMPONENT_LIST_NAME, path, node._components, components, prefix, depth, True
+            )
 
-    def get_parent_prefix(self):
-        parent_prefix_list = []
-        parent = self.parent
-        while parent and parent.parent is not None:
-            parent_prefix_list.append(self.parent_prefix_last if parent.is_last else self.parent_prefix_middle)
-            parent = parent.parent
-        return "".join(reversed(parent_prefix_list))
+    def _walk_list(self, name, path, container, items, prefix, depth, is_last):
+        yield depth, path, "{}  #{!s}".format(name, type(container)), None, prefix, is_last, "list", container
+        if self.max_depth is None or depth < self.max_depth:
+            item_prefix = prefix + self._continuation(is_last)
+            last_id = len(items) - 1
+            for index, model in enumerate(items):
+                yield depth + 1, path, index, str(model), item_prefix, index == last_id, "component", model
 
-    def __str__(self):
-        if self.parent is None:
-            return self.name
+    def _continuation(self, is_last):
+        return self.parent_prefix_last if is_last else self.parent_prefix_middle
 
-        bundle_name = "{!s} {!s}".format(
-            self.child_prefix_last if self.is_last else self.child_prefix_middle, self.name
-        )
-        model_value_str = "" if self.label is None else self.format_label_str()
+    def _format_label(self, label, prefix, is_last, kv_separator=" -> ", extra_indent="\t"):
+        striped_bundle = [x.strip() for x in str(label).split("\n")]
+        line_delimiter = "\n{}{}{}".format(prefix, self._continuation(is_last), extra_indent)
+        return kv_separator + line_delimiter.join(striped_bundle)
 
-        return self.parent_prefix + bundle_name + model_value_str
+    def lines(self, bundle, name="RootBundle") -> Iterator[str]:
+        """
+        :return: generator of lines of text representation of the tree
+        """
+        for depth, _, item_name, label, prefix, is_last, kind, _ in self._walk(name, bundle):
+            if depth == 0:
+                yield item_name
+                continue
+            if kind == "cycle":
+                label += " [cycle]"
+            connector = self.child_prefix_last if is_last else self.child_prefix_middle
+            label_str = "" if label is None else self._format_label(label, prefix, is_last)
+            yield "{}{!s} {!s}{}".format(prefix, connector, item_name, label_str)
+
+    def json_lines(self, bundle) -> Iterator[str]:
+        """
+        :return: generator of JSON objects describing bundles, components and cycles of the tree, one per line
+        """
+        for depth, path, name, label, _, _, kind, obj in self._walk("RootBundle", bundle):
+            if kind == "list":
+                continue
+            record = {"depth": depth, "path": path, "kind": kind}
+            if kind == "component":
+                record["type"] = type(obj).__name__
+                if isinstance(name, int):
+                    record["index"] = name
+                record["value"] = label
+            elif kind == "cycle":
+                record["target"] = label
+            yield json.dumps(record)
+
+    def write(self, bundle, stream: TextIO, json_lines=False):
+        """
+        Write the tree into the stream line by line.
+        """
+        for line in self.json_lines(bundle) if json_lines else self.lines(bundle):
+            stream.write(line)
+            stream.write("\n")
 
 
 class HostBundle(Bundle):
     _all_confs_register: Dict[str, Dict[str, "HostBundle"]] = defaultdict(dict)
+    _factories_register: Dict[str, Dict[str, Callable[["HostBundle"], None]]] = defaultdict(dict)
+    _conf_hosts_register: Dict[str, Dict[str, None]] = defaultdict(dict)  # conf_name -> ordered set of hostnames
     _properties = Bundle._properties + ["_hostname", "_conf_name"]
 
     @classmethod
     def find(cls, hostname, conf_name):
         if hostname in cls._all_confs_register and conf_name in cls._all_confs_register[hostname]:
             return cls._all_confs_register[hostname][conf_name]
+        if hostname in cls._factories_register and conf_name in cls._factories_register[hostname]:
+            return cls._build(hostname, conf_name)
 
     @classmethod
     def filter_conf(cls, hostname=None, conf_name=None) -> list:
+        if hostname is None and conf_name is not None:
+            return [cls.find(host, conf_name) for host in cls.hosts(conf_name)]
+
+        cls._build_factories(hostname, conf_name)
         if hostname is not None:
             if conf_name is None:
                 return list(cls._all_confs_register[hostname].values())
@@ -343,10 +837,80 @@ class HostBundle(Bundle):
             else:
                 return [conf for conf in all_confs if conf.conf_name == conf_name]
 
+    @classmethod
+    def hosts(cls, conf_name) -> list:
+        """
+        :return: hostnames of all hosts which have configuration `conf_name` (built or registered by factory)
+        """
+        return list(cls._conf_hosts_register.get(conf_name, {}).keys())
+
+    @classmethod
+    def conf_names(cls, hostname=None) -> list:
+        """
+        :return: names of all configurations of given host or of all hosts if no hostname is given
+        """
+        if hostname is None:
+            return list(cls._conf_hosts_register.keys())
+        built = cls._all_confs_register.get(hostname, {})
+        factories = cls._factories_register.get(hostname, {})
+        return list(dict.fromkeys(itertools.chain(built.keys(), factories.keys())))
+
+    @classmethod
+    def register_factory(cls, hostname, conf_name, factory: Callable[["HostBundle"], None]):
+        """
+        Register function, which fills configuration of the host. The configuration is built on the first lookup by
+        `find` or `filter_conf`, so configurations which are not used are never built.
+        :param factory: function called with new empty HostBundle(hostname, conf_name)
+        """
+        if cls._is_defined(hostname, conf_name):
+            raise DupliciteConfException(f'Configuration {hostname} {conf_name} already exists')
+        cls._factories_register[hostname][conf_name] = factory
+        cls._conf_hosts_register[conf_name][hostname] = None
+
+    @classmethod
+    def factory(cls, hostname, conf_name):
+        """
+        Decorator registering configuration factory, see `register_factory`.
+        """
+
+        def decorator(func):
+            cls.register_factory(hostname, conf_name, func)
+            return func
+
+        return decorator
+
+    @classmethod
+    def _build(cls, hostname, conf_name):
+        factory = cls._factories_register[hostname].pop(conf_name)
+        try:
+            conf = cls(hostname, conf_name)
+            factory(conf)
+        except Exception:
+            cls._all_confs_register[hostname].pop(conf_name, None)
+            cls._factories_register[hostname][conf_name] = factory
+            raise
+        return conf
+
+    @classmethod
+    def _build_factories(cls, hostname=None, conf_name=None):
+        hostnames = [hostname] if hostname is not None else list(cls._factories_register.keys())
+        for host in hostnames:
+            conf_names = [conf_name] if conf_name is not None else list(cls._factories_register.get(host, {}).keys())
+            for name in conf_names:
+                if name in cls._factories_register.get(host, {}):
+                    cls._build(host, name)
+
+    @classmethod
+    def _is_defined(cls, hostname, conf_name):
+        built = cls._all_confs_register.get(hostname, {})
+        factories = cls._factories_register.get(hostname, {})
+        return conf_name in built or conf_name in factories
+
     @classmethod
     def _add_configuration(cls, conf):
-        if cls.find(conf.hostname, conf.conf_name) is None:
+        if not cls._is_defined(conf.hostname, conf.conf_name):
             cls._all_confs_register[conf.hostname][conf.conf_name] = conf
+            cls._conf_hosts_register[conf.conf_name][conf.hostname] = None
         else:
             raise DupliciteConfException(f'Configuration {conf.hostname} {conf.conf_name} already exists')
 
@@ -396,4 +960,4 @@ class SyncHost:
 
 
 class SyncServer(Value):
-    pass
+    __slots__ = ()
@@ -5,12 +5,13 @@ import copy
 from uuid import uuid5, UUID
 from collections import defaultdict
 from enum import Enum
-from typing import List, Union, Any, Optional, Iterator, Dict
+from typing import List, Union, Any, Optional, Iterator, Dict, ClassVar
 from dataclasses import dataclass, field
 
 from nepta.core.model.tag import SoftwareInventoryTag
 from nepta.core.model import system
 from nepta.core.model.schedule import Path
+from nepta.core.model.slots import add_slots
 
 IpInterface = Union[ipaddress.IPv4Interface, ipaddress.IPv6Interface]
 IpAddress = Union[ipaddress.IPv4Address, ipaddress.IPv6Address]
@@ -286,6 +287,7 @@ class MACSecInterface(Interface):
         self.ckn = ckn
 
 
+@add_slots(keep_dict=True)
 @dataclass
 class WireGuardPeer:
     """
@@ -305,6 +307,7 @@ class WireGuardPeer:
         return f'{self.endpoint_ip.ip}:{self.endpoint_port}'
 
 
+@add_slots(keep_dict=True)
 @dataclass
 class WireGuardTunnel:
     """
@@ -319,7 +322,7 @@ class WireGuardTunnel:
     index: int = field(init=False, default_factory=lambda: next(WireGuardTunnel._COUNTER))
 
     # this is used to assign unique int to each wiregaurd tunnel
-    _COUNTER: Iterator[int] = itertools.count()
+    _COUNTER: ClassVar[Iterator[int]] = itertools.count()
 
     @property
     def name(self):
@@ -336,6 +339,7 @@ class WireGuardTunnel:
         ]
 
 
+@add_slots(keep_dict=True)
 @dataclass
 class IPsecTunnel:
     class Mode(Enum):
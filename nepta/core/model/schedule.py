@@ -1,5 +1,6 @@
 import copy
 import uuid
+import itertools
 import logging
 import ipaddress as ia
 from collections import OrderedDict
@@ -11,30 +12,40 @@ from nepta.core.model.tag import HardwareInventoryTag, SoftwareInventoryTag
 logger = logging.getLogger(__name__)
 
 
+# every change of a path gets unique revision, so cached aggregates of path lists can detect modified paths
+_REVISIONS = itertools.count()
+
+
 class _PathInterface(ABC):
+    __slots__ = ()
+
     _hw_inventory: List[HardwareInventoryTag] = []
     _sw_inventory: List[SoftwareInventoryTag] = []
 
     @property
     def hw_inventory(self) -> List[HardwareInventoryTag]:
-        return self._hw_inventory
+        return list(self._hw_inventory)
 
     @property
     def sw_inventory(self) -> List[SoftwareInventoryTag]:
-        return self._sw_inventory
+        return list(self._sw_inventory)
 
     @property
     def tags(self) -> List[Union[HardwareInventoryTag, SoftwareInventoryTag]]:
         return self.hw_inventory + self.sw_inventory
 
-    @property
-    def id(self) -> uuid.UUID:
-        sorted_tags = copy.deepcopy(self.tags)
-        sorted_tags.sort()
+    @staticmethod
+    def _make_id(tags: Sequence[Union[HardwareInventoryTag, SoftwareInventoryTag]]) -> uuid.UUID:
+        # tags are immutable, so they can be sorted without copying
+        sorted_tags = sorted(tags)
         uid = uuid.uuid5(uuid.NAMESPACE_DNS, ",".join(map(str, sorted_tags)))
         logger.debug("Sorted tags : {}, generated uid: {}".format(sorted_tags, uid))
         return uid
 
+    @property
+    def id(self) -> uuid.UUID:
+        return self._make_id(self.tags)
+
     def __repr__(self):
         return self.desc
 
@@ -49,6 +60,24 @@ class _PathInterface(ABC):
 
 
 class Path(_PathInterface):
+    """
+    Path between two IP addresses. Tags, identity and description of the path are computed once and cached. They are
+    recomputed only when addresses or tags are assigned again, cpu pinning is not part of the identity.
+
+    Attributes of the path are stored in slots, `__dict__` is kept for attributes added by configuration code.
+    """
+
+    __slots__ = (
+        "_mine_ip",
+        "_their_ip",
+        "cpu_pinning",
+        "_hw_inventory",
+        "_sw_inventory",
+        "_identity",
+        "_revision",
+        "__dict__",
+    )
+
     def __init__(
         self,
         mine_ip: Union[ia.IPv4Interface, ia.IPv6Interface],
@@ -56,23 +85,72 @@ class Path(_PathInterface):
         tags: List[Union[HardwareInventoryTag, SoftwareInventoryTag]],
         cpu_pinning: Optional[Sequence[Sequence[int]]] = None,
     ):
-        self.mine_ip = mine_ip
-        self.their_ip = their_ip
+        self._mine_ip = mine_ip
+        self._their_ip = their_ip
         self.cpu_pinning = cpu_pinning
-        self._hw_inventory = [tag for tag in tags if isinstance(tag, HardwareInventoryTag)]
-        self._sw_inventory = [tag for tag in tags if isinstance(tag, SoftwareInventoryTag)]
+        self._set_tags(tags)
+
+    def _set_tags(self, tags):
+        self._hw_inventory = tuple(tag for tag in tags if isinstance(tag, HardwareInventoryTag))
+        self._sw_inventory = tuple(tag for tag in tags if isinstance(tag, SoftwareInventoryTag))
+        self.invalidate()
+
+    def invalidate(self):
+        """
+        Drop cached identity of the path. It has to be called explicitly only if path attributes are changed in place.
+        """
+        self._identity = None
+        self._revision = next(_REVISIONS)
+
+    @property
+    def mine_ip(self) -> Union[ia.IPv4Interface, ia.IPv6Interface]:
+        return self._mine_ip
+
+    @mine_ip.setter
+    def mine_ip(self, value: Union[ia.IPv4Interface, ia.IPv6Interface]):
+        self._mine_ip = value
+        self.invalidate()
+
+    @property
+    def their_ip(self) -> Union[ia.IPv4Interface, ia.IPv6Interface]:
+        return self._their_ip
+
+    @their_ip.setter
+    def their_ip(self, value: Union[ia.IPv4Interface, ia.IPv6Interface]):
+        self._their_ip = value
+        self.invalidate()
+
+    @property
+    def tags(self) -> List[Union[HardwareInventoryTag, SoftwareInventoryTag]]:
+        return list(self._hw_inventory + self._sw_inventory)
+
+    @tags.setter
+    def tags(self, tags: List[Union[HardwareInventoryTag, SoftwareInventoryTag]]):
+        self._set_tags(tags)
+
+    def _get_identity(self):
+        if self._identity is None:
+            tags = list(self._hw_inventory + self._sw_inventory)
+            desc = "{} {} <=> {}, tags:{}".format(self.__class__.__name__, self.mine_ip, self.their_ip, tags)
+            self._identity = (self._make_id(tags), desc)
+        return self._identity
+
+    @property
+    def id(self) -> uuid.UUID:
+        return self._get_identity()[0]
 
     @property
     def desc(self) -> str:
-        return "{} {} <=> {}, tags:{}".format(
-            self.__class__.__name__, self.mine_ip, self.their_ip, (self.hw_inventory + self.sw_inventory)
-        )
+        return self._get_identity()[1]
 
     def dict(self) -> dict:
-        return OrderedDict(uuid=self.id, srcip=self.mine_ip, dstip=self.their_ip, desc=self.desc)
+        uid, desc = self._get_identity()
+        return OrderedDict(uuid=uid, srcip=self.mine_ip, dstip=self.their_ip, desc=desc)
 
 
 class CongestedPath(Path):
+    __slots__ = ("limit_bandwidth", "delay", "cca")
+
     def __init__(self, mine_ip, their_ip, limit_bandwidth, delay, cca, tags, cpu_pinning=None):
         path_tags = [
             SoftwareInventoryTag("delay", delay),
@@ -92,6 +170,8 @@ class CongestedPath(Path):
 
 
 class UBenchPath(Path):
+    __slots__ = ("irq_settings",)
+
     cpu_pinning: Sequence[Sequence[Any]]
 
     def __init__(self, mine_ip, their_ip, tags, cpu_pinning, irq_settings):
@@ -99,6 +179,28 @@ class UBenchPath(Path):
         self.irq_settings = irq_settings
 
 
+class _PathListAggregates(object):
+    """
+    Cached aggregates of path list. Appended paths are added incrementally, any other change causes rebuild.
+    """
+
+    def __init__(self):
+        self.revisions = []
+        # dictionaries are used as ordered sets
+        self.hw_inventory = OrderedDict()
+        self.sw_inventory = OrderedDict()
+        self.id = None
+        self.desc = None
+
+    def extend(self, paths: Sequence[Path], revisions: List[int]):
+        for path in paths:
+            self.hw_inventory.update(dict.fromkeys(path._hw_inventory))
+            self.sw_inventory.update(dict.fromkeys(path._sw_inventory))
+        self.revisions = revisions
+        self.id = None
+        self.desc = None
+
+
 class PathList(list, _PathInterface):
     def clone(self) -> "PathList":
         return copy.deepcopy(self)
@@ -119,20 +221,39 @@ class PathList(list, _PathInterface):
     def __add__(self, other) -> "PathList":
         return self.__class__(super().__add__(other))
 
+    def _get_aggregates(self) -> _PathListAggregates:
+        revisions = [path._revision for path in self]
+        aggregates = self.__dict__.get("_aggregates")
+        if aggregates is None or aggregates.revisions != revisions[: len(aggregates.revisions)]:
+            aggregates = self._aggregates = _PathListAggregates()
+        if len(aggregates.revisions) != len(revisions):
+            aggregates.extend(self[len(aggregates.revisions) :], revisions)
+        return aggregates
+
     @property
     def hw_inventory(self) -> List[HardwareInventoryTag]:
-        return list(set(sum([path.hw_inventory for path in self], [])))
+        return list(self._get_aggregates().hw_inventory)
 
     @property
     def sw_inventory(self) -> List[SoftwareInventoryTag]:
-        return list(set(sum([path.sw_inventory for path in self], [])))
+        return list(self._get_aggregates().sw_inventory)
+
+    @property
+    def id(self) -> uuid.UUID:
+        aggregates = self._get_aggregates()
+        if aggregates.id is None:
+            aggregates.id = self._make_id(list(aggregates.hw_inventory) + list(aggregates.sw_inventory))
+        return aggregates.id
 
     def dict(self) -> dict:
         return OrderedDict(uuid=self.id, desc=self.desc, len=len(self))
 
     @property
     def desc(self) -> str:
-        return "[[" + ", ".join([p.desc for p in self]) + "]]"
+        aggregates = self._get_aggregates()
+        if aggregates.desc is None:
+            aggregates.desc = "[[" + ", ".join([p.desc for p in self]) + "]]"
+        return aggregates.desc
 
     @property
     def cpu_pinning(self):
@@ -0,0 +1,185 @@
+"""
+Selectors of configuration tree nodes and components used by `Bundle.prune`.
+
+Path selector is a dotted path relative to the tree root. Each name is a glob (`*`, `?`, `[seq]`) matching one node
+name, `**` matches any number of names, e.g. `intf.eth*` or `**.ipsec`.
+
+Component selector has format `[PATH:]TYPE[PREDICATE,...]`:
+ * PATH is optional path selector of the component, the path of component stored as named attribute includes its name
+ * TYPE is glob of class name, trailing `+` matches also subclasses, e.g. `Package`, `*Tunnel`, `Interface+`
+ * PREDICATE compares string value of (dotted) attribute of the component, `attr=value`, `attr!=value` or
+   `attr~=regex`, components without the attribute never match, commas inside brackets (e.g. `{1,3}`) or escaped
+   by backslash do not separate predicates
+Example: `intf.**:Interface+[mtu=9000]`, `IPsecTunnel[cipher~=^aes,mode.value=tunnel]`.
+"""
+
+import re
+import operator
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+class SelectorError(ValueError):
+    pass
+
+
+def _translate_glob(pattern: str) -> str:
+    """
+    Translate glob into regular expression, wildcards do not match dots separating node names.
+    """
+    regex = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        i += 1
+        if char == "*":
+            regex.append(r"[^.]*")
+        elif char == "?":
+            regex.append(r"[^.]")
+        elif char == "[" and "]" in pattern[i + 1 :]:
+            end = pattern.index("]", i + 1)
+            seq = pattern[i:end].replace("\\", "\\\\")
+            i = end + 1
+            regex.append("[^" + seq[1:] + "]" if seq.startswith("!") else "[" + seq + "]")
+        else:
+            regex.append(re.escape(char))
+    return "".join(regex)
+
+
+def _compile_path(pattern: str) -> "re.Pattern":
+    # matched paths are prefixed by dot, so every node name is preceded by one
+    regex = []
+    for name in pattern.split("."):
+        if not name:
+            raise SelectorError(f'Empty node name in path selector "{pattern}"')
+        regex.append(r"(?:\.[^.]+)*" if name == "**" else r"\." + _translate_glob(name))
+    return re.compile("".join(regex))
+
+
+class PathSelector(object):
+    """
+    Compiled path selector.
+    """
+
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+        self._regex = _compile_path(pattern)
+        self.hits = 0
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.pattern!r})'
+
+    def matches(self, path: str) -> bool:
+        """
+        :param path: dotted path of the node relative to the root of the tree
+        """
+        return self._regex.fullmatch("." + path) is not None
+
+
+def _split_predicates(predicates: str) -> List[str]:
+    """
+    Split predicates by commas, which are not escaped or nested in brackets of regular expression.
+    """
+    parts = []
+    depth = 0
+    start = 0
+    escaped = False
+    for i, char in enumerate(predicates):
+        if escaped:
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char in "([{":
+            depth += 1
+        elif char in ")]}":
+            depth = max(depth - 1, 0)
+        elif char == "," and not depth:
+            parts.append(predicates[start:i])
+            start = i + 1
+    parts.append(predicates[start:])
+    return parts
+
+
+class _Predicate(object):
+    OPERATORS: Dict[str, Callable[[str, Any], bool]] = {
+        "~=": lambda value, regex: regex.search(value) is not None,
+        "!=": operator.ne,
+        "=": operator.eq,
+    }
+
+    def __init__(self, expression: str):
+        for op, func in self.OPERATORS.items():
+            attr, sep, value = expression.partition(op)
+            if sep:
+                break
+        else:
+            raise SelectorError(f'Predicate "{expression}" has no operator, use one of {list(self.OPERATORS)}')
+        self.attrs = attr.strip().split(".")
+        if not all(self.attrs):
+            raise SelectorError(f'Predicate "{expression}" has invalid attribute name')
+        self.func = func
+        self.value: Any = value.strip()
+        if op == "~=":
+            try:
+                self.value = re.compile(self.value)
+            except re.error as e:
+                raise SelectorError(f'Predicate "{expression}" has invalid regular expression: {e}')
+
+    def __call__(self, component: Any) -> bool:
+        value = component
+        for attr in self.attrs:
+            try:
+                value = getattr(value, attr)
+            except AttributeError:
+                return False
+        return self.func(str(value), self.value)
+
+
+class ComponentSelector(object):
+    """
+    Compiled component selector. Matching of component type is evaluated only once for each type.
+    """
+
+    _SYNTAX = re.compile(r"^(?:(?P<path>[^:\[]+):)?(?P<type>[^:\[\]]+?)(?P<subclasses>\+)?(?:\[(?P<predicates>.*)\])?$")
+
+    def __init__(self, selector: str):
+        self.selector = selector
+        match = self._SYNTAX.match(selector.strip())
+        if match is None:
+            raise SelectorError(f'Invalid component selector "{selector}"')
+        self.path = PathSelector(match.group("path")) if match.group("path") else None
+        self._type_regex = re.compile(_translate_glob(match.group("type").strip()))
+        self.subclasses = bool(match.group("subclasses"))
+        predicates = match.group("predicates")
+        self.predicates: List[_Predicate] = [_Predicate(p) for p in _split_predicates(predicates)] if predicates else []
+        self._types: Dict[type, bool] = {}
+        self.hits = 0
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.selector!r})'
+
+    def matches_type(self, c_type: type) -> bool:
+        if c_type not in self._types:
+            classes = c_type.__mro__ if self.subclasses else (c_type,)
+            self._types[c_type] = any(self._type_regex.fullmatch(cls.__name__) for cls in classes)
+        return self._types[c_type]
+
+    def matches(self, path: str, component: Any) -> bool:
+        """
+        :param path: dotted path of the component relative to the root of the tree
+        """
+        return (
+            self.matches_type(type(component))
+            and (self.path is None or self.path.matches(path))
+            and all(predicate(component) for predicate in self.predicates)
+        )
+
+
+def first_match(selectors: Sequence[Any], *args: Any) -> Optional[Any]:
+    """
+    :return: first selector matching given arguments, its hit counter is incremented
+    """
+    for selector in selectors:
+        if selector.matches(*args):
+            selector.hits += 1
+            return selector
+    return None
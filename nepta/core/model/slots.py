@@ -0,0 +1,62 @@
+import dataclasses
+from typing import Any, Dict
+
+
+def add_slots(cls=None, *, weakref: bool = False, keep_dict: bool = False):
+    """
+    Class decorator which rebuilds dataclass with `__slots__` made of its fields, so its instances do not carry
+    `__dict__`. It is a replacement of `dataclass(slots=True)` which is not available in older python versions.
+    Decorated class must not use argument-less `super()`, because the class is recreated.
+
+    Subclasses should define empty `__slots__` tuple, otherwise their instances gain `__dict__` again.
+
+    :param weakref: add `__weakref__` slot, so instances can be referenced weakly
+    :param keep_dict: add `__dict__` slot, so instances still accept attributes which are not fields, fields are
+        stored in slots anyway
+    """
+
+    def wrap(cls):
+        if "__slots__" in cls.__dict__:
+            raise TypeError(f'{cls.__name__} already specifies __slots__')
+
+        cls_dict = dict(cls.__dict__)
+        field_names = tuple(f.name for f in dataclasses.fields(cls))
+        cls_dict["__slots__"] = (
+            field_names + (("__weakref__",) if weakref else ()) + (("__dict__",) if keep_dict else ())
+        )
+        for name in field_names:
+            # class attributes with default values would collide with slot descriptors
+            cls_dict.pop(name, None)
+        cls_dict.pop("__dict__", None)
+        cls_dict.pop("__weakref__", None)
+
+        new_cls = type(cls)(cls.__name__, cls.__bases__, cls_dict)
+        new_cls.__qualname__ = cls.__qualname__
+
+        if cls.__dataclass_params__.frozen:
+            # default slots state restoring uses setattr, which is forbidden on frozen instances
+            new_cls.__getstate__ = _frozen_getstate
+            new_cls.__setstate__ = _frozen_setstate
+
+        return new_cls
+
+    return wrap if cls is None else wrap(cls)
+
+
+def _frozen_getstate(self):
+    return [getattr(self, f.name) for f in dataclasses.fields(self)]
+
+
+def _frozen_setstate(self, state):
+    for f, value in zip(dataclasses.fields(self), state):
+        object.__setattr__(self, f.name, value)
+
+
+def fields_dict(obj: Any) -> Dict[str, Any]:
+    """
+    Shallow alternative of `dataclasses.asdict`, which works also with slotted dataclasses lacking `__dict__`.
+    Attributes stored in `__dict__` (see `add_slots(keep_dict=True)`) follow the fields.
+    """
+    values = {f.name: getattr(obj, f.name) for f in dataclasses.fields(obj)}
+    values.update(getattr(obj, "__dict__", {}))
+    return values
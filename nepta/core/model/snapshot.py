@@ -0,0 +1,179 @@
+import os
+import sys
+import json
+import pickle
+import hashlib
+import logging
+import importlib
+from typing import Iterable, List, Optional, Sequence
+
+from nepta.core.model.bundles import HostBundle
+from nepta.core.distribution.env import Environment, Hardware, RedhatRelease
+from nepta.core.distribution.utils.system import Uname
+
+logger = logging.getLogger(__name__)
+
+
+def import_modules(imports: Sequence[Sequence[str]]):
+    """
+    Import python modules with optional path.
+    :param imports: list of modules in format [module_name, optional_path]
+    """
+    for imp in imports:
+        module = imp[0]
+        if len(imp) == 1:
+            logger.info(f'Importing {module}')
+            importlib.import_module(module)
+        else:
+            path = imp[1]
+            sys.path.insert(0, path)
+            logger.info(f'Importing {module} from {path}')
+            importlib.import_module(module)
+            sys.path.pop(0)
+
+
+class ConfigurationSnapshot(object):
+    """
+    On-disk snapshot of `HostBundle` registry built by imported configuration modules. The snapshot is identified by
+    the list of imported modules and by the environment which configuration modules can read (host, kernel,
+    release, hardware and job variables, see `environment`). It is valid only while none of the source files used to
+    build the registry (configuration modules and nepta modules) has changed. Then the registry is loaded from the
+    snapshot instead of executing configuration code again.
+    """
+
+    FORMAT_VERSION = 2
+    # environment variables with these prefixes are part of the snapshot key, e.g. variables read by `Environment`
+    ENVIRONMENT_PREFIXES = ("RSTRNT_", "BEAKER_", "TESTING_FARM_", "LAB_CONTROLLER", "TEST", "NEPTA_")
+
+    def __init__(self, directory: str, imports: Sequence[Sequence[str]]):
+        """
+        :param directory: directory where snapshots are stored
+        :param imports: list of imported modules in format [module_name, optional_path]
+        """
+        self.directory = directory
+        self.imports = [list(imp) for imp in imports]
+
+    @classmethod
+    def environment(cls) -> dict:
+        """
+        :return: inputs of configuration modules provided by the host, which are not covered by their source files
+        """
+        return {
+            "fqdn": Environment.fqdn,
+            "kernel": Uname.get_version(),
+            "release": RedhatRelease.version,
+            "nproc": Hardware.nproc,
+            "total_memory": Hardware.total_memory,
+            "interfaces": {name: interface.get("address") for name, interface in Hardware.interfaces.items()},
+            "variables": {
+                name: value for name, value in os.environ.items() if name.startswith(cls.ENVIRONMENT_PREFIXES)
+            },
+        }
+
+    @property
+    def path(self) -> str:
+        key = json.dumps([self.FORMAT_VERSION, sys.version, self.imports, self.environment()], sort_keys=True)
+        return os.path.join(self.directory, f'conf-{hashlib.sha256(key.encode()).hexdigest()[:16]}.pickle')
+
+    @staticmethod
+    def fingerprint(files: Iterable[str]) -> Optional[str]:
+        """
+        :return: hash of paths, modification times and sizes of given files or None if some of them is missing
+        """
+        digest = hashlib.sha256()
+        for path in sorted(files):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return None
+            digest.update(f'{path}\0{stat.st_mtime_ns}\0{stat.st_size}\n'.encode())
+        return digest.hexdigest()
+
+    @staticmethod
+    def module_files(module_names: Iterable[str]) -> List[str]:
+        files = set()
+        for name in module_names:
+            module_file = getattr(sys.modules.get(name), "__file__", None)
+            if module_file and os.path.isfile(module_file):
+                files.add(os.path.abspath(module_file))
+        return sorted(files)
+
+    def _import_paths(self) -> List[str]:
+        return [imp[1] for imp in self.imports if len(imp) > 1]
+
+    def load(self) -> bool:
+        """
+        Fill `HostBundle` registry from the snapshot.
+        :return: True if a valid snapshot was loaded
+        """
+        try:
+            with open(self.path, "rb") as snapshot_file:
+                header = pickle.load(snapshot_file)
+                if header["version"] != self.FORMAT_VERSION or self.fingerprint(header["files"]) != header["digest"]:
+                    logger.info("Configuration snapshot is outdated")
+                    return False
+
+                # classes defined in configuration modules must be importable during loading
+                paths = self._import_paths()
+                sys.path[:0] = paths
+                try:
+                    confs = pickle.load(snapshot_file)
+                finally:
+                    del sys.path[: len(paths)]
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning(f'Cannot load configuration snapshot {self.path}: {e!r}')
+            return False
+
+        if any(imp[0] in sys.modules for imp in self.imports):
+            # configuration module was imported while loading its classes, so registry is already built
+            logger.info("Configuration modules were imported, configuration snapshot is not used")
+            return True
+
+        for conf in confs:
+            HostBundle._add_configuration(conf)
+        logger.info(f'Configuration was loaded from snapshot {self.path}')
+        return True
+
+    def save(self, module_names: Iterable[str], confs: List[HostBundle]):
+        """
+        Store configurations into the snapshot. Saving is best effort, configurations which cannot be pickled
+        only disable the snapshot.
+        :param module_names: names of modules imported during building of the configurations
+        :param confs: configurations built by imported modules
+        """
+        files = self.module_files(set(module_names) | {name for name in sys.modules if name.startswith("nepta.")})
+        header = {"version": self.FORMAT_VERSION, "files": files, "digest": self.fingerprint(files)}
+        try:
+            register = pickle.dumps(confs, pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.warning(f'Configuration cannot be stored into snapshot: {e!r}')
+            return
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f'{self.path}.{os.getpid()}.tmp'
+            with open(tmp_path, "wb") as snapshot_file:
+                pickle.dump(header, snapshot_file, pickle.HIGHEST_PROTOCOL)
+                snapshot_file.write(register)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f'Cannot write configuration snapshot {self.path}: {e}')
+
+    def import_configuration(self):
+        """
+        Load the registry from a valid snapshot or import configuration modules and store a new snapshot.
+        """
+        if self.load():
+            return
+        loaded_modules = set(sys.modules)
+        loaded_confs = set(map(id, HostBundle.filter_conf()))
+        import_modules(self.imports)
+        if any(HostBundle._factories_register.values()):
+            logger.info("Configuration is built by factories on demand, configuration snapshot is not stored")
+            return
+        self.save(
+            set(sys.modules) - loaded_modules,
+            [conf for conf in HostBundle.filter_conf() if id(conf) not in loaded_confs],
+        )
@@ -1,13 +1,17 @@
 from dataclasses import dataclass, field
 from typing import Any, List, Tuple
 
+from nepta.core.model.slots import add_slots
 
+
+@add_slots
 @dataclass(frozen=True)
 class SystemService:
     name: str
     enable: bool = True
 
 
+@add_slots
 @dataclass(frozen=True)
 class KeyValue:
     key: str
@@ -15,25 +19,26 @@ class KeyValue:
 
 
 class Repository(KeyValue):
-    pass
+    __slots__ = ()
 
 
 class SysctlVariable(KeyValue):
-    pass
+    __slots__ = ()
 
 
 class SSHConfigItem(KeyValue):
-    pass
+    __slots__ = ()
 
 
 class SSHDConfigItem(KeyValue):
-    pass
+    __slots__ = ()
 
 
 class KDumpOption(KeyValue):
-    pass
+    __slots__ = ()
 
 
+@add_slots
 @dataclass(frozen=True)
 class SSHIdentity:
     name: str
@@ -41,27 +46,29 @@ class SSHIdentity:
     public_key: str
 
 
+@add_slots
 @dataclass(frozen=True)
 class Value:
     value: Any
 
 
 class RcLocalScript(Value):
-    pass
+    __slots__ = ()
 
 
 class SSHAuthorizedKey(Value):
-    pass
+    __slots__ = ()
 
 
 class Package(Value):
-    pass
+    __slots__ = ()
 
 
 class TimeZone(Value):
-    pass
+    __slots__ = ()
 
 
+@add_slots
 @dataclass(frozen=True)
 class SpecialPackage:
     name: str
@@ -70,21 +77,22 @@ class SpecialPackage:
 
 
 class NTPServer(Value):
-    pass
+    __slots__ = ()
 
 
 class TunedAdmProfile(Value):
-    pass
+    __slots__ = ()
 
 
 class SetupCommand(Value):
-    pass
+    __slots__ = ()
 
 
 class PrepareCommand(Value):
-    pass
+    __slots__ = ()
 
 
+@add_slots
 @dataclass(frozen=True)
 class VirtualGuest:
     name: str
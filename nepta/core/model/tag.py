@@ -1,14 +1,37 @@
+import weakref
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, ClassVar
 from functools import total_ordering
 
+from nepta.core.model.slots import add_slots
+
 
 @total_ordering
-@dataclass(repr=False, unsafe_hash=True)
+@add_slots(weakref=True)
+@dataclass(frozen=True, repr=False, unsafe_hash=True)
 class GenericTag:
+    """
+    Immutable tag. Equal tags are interned, so the same tag created for many paths or tunnels is stored only once.
+    """
+
     name: str
     value: Optional[str] = None
 
+    _INTERNED: ClassVar[weakref.WeakValueDictionary] = weakref.WeakValueDictionary()
+
+    def __new__(cls, name, value=None):
+        # type of value is part of the key, because hash equal values (1, True) have different representations
+        key = (cls, name, type(value), value)
+        try:
+            return cls._INTERNED[key]
+        except KeyError:
+            tag = object.__new__(cls)
+            cls._INTERNED[key] = tag
+            return tag
+        except TypeError:
+            # unhashable value cannot be interned
+            return object.__new__(cls)
+
     def __repr__(self):
         if self.value:
             return "{}-{}".format(self.name, self.value)
@@ -16,6 +39,8 @@ class GenericTag:
             return self.name
 
     def __eq__(self, other):
+        if self is other:
+            return True
         if not isinstance(other, GenericTag):
             raise NotImplementedError
         return self.name == other.name and self.value == other.value
@@ -29,10 +54,19 @@ class GenericTag:
     def __add__(self, other):
         return self.__class__("{}-{}".format(self.__repr__(), other.__repr__()))
 
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return self.__class__, (self.name, self.value)
+
 
 class HardwareInventoryTag(GenericTag):
-    pass
+    __slots__ = ()
 
 
 class SoftwareInventoryTag(GenericTag):
-    pass
+    __slots__ = ()
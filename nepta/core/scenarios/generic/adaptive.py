@@ -0,0 +1,75 @@
+import math
+import statistics
+from typing import Dict, List, Sequence
+
+
+class AdaptiveRuns(object):
+    """
+    Sequential stopping rule for repeated runs of a test case. Runs are repeated until the half-width of confidence
+    interval of mean throughput is lower or equal to `precision` percent of the mean, but at least `min_runs` and at
+    most `max_runs` times.
+
+    Usage:
+        -> Iperf3TCPStream(..., adaptive_runs=AdaptiveRuns(precision=2, min_runs=3, max_runs=15))
+    """
+
+    # two-sided Student's t quantiles for 1..30 degrees of freedom, the last one is used for more runs
+    # fmt: off
+    T_TABLE: Dict[float, List[float]] = {
+        0.90: [
+            6.314, 2.920, 2.353, 2.132, 2.015, 1.943, 1.895, 1.860, 1.833, 1.812,
+            1.796, 1.782, 1.771, 1.761, 1.753, 1.746, 1.740, 1.734, 1.729, 1.725,
+            1.721, 1.717, 1.714, 1.711, 1.708, 1.706, 1.703, 1.701, 1.699, 1.697,
+        ],
+        0.95: [
+            12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+            2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+            2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+        ],
+        0.99: [
+            63.657, 9.925, 5.841, 4.604, 4.032, 3.707, 3.499, 3.355, 3.250, 3.169,
+            3.106, 3.055, 3.012, 2.977, 2.947, 2.921, 2.898, 2.878, 2.861, 2.845,
+            2.831, 2.819, 2.807, 2.797, 2.787, 2.779, 2.771, 2.763, 2.756, 2.750,
+        ],
+    }
+    # fmt: on
+
+    def __init__(self, precision: float = 2.0, min_runs: int = 3, max_runs: int = 10, confidence: float = 0.95):
+        if confidence not in self.T_TABLE:
+            raise ValueError(f'Confidence must be one of {sorted(self.T_TABLE)}.')
+        if not 2 <= min_runs <= max_runs:
+            raise ValueError("At least two runs are needed for confidence interval and min_runs <= max_runs.")
+        self.precision = precision
+        self.min_runs = min_runs
+        self.max_runs = max_runs
+        self.confidence = confidence
+
+    def __repr__(self):
+        return (
+            f'{self.__class__.__name__}(precision={self.precision}, min_runs={self.min_runs}, '
+            f'max_runs={self.max_runs}, confidence={self.confidence})'
+        )
+
+    def t_value(self, runs: int) -> float:
+        table = self.T_TABLE[self.confidence]
+        return table[min(runs - 1, len(table)) - 1]
+
+    def half_width(self, values: Sequence[float]) -> float:
+        """
+        :return: half-width of confidence interval in percent of the mean, infinity if it cannot be computed
+        """
+        if len(values) < 2:
+            return math.inf
+        mean = statistics.mean(values)
+        if not mean:
+            return math.inf
+        return 100 * self.t_value(len(values)) * statistics.stdev(values) / math.sqrt(len(values)) / abs(mean)
+
+    def is_done(self, values: Sequence[float], runs: int) -> bool:
+        """
+        :param values: throughput of successful runs
+        :param runs: number of all executed runs
+        """
+        if runs >= self.max_runs:
+            return True
+        return len(values) >= self.min_runs and self.half_width(values) <= self.precision
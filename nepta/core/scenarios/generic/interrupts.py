@@ -1,10 +1,13 @@
 import logging
 import re
 import uuid
+import numpy as np
 
 from nepta.dataformat import Section
 from nepta.core.scenarios.generic.scenario import ScenarioGeneric
 from nepta.core.distribution.command import Command
+from nepta.core.distribution.utils.procfs import ProcFs
+from nepta.core.distribution.timeseries import TimeSeries
 from nepta.core.tests import Iperf3Test
 
 logger = logging.getLogger(__name__)
@@ -22,10 +25,16 @@ class IRQBalanceCheck(ScenarioGeneric):
         self.msg_size = msg_size
         self.interrupt_cmd = Command("cat /proc/interrupts")
 
+    def read_interrupts(self) -> str:
+        try:
+            return ProcFs.interrupts()
+        except OSError:
+            self.interrupt_cmd.run()
+            return self.interrupt_cmd.watch_output()[0]
+
     def get_parsed_interrupts(self, ignore_cpu_interrupts=True):
         # TODO think about ignoring IRQ0: timer
-        self.interrupt_cmd.run()
-        cmd_out = self.interrupt_cmd.watch_output()[0].strip()
+        cmd_out = self.read_interrupts().strip()
 
         # split output by lines
         lines = cmd_out.split("\n")
@@ -61,6 +70,7 @@ class IRQBalanceCheck(ScenarioGeneric):
             -> store results into dataformat package
         """
         logger.info("Running scenario: %s" % self)
+        int_table_before = np.array(self.get_parsed_interrupts()) if TimeSeries.enabled else None
 
         for path in self.paths:
             iperf3_test = Iperf3Test(
@@ -72,6 +82,8 @@ class IRQBalanceCheck(ScenarioGeneric):
                 logger.error(f'iPerf3 {iperf3_test} test failed!!!')
 
         int_table = self.get_parsed_interrupts()
+        if int_table_before is not None:
+            self.store_interrupt_deltas(int_table_before, np.array(int_table))
         cpu_sums = [sum(int_table[y][x] for y in range(len(int_table))) for x in range(len(int_table[0]))]
 
         test_result = 1 if cpu_sums[0] < sum(cpu_sums[1:]) else 0
@@ -93,3 +105,10 @@ class IRQBalanceCheck(ScenarioGeneric):
         run.subsections.append(item)
 
         return root_sec, bool(test_result)
+
+    def store_interrupt_deltas(self, before: np.ndarray, after: np.ndarray):
+        if before.shape != after.shape:
+            logger.warning("Interrupts changed during the test, their deltas are not stored.")
+            return
+        TimeSeries.add("interrupts", after - before)
+        TimeSeries.flush(self.__class__.__name__, getattr(self.paths, "id", None), None, 0)
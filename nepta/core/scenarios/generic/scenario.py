@@ -2,10 +2,14 @@ import logging
 import time
 import uuid
 import functools
-from typing import Tuple, List, Union
+from typing import Tuple, List, Union, Dict, Optional
+import numpy as np
 from nepta.dataformat import Section
 
 from nepta.core.model.schedule import PathList, Path
+from nepta.core.tests.cmd_tool import run_concurrently
+from nepta.core.distribution.timeseries import TimeSeries
+from nepta.core.scenarios.generic.adaptive import AdaptiveRuns
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +34,33 @@ class ScenarioGeneric:
     def run_scenario(self) -> Tuple[Section, bool]:
         raise NotImplementedError
 
+    def time_series(self, tests) -> Dict[str, np.ndarray]:
+        """
+        :return: arrays of per-interval data of finished tests, which are stored for the current run
+        """
+        return {}
+
+    def store_time_series(self, tests):
+        if TimeSeries.enabled:
+            for name, array in self.time_series(tests).items():
+                TimeSeries.add(name, array)
+
+    @staticmethod
+    def store_precision(section, adaptive_runs: AdaptiveRuns, throughputs: List[float], runs: int):
+        """
+        Store settings of adaptive runs and achieved precision into test settings of the test case.
+        """
+        test_settings_sec = section.subsections.filter("test_settings")[0]
+        half_width = adaptive_runs.half_width(throughputs)
+        for key, value in [
+            ("runs", runs),
+            ("target_precision", adaptive_runs.precision),
+            ("confidence", adaptive_runs.confidence),
+            ("achieved_precision", round(half_width, 3) if half_width != float("inf") else None),
+        ]:
+            test_settings_sec.subsections.append(Section("item", key=key, value=value))
+        return section
+
 
 class StreamGeneric(ScenarioGeneric):
     def __init__(
@@ -43,7 +74,12 @@ class StreamGeneric(ScenarioGeneric):
         attempt_count: int,
         attempt_pause: int,
         result: bool = True,
+        adaptive_runs: Optional[AdaptiveRuns] = None,
     ):
+        """
+        :param adaptive_runs: runs of each test case are repeated until the throughput is precise enough, `test_runs`
+                              is ignored
+        """
         self.paths = paths
         self.test_length = test_length
         self.test_runs = test_runs
@@ -53,6 +89,7 @@ class StreamGeneric(ScenarioGeneric):
         self.attempt_count = attempt_count
         self.attempt_pause = attempt_pause
         self.result = result
+        self.adaptive_runs = adaptive_runs
 
     def __str__(self):
         ret_str = super().__str__()
@@ -112,10 +149,32 @@ class StreamGeneric(ScenarioGeneric):
         cpu = path.cpu_pinning if path.cpu_pinning else self.cpu_pinning
         self.store_msg_size(test_case_section, size, cpu)
         test_case_section.subsections.append(runs_section)
-        for _ in range(self.test_runs):
-            runs_section.subsections.append(self.run_instance(path, size))
+        max_runs = self.test_runs if self.adaptive_runs is None else self.adaptive_runs.max_runs
+        throughputs: List[float] = []
+        for run in range(max_runs):
+            run_section = self.run_instance(path, size)
+            runs_section.subsections.append(run_section)
+            TimeSeries.flush(self.__class__.__name__, path.id, test_case_section.params["uuid"], run)
+            if self.adaptive_runs is not None:
+                throughput = self.run_throughput(run_section)
+                if throughput is not None:
+                    throughputs.append(throughput)
+                if self.adaptive_runs.is_done(throughputs, run + 1):
+                    break
+        if self.adaptive_runs is not None:
+            self.store_precision(test_case_section, self.adaptive_runs, throughputs, run + 1)
         return test_case_section
 
+    @staticmethod
+    def run_throughput(section) -> Optional[float]:
+        """
+        :return: throughput stored in the run section, None for failed run
+        """
+        for item in section.subsections.filter("item"):
+            if item.params["key"] in ("throughput", "total_throughput"):
+                return float(item.params["value"])
+        return None
+
     def store_msg_size(self, section, size, cpu_pinning=None):
         section.params["uuid"] = uuid.uuid5(uuid.NAMESPACE_DNS, "msg_size=%s test_length=%s" % (size, self.test_length))
         test_settings_sec = Section("test_settings")
@@ -167,6 +226,7 @@ class SingleStreamGeneric(StreamGeneric):
     def store_instance(self, section, test):
         for k, v in self.parse_results(test).items():
             section.subsections.append(Section("item", key=k, value=v))
+        self.store_time_series([test])
         return section
 
 
@@ -190,11 +250,8 @@ class MultiStreamsGeneric(StreamGeneric):
 
         for _ in range(self.attempt_count):
             success = True
-            for test in tests:
-                test.run()
-
-            for test in tests:
-                test.watch_output()
+            # all tests are supervised by one event loop, so their outputs are read concurrently
+            run_concurrently(tests)
 
             for test in tests:
                 success &= test.success()
@@ -217,6 +274,7 @@ class MultiStreamsGeneric(StreamGeneric):
     def store_instance(self, section, tests):
         for k, v in self.parse_all_results(tests).items():
             section.subsections.append(Section("item", key=k, value=v))
+        self.store_time_series(tests)
         return section
 
 
@@ -3,12 +3,17 @@ import traceback
 import sys
 from functools import wraps
 from collections import OrderedDict
+from typing import Optional
+import numpy as np
+
+from nepta.dataformat import Section
 
 from nepta.core.scenarios.generic.scenario import info_log_func_output
 from nepta.core.scenarios.generic.scenario import SingleStreamGeneric, MultiStreamsGeneric, DuplexStreamGeneric
 
 from nepta.core.tests import Iperf3Test, Iperf3MPStat, MPStat, RemoteMPStat
-from nepta.core.tests.iperf3 import Iperf3TestResult
+from nepta.core.tests.iperf3 import Iperf3TestResult, Iperf3ResultMatrix
+from nepta.core.tests.steady_state import SteadyState
 
 logger = logging.getLogger(__name__)
 
@@ -33,10 +38,24 @@ def catch_and_log_exception(f):
 
 
 class GenericIPerf3Stream(object):
-    def __init__(self, *args, interval=None, parallel=None, **kwargs):
+    def __init__(
+        self,
+        *args,
+        interval=None,
+        parallel=None,
+        json_stream=False,
+        steady_state: Optional[SteadyState] = None,
+        **kwargs,
+    ):
+        """
+        :param json_stream: iPerf3 reports intervals as stream of JSON events, which are parsed while the test runs
+        :param steady_state: throughput of steady part of intervals is stored next to the iPerf3 results
+        """
         super(GenericIPerf3Stream, self).__init__(*args, **kwargs)
         self.interval = interval
         self.parallel = parallel
+        self.json_stream = json_stream or None
+        self.steady_state = steady_state
 
     @staticmethod
     def log_iperf3_error(out_json):
@@ -57,6 +76,49 @@ class GenericIPerf3Stream(object):
     def num_instances(self) -> int:
         return len(getattr(self, "cpu_pinning", []))
 
+    @info_log_func_output
+    @catch_and_log_exception
+    def parse_steady_state(self, tests):
+        intervals = [test.get_intervals() for test in tests if isinstance(test, Iperf3Test)]
+        length = min(len(i) for i in intervals)
+        throughput = np.sum([i["bits_per_second"][:length] for i in intervals], axis=0)
+        result = self.steady_state.detect(throughput, intervals[0]["start"][:length], intervals[0]["end"][:length])
+
+        result_dict = OrderedDict()
+        result_dict["steady_throughput"] = self.mbps(result.mean)
+        result_dict["steady_start"] = self.str_round(result.start)
+        result_dict["steady_end"] = self.str_round(result.end)
+        result_dict["steady_cv"] = self.str_round(result.cv, 4)
+        result_dict["steady_detected"] = result.detected
+        return result_dict
+
+    def store_instance(self, section, tests):
+        """
+        Store iPerf3 results of the whole test and results of its steady part, if `steady_state` is set.
+        """
+        section = super().store_instance(section, tests)
+        if self.steady_state is not None:
+            for k, v in self.parse_steady_state(tests if isinstance(tests, list) else [tests]).items():
+                section.subsections.append(Section("item", key=k, value=v))
+        return section
+
+    def time_series(self, tests):
+        series = OrderedDict()
+        iperf3_tests = [test for test in tests if isinstance(test, Iperf3Test)]
+        for i, test in enumerate(iperf3_tests):
+            intervals = test.get_intervals()
+            series[f'iperf3_{i}'] = intervals.aggregate
+            series[f'iperf3_{i}_streams'] = intervals.streams()
+            if isinstance(test, Iperf3MPStat):
+                series[f'mpstat_local_{i}'] = test._loc_mpstat.samples()
+                series[f'mpstat_remote_{i}'] = test._rem_mpstat.samples()
+        for test in tests:
+            if isinstance(test, RemoteMPStat):
+                series["mpstat_remote"] = test.samples()
+            elif isinstance(test, MPStat):
+                series["mpstat_local"] = test.samples()
+        return series
+
 
 #######################################################################################################################
 # Single stream scenarios
@@ -66,7 +128,12 @@ class GenericIPerf3Stream(object):
 class Iperf3Stream(GenericIPerf3Stream, SingleStreamGeneric):
     def init_test(self, path, size):
         iperf_test = Iperf3MPStat(
-            client=path.their_ip.ip, bind=path.mine_ip.ip, time=self.test_length, len=size, interval=self.interval
+            client=path.their_ip.ip,
+            bind=path.mine_ip.ip,
+            time=self.test_length,
+            len=size,
+            interval=self.interval,
+            json_stream=self.json_stream,
         )
         if path.cpu_pinning:
             iperf_test.affinity = ",".join([str(x) for x in path.cpu_pinning[0]])
@@ -102,6 +169,7 @@ class Iperf3MultiStream(GenericIPerf3Stream, MultiStreamsGeneric):
                 port=port,
                 interval=self.interval,
                 parallel=self.parallel,
+                json_stream=self.json_stream,
             )
             new_test.affinity = ",".join([str(x) for x in cpu_pinning])
             tests.append(new_test)
@@ -124,9 +192,9 @@ class Iperf3MultiStream(GenericIPerf3Stream, MultiStreamsGeneric):
     @catch_and_log_exception
     def parse_all_results(self, tests):
         mpstats = tests[-2:]
-        results = [test.get_result() for test in tests[:-2]]
+        results = Iperf3ResultMatrix.from_results([test.get_result() for test in tests[:-2]])
 
-        total: Iperf3TestResult = sum(results)
+        total: Iperf3TestResult = results.total()
         total.add_mpstat_sum(*mpstats)
         total.set_data_formatter(self.str_round)
 
@@ -147,15 +215,14 @@ class Iperf3DuplexStream(DuplexStreamGeneric, Iperf3MultiStream):
         result_dict = OrderedDict()
         mpstats = tests[-2:]
         tests = tests[:-2]
-        up_results = [t.get_result() for t in tests[::2]]
-        down_results = [t.get_result() for t in tests[1::2]]
+        results = Iperf3ResultMatrix.from_results([t.get_result() for t in tests])
 
-        stream_test_result: Iperf3TestResult = sum(up_results)
+        # even tests are upload streams, odd tests are reversed
+        stream_test_result, reversed_test_result = results.group_totals([i % 2 for i in range(len(results))])
         stream_test_result.set_data_formatter(self.str_round)
-        reversed_test_result: Iperf3TestResult = sum(down_results)
         reversed_test_result.set_data_formatter(self.str_round)
 
-        total = stream_test_result + reversed_test_result
+        total = results.total()
         total.add_mpstat_sum(*mpstats)
         result_dict["up_throughput"] = stream_test_result["throughput"]
         result_dict["down_throughput"] = reversed_test_result["throughput"]
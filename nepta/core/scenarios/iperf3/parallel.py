@@ -8,6 +8,7 @@ from nepta.core.scenarios.generic.scenario import ParallelPathGeneric, info_log_
 from nepta.core.scenarios.iperf3.generic import GenericIPerf3Stream, catch_and_log_exception
 
 from nepta.core.tests import Iperf3Test, MPStat, RemoteMPStat
+from nepta.core.tests.iperf3 import Iperf3ResultMatrix
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +26,7 @@ class Iperf3TCPParallelPath(GenericIPerf3Stream, ParallelPathGeneric):
                 port=port,
                 interval=self.interval,
                 parallel=self.parallel,
+                json_stream=self.json_stream,
             )
             new_test.affinity = ",".join([str(x) for x in cpu])
             tests.append(new_test)
@@ -49,7 +51,7 @@ class Iperf3TCPParallelPath(GenericIPerf3Stream, ParallelPathGeneric):
     def parse_all_results(self, tests):
         mpstats = tests[-2:]
         tests = tests[:-2]
-        total = sum([test.get_result() for test in tests])
+        total = Iperf3ResultMatrix.from_results([test.get_result() for test in tests]).total()
 
         total.add_mpstat_sum(*mpstats)
         total.set_data_formatter(self.str_round)
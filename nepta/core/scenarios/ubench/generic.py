@@ -10,9 +10,12 @@ from nepta.core.scenarios.iperf3.generic import GenericIPerf3Stream, catch_and_l
 from nepta.dataformat.section import Section
 
 from nepta.core.distribution.utils.tuna import Tuna
+from nepta.core.distribution.timeseries import TimeSeries
 from nepta.core.model.schedule import UBenchPath
 from nepta.core.scenarios import ScenarioGeneric
+from nepta.core.scenarios.generic.adaptive import AdaptiveRuns
 from nepta.core.tests import Iperf3Test, MPStat, RemoteMPStat
+from nepta.core.tests.iperf3 import Iperf3ResultMatrix
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +30,7 @@ class UBenchGeneric(GenericIPerf3Stream, ScenarioGeneric):
         test_length: int = 30,
         test_runs: int = 10,
         message_size: Optional[str] = None,
+        adaptive_runs: Optional[AdaptiveRuns] = None,
     ):
         self.paths = paths
         self.base_port = base_port
@@ -35,6 +39,7 @@ class UBenchGeneric(GenericIPerf3Stream, ScenarioGeneric):
         self.test_length = test_length
         self.test_runs = test_runs
         self.message_size = message_size
+        self.adaptive_runs = adaptive_runs
 
         self.retries = 3  # FIXME: this should be parameter
         self.retry_pause = 5  # FIXME: this should be parameter
@@ -124,8 +129,14 @@ class UBenchGeneric(GenericIPerf3Stream, ScenarioGeneric):
         self.local_cpu_utils = []
         self.remote_cpu_utils = []
 
-        for _ in range(self.test_runs):
+        max_runs = self.test_runs if self.adaptive_runs is None else self.adaptive_runs.max_runs
+        for run in range(max_runs):
             runs_section.subsections.append(self.run_instance(path, cpu_pinning))
+            TimeSeries.flush(self.__class__.__name__, path.id, test_case_section.params["uuid"], run)
+            if self.adaptive_runs is not None and self.adaptive_runs.is_done(self.throughputs, run + 1):
+                break
+        if self.adaptive_runs is not None:
+            self.store_precision(test_case_section, self.adaptive_runs, self.throughputs, run + 1)
 
         throughput_mean = statistics.mean(self.throughputs)
         throughput_std = round(statistics.stdev(self.throughputs))
@@ -196,6 +207,7 @@ class UBenchGeneric(GenericIPerf3Stream, ScenarioGeneric):
             elif k == "remote_cpu":
                 self.remote_cpu_utils.append(float(v))
             section.subsections.append(Section("item", key=k, value=v))
+        self.store_time_series(tests)
         return section
 
     def init_all_tests(self, path, cpu_pinning):
@@ -226,7 +238,7 @@ class UBenchGeneric(GenericIPerf3Stream, ScenarioGeneric):
     def parse_all_results(self, tests):
         mpstat_tests = tests[-2:]
         tests = tests[:-2]
-        total = sum([test.get_result() for test in tests])
+        total = Iperf3ResultMatrix.from_results([test.get_result() for test in tests]).total()
 
         total.add_mpstat_sum(*mpstat_tests)
         total.set_data_formatter(self.str_round)
@@ -2,6 +2,8 @@ import itertools
 from logging import getLogger
 from typing import Dict, List, Sequence
 
+from nepta.core.distribution.trace import Tracer
+
 logger = getLogger(__name__)
 
 
@@ -25,7 +27,8 @@ class Strategy:
     def __call__(self):
         for func in self.func_list:
             logger.info(f'Executing {self.__class__.__name__}.{func}')
-            getattr(self, func)()
+            with Tracer.span(f'{self.__class__.__name__}.{func}', "strategy"):
+                getattr(self, func)()
 
     def __add__(self, other):
         """
@@ -2,12 +2,16 @@ import logging
 import os
 from typing import Optional, List
 
-from nepta.dataformat import Section, Compression
+from nepta.dataformat import Section, Compression, AttachmentTypes
 
 from nepta.core.strategies.generic import Strategy
 from nepta.core.model.system import PCPConfiguration
 from nepta.core.model.bundles import SyncHost
 from nepta.core.distribution.command import Command
+from nepta.core.distribution.capture import RingBufferCapture
+from nepta.core.distribution.rusage import ResourceAccounting
+from nepta.core.distribution.trace import Tracer
+from nepta.core.distribution.timeseries import TimeSeries
 from nepta.core.model.attachments import Directory
 from nepta.core.scenarios.generic.scenario import ScenarioGeneric, StreamGeneric
 
@@ -15,6 +19,8 @@ logger = logging.getLogger(__name__)
 
 
 class RunScenarios(Strategy):
+    TIME_SERIES_NAME = "timeseries"
+
     def __init__(self, conf, package, filter_scenarios=None, path_tags=None):
         super().__init__()
         self.conf = conf
@@ -58,17 +64,61 @@ class RunScenarios(Strategy):
 
         return self.filter_paths([x for x in scenarios if x.__class__.__name__ in override_names])
 
+    @staticmethod
+    def resource_usage_section() -> Section:
+        """
+        :return: resource usage of commands finished since the last call aggregated per program
+        """
+        usage_section = Section("resource_usage")
+        summary = ResourceAccounting.summarize(ResourceAccounting.collect())
+        for program, usage in sorted(summary.items()):
+            usage_section.subsections.append(
+                Section(
+                    "program",
+                    name=program,
+                    count=usage.count,
+                    wall_time=round(usage.wall_time, 3),
+                    user_time=round(usage.user_time, 3),
+                    system_time=round(usage.system_time, 3),
+                    max_rss=usage.max_rss,
+                    voluntary_switches=usage.voluntary_switches,
+                    involuntary_switches=usage.involuntary_switches,
+                )
+            )
+        return usage_section
+
+    def open_time_series(self):
+        """
+        Create package attachment for time series of runs, see `TimeSeries`.
+        """
+        attachment = self.package.attachments.new(
+            AttachmentTypes.DIRECTORY, self.TIME_SERIES_NAME, "timeseries", Compression.NONE
+        )
+        TimeSeries.open(os.path.join(self.package.path, str(attachment.path)))
+
+    def run_scenario(self, item: ScenarioGeneric):
+        if ResourceAccounting.enabled:
+            ResourceAccounting.collect()  # drop commands of previous steps
+        with Tracer.span(item.__class__.__name__, "scenario"):
+            data, result = item()
+        if ResourceAccounting.enabled:
+            data.subsections.append(self.resource_usage_section())
+        return data, result
+
     @Strategy.schedule
     def run_scenarios(self):
         # creating data section and running filtered scenarios
         scenarios_section = Section("scenarios")
         self.package.store.root.subsections.append(scenarios_section)
+        if TimeSeries.enabled:
+            self.open_time_series()
 
         for item in self.get_running_scenarios():
             logger.info("\n\nRunning scenario: %s", item)
-            data, result = item()
+            data, result = self.run_scenario(item)
             scenarios_section.subsections.append(data)
             self.aggregated_result &= result
+        TimeSeries.close()
 
 
 class RunScenariosPCP(RunScenarios):
@@ -97,16 +147,18 @@ class RunScenariosPCP(RunScenarios):
             self._pmlogger_cmds.append(
                 Command(
                     f'pmlogger -c {self.pcp_conf.config_path} -t {self.pcp_conf.interval} '
-                    f'{os.path.join(self.pcp_conf.log_path, archive_name)}'
+                    f'{os.path.join(self.pcp_conf.log_path, archive_name)}',
+                    capture=RingBufferCapture,
                 ).run()
             )
         if self.remote_pcp:
             for host in self.remote_pcp_hosts:
                 self._pmlogger_cmds.append(
                     Command(
-                        f'ssh {host.hostname} '
                         f'pmlogger -c {self.pcp_conf.config_path} -t {self.pcp_conf.interval} '
-                        f'{os.path.join(self.pcp_conf.log_path, archive_name)}'
+                        f'{os.path.join(self.pcp_conf.log_path, archive_name)}',
+                        host=host.hostname,
+                        capture=RingBufferCapture,
                     ).run()
                 )
         self.check_pmlogger()
@@ -129,12 +181,15 @@ class RunScenariosPCP(RunScenarios):
         # creating data section and running filtered scenarios
         scenarios_section = Section("scenarios")
         self.package.store.root.subsections.append(scenarios_section)
+        if TimeSeries.enabled:
+            self.open_time_series()
 
         for item in self.get_running_scenarios():
             logger.info("\n\nRunning scenario: %s", item)
             logger.info("Running pmlogger")
             self.start_pmlogger(item.__class__.__name__)
-            data, result = item()
+            data, result = self.run_scenario(item)
             self.stop_pmlogger()
             scenarios_section.subsections.append(data)
             self.aggregated_result &= result
+        TimeSeries.close()
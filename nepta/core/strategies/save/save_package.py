@@ -2,7 +2,8 @@ import os
 import logging
 
 from nepta.core.strategies.generic import Strategy
-from nepta.dataformat import DataPackage
+from nepta.core.distribution.trace import Tracer
+from nepta.dataformat import DataPackage, AttachmentTypes, Compression
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +14,23 @@ class PackagesStrategy(Strategy):
         self.package = package
 
 
+class SaveTrace(PackagesStrategy):
+    """
+    Store trace of executed commands, strategies and scenarios into the package as Chrome trace JSON file.
+    """
+
+    TRACE_NAME = "nepta-trace.json"
+
+    @Strategy.schedule
+    def save_trace(self):
+        trace_attachment = self.package.attachments.new(
+            AttachmentTypes.FILE, self.TRACE_NAME, "trace", Compression.NONE
+        )
+        logger.info(f'Saving execution trace into {trace_attachment.path}')
+        with open(os.path.join(self.package.path, str(trace_attachment.path)), "w") as f:
+            Tracer.dump(f)
+
+
 class Save(PackagesStrategy):
     SYMLINK_NAME = "/root/result"
 
@@ -3,7 +3,8 @@ from nepta.core.strategies.generic import CompoundStrategy
 
 from nepta.core.strategies.setup.system import SystemSetup
 from nepta.core.strategies.setup.packages import Packages
-from nepta.core.strategies.setup.network import Network, Crypto
+from nepta.core.strategies.setup import network
+from nepta.core.strategies.setup.network import get_network_setup, Crypto
 from nepta.core.strategies.setup.virt import Virtualization
 
 
@@ -11,9 +12,16 @@ def get_strategy(conf: HostBundle) -> CompoundStrategy:
     strategies = [
         Packages(conf),
         SystemSetup(conf),
-        Network(conf),
+        get_network_setup()(conf),
         Crypto(conf),
         Virtualization(conf),
     ]
 
     return CompoundStrategy.sum(strategies)
+
+
+def __getattr__(name):
+    # re-export of lazily resolved `network.Network`
+    if name == "Network":
+        return network.Network
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
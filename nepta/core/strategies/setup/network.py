@@ -201,11 +201,21 @@ class NewNetwork(OldNetwork):
         pass
 
 
-if (
-    env.RedhatRelease.brand == "Fedora"
-    or env.RedhatRelease.version.startswith("9")
-    or env.RedhatRelease.version.startswith("10")
-):
-    Network: Type[Setup] = NewNetwork
-else:
-    Network = OldNetwork
+def get_network_setup() -> Type[Setup]:
+    """
+    :return: network setup strategy class for the running distribution
+    """
+    if (
+        env.RedhatRelease.brand == "Fedora"
+        or env.RedhatRelease.version.startswith("9")
+        or env.RedhatRelease.version.startswith("10")
+    ):
+        return NewNetwork
+    return OldNetwork
+
+
+def __getattr__(name):
+    # `Network` is resolved on the first access, so importing this module does not read distribution release
+    if name == "Network":
+        return get_network_setup()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -4,6 +4,8 @@ from jinja2 import Template
 from nepta.core import model
 from nepta.core.distribution import conf_files, env
 from nepta.core.distribution.command import Command
+from nepta.core.distribution.probe import ProbeCache
+from nepta.core.distribution.utils.system import RPMTool
 from nepta.core.strategies.setup.generic import _GenericSetup as Setup
 
 logger = logging.getLogger(__name__)
@@ -11,19 +13,17 @@ logger = logging.getLogger(__name__)
 
 class Packages(Setup):
     _PKG_MANAGERS_CMD = "dnf -y --allowerasing install "
-
-    # Use yum pkg manager for RHEL7
-    if env.RedhatRelease.version.startswith("7"):
-        _PKG_MANAGERS_CMD = "yum -y install "
+    _RHEL7_PKG_MANAGERS_CMD = "yum -y install "
 
     def __init__(self, conf):
         super().__init__(conf)
         self._installer = self._PKG_MANAGERS_CMD
-        self._custom_repo_install_tmplt = Template(
-            """{{ installer }} {{ pkg.name }} \
+        # Use yum pkg manager for RHEL7
+        if env.RedhatRelease.version.startswith("7"):
+            self._installer = self._RHEL7_PKG_MANAGERS_CMD
+        self._custom_repo_install_tmplt = Template("""{{ installer }} {{ pkg.name }} \
     {% for repo in pkg.disable_repos %}--disablerepo {{ repo.key }} {% endfor %}\
-    {% for repo in pkg.enable_repos %}--enablerepo {{ repo.key }} {% endfor %}"""
-        )
+    {% for repo in pkg.enable_repos %}--enablerepo {{ repo.key }} {% endfor %}""")
 
     @Setup.schedule
     def add_repositories(self):
@@ -40,6 +40,7 @@ class Packages(Setup):
         c = Command(install_cmd)
         c.run()
         out, retcode = c.watch_output()
+        ProbeCache.invalidate(RPMTool.CMD_RPM, "rpm ")
         logger.info(out)
 
     @Setup.schedule
@@ -50,4 +51,5 @@ class Packages(Setup):
             c = Command(install_cmd)
             c.run()
             out, retcode = c.watch_output()
+            ProbeCache.invalidate(RPMTool.CMD_RPM, "rpm ")
             logger.info(out)
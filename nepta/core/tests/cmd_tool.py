@@ -1,5 +1,7 @@
-from nepta.core.distribution.command import Command
-from typing import List, Any, Optional
+import asyncio
+from nepta.core.distribution.command import Command, AsyncCommand
+from nepta.core.distribution.capture import OutputCapture, BufferCapture
+from typing import List, Any, Optional, Sequence, Type
 
 
 class CommandToolException(Exception):
@@ -19,6 +21,8 @@ class MissingRequiredArgument(CommandToolException):
 
 
 class CommandArgument(object):
+    __slots__ = ("class_name", "argument_name", "required", "argument_type", "default_value")
+
     def __init__(self, class_name, argument_name, required=False, argument_type=str, default_value=None):
         """
         This object is abstract class to program argument. It basically store tuple of argument
@@ -38,6 +42,7 @@ class CommandArgument(object):
 class CommandTool(object):
     PROGRAM_NAME = ""
     MAPPING: List[CommandArgument] = []
+    DEBUG_LOG = True  # log output of local command
 
     def __init__(self, **kwargs):
         super().__init__()
@@ -105,11 +110,24 @@ class CommandTool(object):
         """
         return self.PROGRAM_NAME + self._make_cli_args(self.MAPPING)
 
+    def _make_capture(self) -> OutputCapture:
+        """
+        Create storage of program output, it is called once for each execution.
+        """
+        return BufferCapture()
+
+    def _new_command(self, command_cls: Type[Command] = Command, host: Optional[str] = None) -> Command:
+        if host is None:
+            return command_cls(
+                self._make_cmd(), stderr=None, enable_debug_log=self.DEBUG_LOG, capture=self._make_capture
+            )
+        return command_cls(self._make_cmd(), host=host, capture=self._make_capture)
+
     def run(self):
         """
         Execute current command.
         """
-        self._cmd = Command(self._make_cmd(), stderr=None)
+        self._cmd = self._new_command()
         self._cmd.run()
         return self
 
@@ -120,7 +138,7 @@ class CommandTool(object):
         :param host: Machine where the command is executed
         :return: self
         """
-        self._cmd = Command(f'ssh -o LogLevel=ERROR {host} {self._make_cmd()}')
+        self._cmd = self._new_command(host=host)
         self._cmd.run()
         return self
 
@@ -133,6 +151,34 @@ class CommandTool(object):
             self._output, self._exit_code = self._cmd.watch_output()
         return self._output, self._exit_code
 
+    async def run_async(self):
+        """
+        Execute current command in running event loop.
+        """
+        self._cmd = self._new_command(AsyncCommand)
+        await self._cmd.run_async()
+        return self
+
+    async def remote_run_async(self, host):
+        """
+        Execute current command on the provided host via SSH in running event loop.
+        :param host: Machine where the command is executed
+        :return: self
+        """
+        self._cmd = self._new_command(AsyncCommand, host)
+        await self._cmd.run_async()
+        return self
+
+    async def wait_async(self, timeout: Optional[float] = None):
+        """
+        Wait for end of program started by `run_async` and return stdout of process.
+        :param timeout: the program is terminated after this number of seconds
+        :return: stdout, exit code
+        """
+        if self._output is None and self._exit_code is None:
+            self._output, self._exit_code = await self._cmd.watch_output_async(timeout)
+        return self._output, self._exit_code
+
     def clone(self):
         """
         Create a duplicate of current object and delete reference to running process.
@@ -155,3 +201,19 @@ class CommandTool(object):
         """
         self._cmd.terminate()
         self._cmd, self._exit_code, self._output = None, None, None
+
+
+def run_concurrently(tools: Sequence[CommandTool], timeout: Optional[float] = None):
+    """
+    Start all tools and wait for all of them in a single event loop. Outputs are read concurrently, so slow or
+    verbose tool does not block the others. When the waiting is interrupted, all running tools are terminated.
+    :param tools: tools to run
+    :param timeout: each tool is terminated after this number of seconds
+    """
+
+    async def supervise():
+        for tool in tools:
+            await tool.run_async()
+        await asyncio.gather(*[tool.wait_async(timeout) for tool in tools])
+
+    asyncio.run(supervise())
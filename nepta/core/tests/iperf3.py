@@ -1,13 +1,15 @@
 import json
+import asyncio
 import logging
 import abc
 import numpy as np
 from enum import Enum
 from singledispatchmethod import singledispatchmethod
-from typing import Dict, Callable, Optional
+from typing import Dict, Callable, Optional, Sequence, List, Type
 
-from nepta.core.distribution.command import Command
+from nepta.core.distribution.capture import OutputCapture
 from nepta.core.tests.cmd_tool import CommandTool, CommandArgument
+from nepta.core.tests.iperf3_intervals import Iperf3Intervals, Iperf3StreamCapture
 from nepta.core.tests.mpstat import MPStat
 
 logger = logging.getLogger(__name__)
@@ -62,7 +64,7 @@ class Iperf3TestResult:
         :param other: Iperf3TestResultObject object
         :return: new instance of Iperf3TestResultObject containing self + other
         """
-        return self.__class__(self._array + other._array, self._format_func)
+        return self.__class__(self._array + other._array, self._format_func, self._dims)
 
     @__add__.register(int)
     def _(self, other):
@@ -72,7 +74,7 @@ class Iperf3TestResult:
         :param other: int
         :return:
         """
-        return self.__class__(self._array + other, self._format_func)
+        return self.__class__(self._array + other, self._format_func, self._dims)
 
     # addition operation is commutative
     def __radd__(self, other):
@@ -114,11 +116,74 @@ class Iperf3TestResult:
         return self
 
     def _mpstat_from_dict(self, local: dict, remote: dict) -> "Iperf3TestResult":
-        self._array = np.array(self._array.tolist() + [x[y] for y in self._METRICS for x in [local, remote]])
-        self._dims.update({k: v for v, k in enumerate(self._MPSTAT_DIMENSIONS, max(self._dims.values()) + 1)})
+        mpstat = np.fromiter((x[y] for y in self._METRICS for x in [local, remote]), dtype=float)
+        # mpstat dimensions belong only to this object, class mapping is shared by all results
+        self._dims = {**self._dims, **{k: v for v, k in enumerate(self._MPSTAT_DIMENSIONS, len(self._array))}}
+        self._array = np.concatenate([self._array, mpstat])
         return self
 
 
+class Iperf3ResultMatrix:
+    """
+    Results of iPerf3 tests running at the same time stored in one 2-D array (streams x metrics) with named columns.
+    Totals and means are computed by one reduction over the streams axis instead of adding result objects.
+
+    Usage:
+        -> matrix = Iperf3ResultMatrix.from_results([test.get_result() for test in tests])
+        -> matrix.total()['throughput']
+        -> up, down = matrix.group_totals([0, 1] * (len(matrix) // 2))
+    """
+
+    def __init__(self, array: np.ndarray, dims: Dict[str, int], result_cls: Type[Iperf3TestResult]):
+        self._array = np.asarray(array, dtype=float).reshape(-1, len(dims))
+        self._dims = dims
+        self._result_cls = result_cls
+
+    @classmethod
+    def from_results(cls, results: Sequence[Iperf3TestResult]) -> "Iperf3ResultMatrix":
+        if not results:
+            raise ValueError("At least one iPerf3 result is required.")
+        first = results[0]
+        return cls(np.stack([r._array for r in results]), dict(first._dims), first.__class__)
+
+    def __len__(self):
+        return len(self._array)
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        """
+        :return: values of the metric for each stream
+        """
+        return self._array[:, self._dims[column]]
+
+    @property
+    def columns(self) -> List[str]:
+        return sorted(self._dims, key=self._dims.get)
+
+    @property
+    def array(self) -> np.ndarray:
+        return self._array
+
+    def _result(self, vector: np.ndarray) -> Iperf3TestResult:
+        return self._result_cls(vector, dims=self._dims)
+
+    def total(self) -> Iperf3TestResult:
+        return self._result(self._array.sum(axis=0))
+
+    def mean(self) -> Iperf3TestResult:
+        return self._result(self._array.mean(axis=0))
+
+    def group_totals(self, groups: Sequence[int]) -> List[Iperf3TestResult]:
+        """
+        Sum streams of each group, e.g. upload and download streams of duplex test.
+        :param groups: group number of each stream (0, 1, ...)
+        :return: total result of each group
+        """
+        groups = np.asarray(groups)
+        totals = np.zeros((groups.max(initial=-1) + 1, self._array.shape[1]))
+        np.add.at(totals, groups, self._array)
+        return [self._result(row) for row in totals]
+
+
 class Iperf3TCPTestResult(Iperf3TestResult):
     _DIMENSIONS = {name: order for order, name in enumerate(["throughput", "local_cpu", "remote_cpu"])}
 
@@ -194,6 +259,9 @@ class Iperf3Test(Iperf3Server):
     arguments. It also ingerits global arguments.
     Output for each test case is returned to caller, because
     there are various different requirements for test output.
+
+    With `json_stream` enabled, interval reports are parsed as they arrive and only their numbers are kept, see
+    `get_intervals`.
     """
 
     MAPPING = Iperf3.MAPPING + [
@@ -208,14 +276,19 @@ class Iperf3Test(Iperf3Server):
         CommandArgument("reverse", "--reverse", argument_type=bool),
         CommandArgument("congestion", "--congestion"),
         CommandArgument("zerocopy", "--zerocopy", argument_type=bool),
+        CommandArgument("json_stream", "--json-stream", argument_type=bool),
     ]
+    DEBUG_LOG = False
 
-    def run(self):
-        """
-        Execute current command with no debug logs.
-        """
-        self._cmd = Command(self._make_cmd(), stderr=None, enable_debug_log=False)
-        self._cmd.run()
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._stream_capture: Optional[Iperf3StreamCapture] = None
+
+    def _make_capture(self) -> OutputCapture:
+        if self.json_stream:
+            self._stream_capture = Iperf3StreamCapture()
+            return self._stream_capture
+        return super()._make_capture()
 
     def get_json_out(self) -> dict:
         if self._output is None:
@@ -226,6 +299,16 @@ class Iperf3Test(Iperf3Server):
         else:
             raise RuntimeError("The iPerf3 JSON output is not available.")
 
+    def get_intervals(self) -> Iperf3Intervals:
+        """
+        :return: time series of interval reports, parsed from the stream or from the classic JSON output
+        """
+        if self.json_stream:
+            self.watch_output()
+            if self._stream_capture is not None:
+                return self._stream_capture.intervals
+        return Iperf3Intervals.from_json(self.get_json_out().get("intervals", []))
+
     def get_result(self, throughput_format=Iperf3TestResult.ThroughputFormat.MBPS) -> Iperf3TestResult:
         if self.udp:
             test = Iperf3UDPTestResult.from_json(self.get_json_out())
@@ -243,13 +326,26 @@ class Iperf3MPStat(Iperf3Test):
         self._loc_mpstat: MPStat = None
         self._rem_mpstat: MPStat = None
 
-    def run(self):
+    def _init_mpstats(self):
         self._loc_mpstat = MPStat(interval=self.time, cpu_list=self.affinity.split(",")[0], count=1, output="JSON")
         self._rem_mpstat = MPStat(interval=self.time, cpu_list=self.affinity.split(",")[1], count=1, output="JSON")
+
+    def run(self):
+        self._init_mpstats()
         self._loc_mpstat.run()
         self._rem_mpstat.remote_run(self.client)
         super(Iperf3MPStat, self).run()
 
+    async def run_async(self):
+        self._init_mpstats()
+        await self._loc_mpstat.run_async()
+        await self._rem_mpstat.remote_run_async(self.client)
+        return await super(Iperf3MPStat, self).run_async()
+
+    async def wait_async(self, timeout=None):
+        await asyncio.gather(self._loc_mpstat.wait_async(timeout), self._rem_mpstat.wait_async(timeout))
+        return await super(Iperf3MPStat, self).wait_async(timeout)
+
     def get_result(self, throughput_format=Iperf3TestResult.ThroughputFormat.MBPS):
         result = super(Iperf3MPStat, self).get_result()
         result.add_mpstat(self._loc_mpstat, self._rem_mpstat)
@@ -0,0 +1,153 @@
+import json
+import numpy as np
+from typing import Dict, Iterable, List, Optional
+
+from nepta.core.distribution.capture import OutputCapture, Buffer
+
+
+class _GrowingArray(object):
+    """
+    Rows of fixed width appended into preallocated array, which is reallocated to double size when it is full.
+    """
+
+    def __init__(self, width: int, capacity: int = 64):
+        self._data = np.empty((capacity, width))
+        self._size = 0
+
+    def append(self, row: List[float]):
+        if self._size == len(self._data):
+            self._data = np.concatenate([self._data, np.empty_like(self._data)])
+        self._data[self._size] = row
+        self._size += 1
+
+    @property
+    def array(self) -> np.ndarray:
+        return self._data[: self._size]
+
+
+class Iperf3Intervals(object):
+    """
+    Time series of iPerf3 interval reports. Each report is stored as a row of `FIELDS` for the aggregate and for each
+    stream. Values missing in the report (e.g. RTT of UDP streams) are NaN. Aggregated congestion window is the sum
+    and aggregated RTT is the mean of stream values.
+
+    Usage:
+        -> intervals['bits_per_second']  # aggregated throughput in each interval
+        -> intervals.streams('rtt')  # 2-D array (streams x intervals)
+    """
+
+    FIELDS = ("start", "end", "bits_per_second", "retransmits", "snd_cwnd", "rtt")
+    _INDEX = {name: i for i, name in enumerate(FIELDS)}
+
+    def __init__(self):
+        self._sum = _GrowingArray(len(self.FIELDS))
+        self._streams: Dict[int, _GrowingArray] = {}  # socket -> stream reports
+
+    def __len__(self):
+        return len(self._sum.array)
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        return self._sum.array[:, self._INDEX[field]]
+
+    @classmethod
+    def _row(cls, report: dict) -> List[float]:
+        return [report.get(field, np.nan) for field in cls.FIELDS]
+
+    def append(self, interval: dict):
+        """
+        :param interval: one item of iPerf3 JSON "intervals" list
+        """
+        stream_rows = []
+        for stream in interval.get("streams", []):
+            row = self._row(stream)
+            stream_rows.append(row)
+            socket = stream.get("socket", len(self._streams))
+            if socket not in self._streams:
+                self._streams[socket] = _GrowingArray(len(self.FIELDS))
+            self._streams[socket].append(row)
+
+        row = self._row(interval.get("sum", {}))
+        if stream_rows:
+            streams = np.array(stream_rows)
+            cwnd, rtt = self._INDEX["snd_cwnd"], self._INDEX["rtt"]
+            row[cwnd] = streams[:, cwnd].sum()
+            row[rtt] = streams[:, rtt].mean()
+        self._sum.append(row)
+
+    @classmethod
+    def from_json(cls, intervals: Iterable[dict]) -> "Iperf3Intervals":
+        """
+        :param intervals: "intervals" list of classic iPerf3 JSON output
+        """
+        series = cls()
+        for interval in intervals:
+            series.append(interval)
+        return series
+
+    @property
+    def aggregate(self) -> np.ndarray:
+        """
+        :return: 2-D array (intervals x FIELDS)
+        """
+        return self._sum.array
+
+    def streams(self, field: Optional[str] = None) -> np.ndarray:
+        """
+        :return: 3-D array (streams x intervals x FIELDS) or 2-D array (streams x intervals) of given field
+        """
+        length = min((len(s.array) for s in self._streams.values()), default=0)
+        data = np.array([s.array[:length] for s in self._streams.values()]).reshape(-1, length, len(self.FIELDS))
+        return data if field is None else data[:, :, self._INDEX[field]]
+
+
+class Iperf3StreamCapture(OutputCapture):
+    """
+    Capture of iPerf3 `--json-stream` output, which parses the events as they arrive. Interval reports are stored
+    only as numbers in `intervals`, so the whole JSON text is never held in memory. The value of capture is classic
+    iPerf3 JSON document with start and end sections (without intervals), so the output is parsed in the same way as
+    `--json` output.
+    """
+
+    def __init__(self):
+        self._pending = b""
+        self.start: Optional[dict] = None
+        self.end: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.intervals = Iperf3Intervals()
+        self.text: List[str] = []  # lines which are not JSON events (e.g. warnings)
+
+    def write(self, data: Buffer):
+        *lines, self._pending = (self._pending + bytes(data)).split(b"\n")
+        for line in lines:
+            self._parse_line(line)
+
+    def _parse_line(self, line: bytes):
+        line = line.strip()
+        if not line:
+            return
+        try:
+            event = json.loads(line)
+            name, data = event["event"], event["data"]
+        except (ValueError, KeyError, TypeError):
+            self.text.append(line.decode(errors="replace"))
+            return
+        if name == "interval":
+            self.intervals.append(data)
+        elif name == "start":
+            self.start = data
+        elif name == "end":
+            self.end = data
+        elif name == "error":
+            self.error = data
+
+    def json(self) -> dict:
+        if self._pending:
+            self._parse_line(self._pending)
+            self._pending = b""
+        document: dict = {"start": self.start or {}, "intervals": [], "end": self.end or {}}
+        if self.error is not None:
+            document["error"] = self.error
+        return document
+
+    def getvalue(self) -> bytes:
+        return json.dumps(self.json()).encode()
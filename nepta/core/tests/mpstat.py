@@ -1,7 +1,8 @@
 import logging
 import json
 from functools import reduce
-from typing import Dict, List
+from typing import Dict, List, Sequence
+import numpy as np
 from nepta.core.tests.cmd_tool import CommandArgument, CommandTool
 
 logger = logging.getLogger(__name__)
@@ -9,6 +10,7 @@ logger = logging.getLogger(__name__)
 
 class MPStat(CommandTool):
     PROGRAM_NAME = "mpstat"
+    METRICS = ("usr", "nice", "sys", "iowait", "irq", "soft", "steal", "guest", "gnice", "idle")
 
     MAPPING = [
         CommandArgument(
@@ -40,6 +42,12 @@ class MPStat(CommandTool):
         cpu_loads = data["sysstat"]["hosts"][0]["statistics"]
         return [x["cpu-load"] for x in cpu_loads]
 
+    def samples(self, metrics: Sequence[str] = METRICS) -> np.ndarray:
+        """
+        :return: 3-D array (samples x CPUs x metrics) of CPU loads
+        """
+        return np.array([[[cpu[m] for m in metrics] for cpu in sample] for sample in self.cpu_loads()], dtype=float)
+
     def last_cpu_load(self) -> List[Dict]:
         return self.cpu_loads()[-1]
 
@@ -60,3 +68,6 @@ class RemoteMPStat(MPStat):
 
     def run(self):
         return self.remote_run(self._host)
+
+    async def run_async(self):
+        return await self.remote_run_async(self._host)
@@ -0,0 +1,81 @@
+import numpy as np
+from typing import NamedTuple, Optional
+
+from nepta.core.tests.iperf3_intervals import Iperf3Intervals
+
+
+class SteadyStateResult(NamedTuple):
+    first: int  # index of the first steady interval
+    last: int  # index after the last steady interval
+    start: float  # time of the steady part in seconds
+    end: float
+    mean: float
+    cv: float  # coefficient of variation of the steady part
+    detected: bool  # False if the series did not settle and only trimmed series is used
+
+
+class SteadyState(object):
+    """
+    Detection of steady part of interval series, e.g. throughput without TCP slow start and ramp-up of CPU frequency.
+    Warm-up and cool-down (in seconds) are always trimmed. Steady part starts at the first window of `window` intervals
+    with coefficient of variation lower or equal to `max_cv` and lasts until the cool-down.
+
+    Usage:
+        -> SteadyState(warmup=2, cooldown=1).analyze(test.get_intervals())
+    """
+
+    def __init__(self, warmup: float = 0.0, cooldown: float = 0.0, window: int = 5, max_cv: float = 0.05):
+        self.warmup = warmup
+        self.cooldown = cooldown
+        self.window = window
+        self.max_cv = max_cv
+
+    def __repr__(self):
+        return (
+            f'{self.__class__.__name__}(warmup={self.warmup}, cooldown={self.cooldown}, window={self.window}, '
+            f'max_cv={self.max_cv})'
+        )
+
+    @staticmethod
+    def rolling_cv(values: np.ndarray, window: int) -> np.ndarray:
+        """
+        :return: coefficient of variation of each window, computed from cumulative sums
+        """
+        sums = np.concatenate([[0.0], np.cumsum(values)])
+        squares = np.concatenate([[0.0], np.cumsum(values**2)])
+        mean = (sums[window:] - sums[:-window]) / window
+        variance = np.maximum((squares[window:] - squares[:-window]) / window - mean**2, 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(mean > 0, np.sqrt(variance) / mean, np.inf)
+
+    def detect(self, values, start: Optional[np.ndarray] = None, end: Optional[np.ndarray] = None) -> SteadyStateResult:
+        """
+        :param values: value of each interval
+        :param start: start time of each interval, intervals are one second long if it is not given
+        :param end: end time of each interval
+        """
+        values = np.asarray(values, dtype=float)
+        if not len(values):
+            raise ValueError("Steady state cannot be detected without intervals.")
+        start = np.arange(len(values), dtype=float) if start is None else np.asarray(start, dtype=float)
+        end = start + 1 if end is None else np.asarray(end, dtype=float)
+
+        first = int(np.searchsorted(start, start[0] + self.warmup))
+        last = int(np.searchsorted(end, end[-1] - self.cooldown, side="right"))
+        if first >= last:  # trimming does not leave anything
+            first, last = 0, len(values)
+
+        detected = False
+        if last - first >= self.window:
+            steady = np.flatnonzero(self.rolling_cv(values[first:last], self.window) <= self.max_cv)
+            if steady.size:
+                first += int(steady[0])
+                detected = True
+
+        segment = values[first:last]
+        mean = float(segment.mean())
+        cv = float(segment.std() / mean) if mean else float("inf")
+        return SteadyStateResult(first, last, float(start[first]), float(end[last - 1]), mean, cv, detected)
+
+    def analyze(self, intervals: Iperf3Intervals, field: str = "bits_per_second") -> SteadyStateResult:
+        return self.detect(intervals[field], intervals["start"], intervals["end"])
@@ -0,0 +1,40 @@
+from unittest import TestCase
+
+from nepta.core.distribution.command import Command
+from nepta.core.distribution.capture import BufferCapture, RingBufferCapture, SpooledCapture
+
+
+class CaptureTest(TestCase):
+    def test_buffer(self):
+        capture = BufferCapture()
+        capture.write(b'abc')
+        capture.write(memoryview(b'def'))
+        self.assertEqual(capture.decode(), 'abcdef')
+
+    def test_ring_buffer(self):
+        capture = RingBufferCapture(4)
+        capture.write(b'ab')
+        self.assertEqual(capture.getvalue(), b'ab')
+        capture.write(b'cde')
+        self.assertEqual(capture.getvalue(), b'bcde')
+        capture.write(b'0123456789')
+        self.assertEqual(capture.getvalue(), b'6789')
+        self.assertEqual(capture.truncated, 11)
+
+    def test_spooled(self):
+        capture = SpooledCapture(max_size=4)
+        capture.write(b'spooled ')
+        capture.write(b'output')
+        self.assertEqual(capture.decode(), 'spooled output')
+        capture.close()
+
+    def test_command_capture(self):
+        out, ret = Command('seq 100000').run().watch_output()
+        self.assertEqual(out.split(), [str(i) for i in range(1, 100001)])
+        self.assertEqual(ret, 0)
+
+        out, ret = Command('seq 100000', capture=lambda: RingBufferCapture(13)).run().watch_output()
+        self.assertEqual(out, '99999\n100000\n')
+
+        out, ret = Command('seq 100000', capture=lambda: SpooledCapture(1024)).run().watch_output()
+        self.assertTrue(out.endswith('99999\n100000\n'))
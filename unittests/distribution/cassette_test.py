@@ -0,0 +1,105 @@
+import os
+import asyncio
+import tempfile
+from unittest import TestCase
+
+from nepta.core.distribution.command import Command, ShellCommand, AsyncCommand
+from nepta.core.distribution.cassette import Cassette, CassetteMiss
+from nepta.core.distribution.utils.procfs import ProcFs
+
+
+class CassetteTest(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cassette = os.path.join(self.tmp.name, 'cassette.json')
+        self.marker = os.path.join(self.tmp.name, 'executed')
+
+    def tearDown(self):
+        Cassette.close()
+        self.tmp.cleanup()
+
+    def run_commands(self):
+        async def run_async():
+            cmd = AsyncCommand('echo async')
+            await cmd.run_async()
+            return await cmd.watch_output_async()
+
+        outputs = [
+            ShellCommand(f'touch {self.marker}; printf "\\377binary"; exit 2').run().watch_output(),
+            Command('echo first').run().watch_output(),
+            Command('echo first').run().watch_output(),
+            asyncio.run(run_async()),
+        ]
+        background = Command('sleep 10').run()
+        outputs.append(background.poll())
+        background.terminate()
+        return outputs
+
+    def test_record_replay(self):
+        Cassette.open(self.cassette, Cassette.RECORD)
+        recorded = self.run_commands()
+        Cassette.close()
+        os.remove(self.marker)
+
+        Cassette.open(self.cassette, Cassette.REPLAY)
+        self.assertEqual(self.run_commands(), recorded)
+        self.assertFalse(os.path.exists(self.marker))
+        self.assertEqual(recorded[0], ('�binary', 2))
+        self.assertIsNone(recorded[-1])
+
+    def test_repeated(self):
+        Cassette.open(self.cassette, Cassette.RECORD)
+        for i in range(2):
+            ShellCommand(f'echo {i} >> {self.marker}; wc -l < {self.marker}').run().watch_output()
+        Cassette.close()
+
+        Cassette.open(self.cassette, Cassette.REPLAY)
+        cmdline = f'echo {{}} >> {self.marker}; wc -l < {self.marker}'
+        self.assertEqual(ShellCommand(cmdline.format(0)).run().watch_output(), ('1\n', 0))
+        self.assertEqual(ShellCommand(cmdline.format(1)).run().watch_output(), ('2\n', 0))
+        self.assertEqual(ShellCommand(cmdline.format(1)).run().watch_output(), ('2\n', 0))
+
+    def test_miss(self):
+        Cassette.open(self.cassette, Cassette.RECORD)
+        Cassette.close()
+        Cassette.open(self.cassette, Cassette.REPLAY)
+        with self.assertRaises(CassetteMiss):
+            Command('true').run()
+
+    def test_missing_program(self):
+        Cassette.open(self.cassette, Cassette.RECORD)
+        with self.assertRaises(FileNotFoundError):
+            Command('nepta-missing-program').run()
+        Cassette.close()
+
+        Cassette.open(self.cassette, Cassette.REPLAY)
+        with self.assertRaises(FileNotFoundError):
+            Command('nepta-missing-program').run()
+
+    def test_reads(self):
+        root = ProcFs.ROOT
+        ProcFs.ROOT = self.tmp.name
+        try:
+            with open(os.path.join(self.tmp.name, 'interrupts'), 'w') as f:
+                f.write('recorded')
+            Cassette.open(self.cassette, Cassette.RECORD)
+            self.assertEqual(ProcFs.interrupts(), 'recorded')
+            with self.assertRaises(FileNotFoundError):
+                ProcFs.meminfo()
+            nproc = ProcFs.nproc()
+            Cassette.close()
+
+            # replay does not read the live files
+            with open(os.path.join(self.tmp.name, 'interrupts'), 'w') as f:
+                f.write('changed')
+            with open(os.path.join(self.tmp.name, 'meminfo'), 'w') as f:
+                f.write('MemTotal: 1 kB')
+            Cassette.open(self.cassette, Cassette.REPLAY)
+            self.assertEqual(ProcFs.interrupts(), 'recorded')
+            with self.assertRaises(FileNotFoundError):
+                ProcFs.meminfo()
+            self.assertEqual(ProcFs.nproc(), nproc)
+            with self.assertRaises(CassetteMiss):
+                ProcFs.read('stat')
+        finally:
+            ProcFs.ROOT = root
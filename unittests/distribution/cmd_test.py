@@ -1,7 +1,12 @@
+import os
+import time
+import asyncio
+import tempfile
 from unittest import TestCase
 from copy import deepcopy
 
-from nepta.core.distribution.command import Command, ShellCommand
+from nepta.core.distribution.command import Command, ShellCommand, AsyncCommand, SSHConnectionPool
+from nepta.core.tests.cmd_tool import CommandTool, CommandArgument, run_concurrently
 
 
 class CommandTest(TestCase):
@@ -32,3 +37,133 @@ class CommandTest(TestCase):
         cmd = Command('asdf')
         cmd2 = deepcopy(cmd)
         self.assertNotEqual(id(cmd), id(cmd2))
+
+
+class AsyncCommandTest(TestCase):
+    def test_basic(self):
+        async def run():
+            cmd = AsyncCommand(f'echo -n {self.__class__.__name__}')
+            await cmd.run_async()
+            return await cmd.watch_output_async()
+
+        self.assertEqual(asyncio.run(run()), (self.__class__.__name__, 0))
+
+    def test_sync_wrapper(self):
+        cmd = AsyncCommand('echo async')
+        cmd.run()
+        self.assertEqual(cmd.watch_output(), ('async\n', 0))
+        self.assertIsNone(cmd._loop)  # loop of finished command is closed
+
+    def test_sync_wait_before_output(self):
+        cmd = AsyncCommand('echo async')
+        cmd.run()
+        cmd.wait()
+        self.assertIsNotNone(cmd._loop)  # output was not read yet
+        self.assertEqual(cmd.watch_output(), ('async\n', 0))
+        self.assertIsNone(cmd._loop)
+
+    def test_timeout(self):
+        async def run():
+            cmd = AsyncCommand('sleep 10')
+            await cmd.run_async()
+            return await cmd.watch_output_async(timeout=0.1)
+
+        start = time.time()
+        out, ret = asyncio.run(run())
+        self.assertLess(time.time() - start, 5)
+        self.assertNotEqual(ret, 0)
+
+
+class Sleep(CommandTool):
+    PROGRAM_NAME = 'sleep'
+    MAPPING = [CommandArgument('seconds', '', required=True)]
+
+
+class RunConcurrentlyTest(TestCase):
+    def test_run_concurrently(self):
+        tools = [Sleep(seconds=0.5) for _ in range(10)]
+        start = time.time()
+        run_concurrently(tools)
+        self.assertLess(time.time() - start, 4)
+        self.assertTrue(all(tool.success() for tool in tools))
+        self.assertEqual(tools[0].watch_output(), ('', 0))
+        tools[0].clear()
+
+
+class SSHConnectionPoolTest(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.log = os.path.join(self.tmp.name, 'ssh.log')
+        self.write_ssh(0)
+        self.path = os.environ['PATH']
+        os.environ['PATH'] = f'{self.tmp.name}:{self.path}'
+
+    def tearDown(self):
+        SSHConnectionPool.close_all()
+        SSHConnectionPool.enabled = True
+        os.environ['PATH'] = self.path
+        self.tmp.cleanup()
+
+    def write_ssh(self, master_ret_code):
+        ssh = os.path.join(self.tmp.name, 'ssh')
+        with open(ssh, 'w') as f:
+            f.write(
+                f'#!/bin/sh\necho "$@" >> {self.log}\n'
+                f'case "$*" in *ControlMaster=yes*) exit {master_ret_code};; esac\n'
+            )
+        os.chmod(ssh, 0o755)
+
+    def ssh_calls(self):
+        if not os.path.exists(self.log):
+            return []
+        with open(self.log) as f:
+            return f.read().splitlines()
+
+    def master_calls(self):
+        return [call for call in self.ssh_calls() if 'ControlMaster=yes' in call]
+
+    def test_multiplexing(self):
+        cmd1 = Command('uname -r', host='remote.host')
+        cmd2 = Command('uname -r', host='remote.host')
+        self.assertEqual(self.ssh_calls(), [])
+
+        cmd1.run().wait()
+        cmd2.run().wait()
+        self.assertEqual(cmd1._cmdline, cmd2._cmdline)
+        self.assertIn('ControlMaster=no', cmd1._cmdline)
+        self.assertEqual(cmd1._cmdline[-3:], ['remote.host', 'uname', '-r'])
+        self.assertEqual(len(self.master_calls()), 1)
+        self.assertEqual(len(self.ssh_calls()), 3)
+
+        SSHConnectionPool.close_all()
+        self.assertIn('-O exit remote.host', self.ssh_calls()[-1])
+
+    def test_failed_master_retry(self):
+        self.write_ssh(255)
+        cmd = Command('uname', host='remote.host')
+        cmd.run().wait()
+        self.assertEqual(cmd._cmdline, 'ssh -o LogLevel=ERROR remote.host uname'.split())
+        Command('uname', host='remote.host').run().wait()
+        self.assertEqual(len(self.master_calls()), 1)
+
+        # master connection is tried again after retry interval
+        self.write_ssh(0)
+        SSHConnectionPool._failures['remote.host'] -= SSHConnectionPool.RETRY_INTERVAL
+        cmd = Command('uname', host='remote.host')
+        cmd.run().wait()
+        self.assertIn('ControlMaster=no', cmd._cmdline)
+        self.assertEqual(len(self.master_calls()), 2)
+
+    def test_shell_command(self):
+        cmd = ShellCommand('uname  -r | wc -l', host='remote.host')
+        self.assertEqual(self.ssh_calls(), [])
+        cmd.run().wait()
+        self.assertTrue(cmd._cmdline.startswith('ssh -o LogLevel=ERROR -o ControlMaster=no'))
+        self.assertTrue(cmd._cmdline.endswith('remote.host uname -r | wc -l'))
+
+    def test_disabled(self):
+        SSHConnectionPool.enabled = False
+        cmd = Command('uname', host='remote.host')
+        cmd.run().wait()
+        self.assertEqual(cmd._cmdline, 'ssh -o LogLevel=ERROR remote.host uname'.split())
+        self.assertEqual(self.master_calls(), [])
@@ -1,6 +1,6 @@
 from unittest import TestCase
 
-from nepta.core.distribution.env import Environment, RedhatRelease
+from nepta.core.distribution.env import Environment, RedhatRelease, _MetaPrintedType, _lazy
 
 
 class EnvPrintTest(TestCase):
@@ -9,3 +9,27 @@ class EnvPrintTest(TestCase):
 
     def test_print_rh_release(self):
         print(RedhatRelease)
+
+
+class LazyAttributeTest(TestCase):
+    def test_computed_once(self):
+        calls = []
+
+        class Probe(metaclass=_MetaPrintedType):
+            @_lazy
+            def value(cls):
+                calls.append(cls)
+                return len(calls)
+
+        self.assertEqual(Probe.value, 1)
+        self.assertEqual(Probe.value, 1)
+        self.assertEqual(str(Probe), 'Probe\n\tvalue => 1')
+
+    def test_override(self):
+        class Probe(metaclass=_MetaPrintedType):
+            @_lazy
+            def value(cls):
+                raise AssertionError('overridden attribute must not be computed')
+
+        setattr(Probe, 'value', 'override')
+        self.assertEqual(Probe.value, 'override')
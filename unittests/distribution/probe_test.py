@@ -0,0 +1,66 @@
+import os
+import json
+import time
+import tempfile
+from unittest import TestCase
+
+from nepta.core.distribution.probe import ProbeCache
+
+# output differs for every execution, so cached output is recognizable
+PROBE = 'date +%s%N'
+FAILING_PROBE = 'false'
+
+
+class ProbeCacheTest(TestCase):
+    def setUp(self):
+        ProbeCache.clear()
+
+    def tearDown(self):
+        ProbeCache.clear()
+
+    def test_cached(self):
+        out, ret = ProbeCache.run(PROBE)
+        self.assertEqual(ret, 0)
+        self.assertEqual(ProbeCache.run(PROBE), (out, ret))
+
+    def test_ttl(self):
+        out, _ = ProbeCache.run(PROBE, ttl=0)
+        self.assertNotEqual(ProbeCache.run(PROBE, ttl=0)[0], out)
+
+    def test_failure_ttl(self):
+        self.assertEqual(ProbeCache.run(FAILING_PROBE)[1], 1)
+        expiration = ProbeCache._entries[(FAILING_PROBE, None)][0]
+        self.assertLessEqual(expiration, time.time() + ProbeCache.FAILURE_TTL)
+
+    def test_invalidate(self):
+        out, _ = ProbeCache.run(PROBE)
+        echo, _ = ProbeCache.run('echo probe')
+        ProbeCache.invalidate('date')
+        self.assertNotEqual(ProbeCache.run(PROBE)[0], out)
+        self.assertEqual(ProbeCache.run('echo probe')[0], echo)
+
+        ProbeCache.invalidate('date', host='other')
+        self.assertNotEqual(ProbeCache.run(PROBE)[0], out)
+
+    def test_persist(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'probes.json')
+            ProbeCache.persist(path)
+            out, _ = ProbeCache.run(PROBE)
+            ProbeCache.run(FAILING_PROBE)
+            with open(path) as f:
+                self.assertEqual([entry[0] for entry in json.load(f)['entries']], [PROBE])
+
+            ProbeCache.clear()
+            ProbeCache.persist(path)
+            self.assertEqual(ProbeCache.run(PROBE)[0], out)
+
+            # cache created in different boot is ignored
+            with open(path) as f:
+                content = json.load(f)
+            content['boot_id'] = 'other-boot'
+            with open(path, 'w') as f:
+                json.dump(content, f)
+            ProbeCache.clear()
+            ProbeCache.persist(path)
+            self.assertNotEqual(ProbeCache.run(PROBE)[0], out)
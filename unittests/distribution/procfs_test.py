@@ -0,0 +1,77 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from nepta.core.distribution.utils.procfs import ProcFs, SysFs
+
+MEMINFO = '''MemTotal:        8048452 kB
+MemFree:         1234567 kB
+HugePages_Total:       0
+'''
+
+
+class ProcFsTest(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = ProcFs.ROOT
+        ProcFs.ROOT = self.tmp_dir.name
+        with open(os.path.join(self.tmp_dir.name, 'meminfo'), 'w') as f:
+            f.write(MEMINFO)
+
+    def tearDown(self):
+        ProcFs.ROOT = self.root
+        self.tmp_dir.cleanup()
+
+    def test_meminfo(self):
+        self.assertEqual(ProcFs.total_memory(), 8048452 * 1024)
+        self.assertEqual(ProcFs.meminfo()['HugePages_Total'], 0)
+
+    def test_missing_file(self):
+        with self.assertRaises(OSError):
+            ProcFs.interrupts()
+
+    def test_nproc(self):
+        self.assertEqual(ProcFs.nproc(), len(os.sched_getaffinity(0)))
+
+
+class SysFsTest(TestCase):
+    INTERFACES = {
+        'eth1': {'ifindex': '3', 'address': '52:54:00:aa:bb:02', 'flags': '0x1003', 'carrier': '1', 'mtu': '9000'},
+        'eth0': {'ifindex': '2', 'address': '52:54:00:aa:bb:01', 'flags': '0x1002', 'mtu': '1500', 'type': '1'},
+        'eth0.100': {'ifindex': '4', 'iflink': '2', 'address': '52:54:00:aa:bb:04'},
+        'veth0': {'ifindex': '5', 'iflink': '12'},
+        'tunl0': {'ifindex': '6', 'iflink': '0'},
+    }
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = SysFs.NET_ROOT
+        SysFs.NET_ROOT = self.tmp_dir.name
+        for name, attrs in self.INTERFACES.items():
+            os.mkdir(os.path.join(self.tmp_dir.name, name))
+            for attr, value in attrs.items():
+                with open(os.path.join(self.tmp_dir.name, name, attr), 'w') as f:
+                    f.write(value + '\n')
+
+    def tearDown(self):
+        SysFs.NET_ROOT = self.root
+        self.tmp_dir.cleanup()
+
+    def test_interfaces(self):
+        self.assertEqual(SysFs.interface_names(), ['eth0', 'eth1', 'eth0.100', 'veth0', 'tunl0'])
+        interfaces = SysFs.interfaces()
+        self.assertEqual(interfaces['eth1']['mtu'], 9000)
+        self.assertEqual(interfaces['eth1']['flags'], ['BROADCAST', 'MULTICAST', 'UP', 'LOWER_UP'])
+        self.assertEqual(interfaces['eth0']['flags'], ['BROADCAST', 'MULTICAST'])
+        self.assertEqual(interfaces['eth0']['link_type'], 'ether')
+        self.assertIsNone(interfaces['eth0']['broadcast'])
+
+    def test_interface_by_mac(self):
+        self.assertEqual(SysFs.interface_by_mac('52:54:00:AA:BB:02'), 'eth1')
+        self.assertIsNone(SysFs.interface_by_mac('52:54:00:aa:bb:03'))
+        self.assertEqual(SysFs.interface_by_mac('52:54:00:aa:bb:04'), 'eth0.100@eth0')
+
+    def test_link_names(self):
+        self.assertEqual(
+            list(SysFs.link_names().values()), ['eth0', 'eth1', 'eth0.100@eth0', 'veth0@if12', 'tunl0@NONE']
+        )
@@ -0,0 +1,73 @@
+import asyncio
+from unittest import TestCase
+
+from nepta.core.distribution.command import Command, ShellCommand, AsyncCommand
+from nepta.core.distribution.rusage import ResourceUsage, ResourceAccounting
+
+
+class CommandUsageTest(TestCase):
+    def tearDown(self):
+        ResourceAccounting.enabled = False
+        ResourceAccounting.collect()
+
+    def test_usage(self):
+        cmd = Command('sleep 0.1').run()
+        self.assertIsNone(cmd.usage)
+        self.assertEqual(cmd.wait().poll(), 0)
+        self.assertGreaterEqual(cmd.usage.wall_time, 0.1)
+        self.assertEqual((cmd.usage.start, cmd.usage.end), (cmd.started, cmd.finished))
+        self.assertGreater(cmd.usage.max_rss, 0)
+        self.assertEqual(cmd.program, 'sleep')
+
+    def test_return_code(self):
+        cmd = ShellCommand('echo out; exit 3').run()
+        self.assertEqual(cmd.watch_output(), ('out\n', 3))
+        self.assertIsNotNone(cmd.usage)
+
+        cmd = ShellCommand('kill -9 $$').run()
+        self.assertEqual(cmd.wait().poll(), -9)
+
+    def test_async(self):
+        async def run():
+            cmd = AsyncCommand('true')
+            await cmd.run_async()
+            await cmd.wait_async()
+            return cmd
+
+        ResourceAccounting.enabled = True
+        cmd = asyncio.run(run())
+        self.assertLessEqual(cmd.started, cmd.finished)
+        self.assertEqual((cmd.usage.start, cmd.usage.end), (cmd.started, cmd.finished))
+        self.assertGreater(cmd.usage.max_rss, 0)
+        self.assertEqual(ResourceAccounting.collect(), [('true', cmd.usage)])
+
+        # sync wrappers and output reading
+        cmd = AsyncCommand('echo async')
+        cmd.run()
+        self.assertEqual(cmd.watch_output(), ('async\n', 0))
+        self.assertIsNotNone(cmd.usage)
+        self.assertEqual(ResourceAccounting.collect(), [('echo', cmd.usage)])
+
+    def test_accounting(self):
+        Command('true').run().wait()
+        self.assertEqual(ResourceAccounting.collect(), [])
+
+        ResourceAccounting.enabled = True
+        for _ in range(3):
+            Command('true').run().wait()
+        Command('sleep 0').run().wait()
+        summary = ResourceAccounting.summarize(ResourceAccounting.collect())
+        self.assertEqual(summary['true'].count, 3)
+        self.assertEqual(summary['sleep'].count, 1)
+        self.assertEqual(ResourceAccounting.collect(), [])
+
+
+class ResourceUsageTest(TestCase):
+    def test_add(self):
+        first = ResourceUsage(1.0, 3.0, user_time=0.5, system_time=0.25, max_rss=100, voluntary_switches=2)
+        second = ResourceUsage(2.0, 5.0, user_time=1.0, max_rss=50, voluntary_switches=3, involuntary_switches=1)
+        total = first + second
+        self.assertEqual(total.wall_time, 4.0)
+        self.assertEqual(total.cpu_time, 1.75)
+        self.assertEqual(total.max_rss, 100)
+        self.assertEqual((total.voluntary_switches, total.involuntary_switches, total.count), (5, 1, 2))
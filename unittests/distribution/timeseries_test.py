@@ -0,0 +1,59 @@
+import os
+import json
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from nepta.core.distribution.timeseries import TimeSeries
+
+
+class TimeSeriesTest(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.tmp.name, 'timeseries')
+        TimeSeries.enabled = True
+        TimeSeries.open(self.directory)
+
+    def tearDown(self):
+        TimeSeries.close()
+        TimeSeries.enabled = False
+        TimeSeries.compress = True
+        self.tmp.cleanup()
+
+    def store_runs(self):
+        for run in range(2):
+            TimeSeries.add('iperf3_0', np.arange(12, dtype=float).reshape(4, 3) + run)
+            TimeSeries.add('mpstat_local', np.ones((1, 2, 10)))
+            TimeSeries.flush('Iperf3TCPStream', 'path-id', 'test-case-id', run)
+
+    def test_index(self):
+        self.store_runs()
+        self.assertIsNone(TimeSeries.flush('Iperf3TCPStream', 'path-id', 'test-case-id', 2))
+
+        index = TimeSeries.read_index(self.directory)
+        self.assertEqual([entry['run'] for entry in index], [0, 1])
+        self.assertEqual(index[1]['arrays']['iperf3_0'], {'shape': [4, 3], 'dtype': '<f8'})
+        self.assertEqual((index[0]['scenario'], index[0]['path']), ('Iperf3TCPStream', 'path-id'))
+        with open(os.path.join(self.directory, index[1]['file']), 'rb') as f:
+            self.assertEqual(np.load(f)['iperf3_0'][0, 0], 1)
+
+    def test_compressed(self):
+        self.store_runs()
+        array = TimeSeries.load(self.directory, '00001.npz', 'iperf3_0')
+        self.assertNotIsInstance(array, np.memmap)
+        np.testing.assert_array_equal(array, np.arange(12).reshape(4, 3) + 1)
+
+    def test_memory_map(self):
+        TimeSeries.compress = False
+        self.store_runs()
+        array = TimeSeries.load(self.directory, '00001.npz', 'iperf3_0')
+        self.assertIsInstance(array, np.memmap)
+        np.testing.assert_array_equal(array, np.arange(12).reshape(4, 3) + 1)
+        self.assertEqual(TimeSeries.load(self.directory, '00000.npz', 'mpstat_local').shape, (1, 2, 10))
+
+    def test_disabled(self):
+        TimeSeries.enabled = False
+        TimeSeries.add('iperf3_0', [1.0])
+        self.assertIsNone(TimeSeries.flush('Iperf3TCPStream', 'path-id', 'test-case-id', 0))
+        self.assertFalse(os.path.exists(os.path.join(self.directory, TimeSeries.INDEX_NAME)))
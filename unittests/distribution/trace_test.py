@@ -0,0 +1,52 @@
+import io
+import json
+from unittest import TestCase
+
+from nepta.core.distribution.command import Command, ShellCommand
+from nepta.core.distribution.trace import Tracer
+from nepta.core.strategies.generic import Strategy
+
+
+class Dummy(Strategy):
+    @Strategy.schedule
+    def run_commands(self):
+        ShellCommand('echo -n abc').run().watch_output()
+        Command('false').run().wait()
+
+
+class TracerTest(TestCase):
+    def setUp(self):
+        Tracer.enabled = True
+
+    def tearDown(self):
+        Tracer.enabled = False
+        Tracer.clear()
+
+    def test_disabled(self):
+        Tracer.enabled = False
+        Dummy()()
+        self.assertEqual(Tracer.events(), [])
+
+    def test_strategy_commands(self):
+        Dummy()()
+        stream = io.StringIO()
+        Tracer.dump(stream)
+        events = json.loads(stream.getvalue())['traceEvents']
+
+        strategy, echo, false = events
+        self.assertEqual((strategy['name'], strategy['cat'], strategy['tid']), ('Dummy.run_commands', 'strategy', 0))
+        self.assertEqual(echo['args']['cmdline'], 'echo -n abc')
+        self.assertEqual(echo['args']['output_size'], 3)
+        self.assertEqual(echo['args']['context'], 'Dummy.run_commands')
+        self.assertEqual(false['args']['exit_code'], 1)
+        self.assertEqual(false['name'], 'false')
+
+        # commands are inside of strategy span
+        self.assertLessEqual(strategy['ts'], echo['ts'])
+        self.assertLessEqual(false['ts'] + false['dur'], strategy['ts'] + strategy['dur'])
+
+    def test_tracks(self):
+        Tracer.command('a', 1.0, 3.0)
+        Tracer.command('b', 2.0, 4.0)
+        Tracer.command('c', 3.0, 5.0)
+        self.assertEqual([(e['name'], e['tid']) for e in Tracer.events()], [('a', 1), ('b', 2), ('c', 1)])
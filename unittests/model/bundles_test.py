@@ -1,5 +1,8 @@
+import io
+import json
 from unittest import TestCase, skip
 from nepta.core.model import bundles, network, system, attachments
+from nepta.core.model.selector import ComponentSelector
 import ipaddress as ia
 
 
@@ -430,6 +433,128 @@ class TestBundles(TestCase):
         self.assertNotEqual(id(b.int1), id(clone.int1))
         self.assertNotEqual(id(b[0]), id(clone[0]))
 
+    def test_copy_on_write(self):
+        wget = system.Package('wget')
+        eth0 = network.EthernetInterface('eth0', '00:11:22:33:44:55')
+
+        b = bundles.Bundle()
+        b.packages.wget = wget
+        b.intf.eth0 = eth0
+
+        copied = b.copy()
+        cloned = b.clone()
+        added = b + bundles.Bundle()
+
+        # changes of the original tree are not visible in copies
+        gcc = system.Package('gcc')
+        b.packages.gcc = gcc
+        b.intf.eth0.test_attr = 'changed'
+        for tree in copied, cloned, added:
+            self.assertNotIn(gcc, tree)
+            self.assertFalse(tree.packages.has_node('gcc'))
+        self.assertIs(copied.packages.wget, wget)
+        self.assertIs(added.intf.eth0, eth0)
+        self.assertIsNot(cloned.intf.eth0, eth0)
+        self.assertFalse(hasattr(cloned.intf.eth0, 'test_attr'))
+
+        # and changes of copies are not visible in the original tree
+        iperf3 = system.Package('iperf3')
+        copied.packages.iperf3 = iperf3
+        cloned.packages.add_component(iperf3)
+        self.assertNotIn(iperf3, b)
+        self.assertEqual(len(b), 3)
+
+    def test_clone_is_snapshot(self):
+        eth0 = network.EthernetInterface('eth0', '00:11:22:33:44:55')
+        b = bundles.Bundle()
+        b.intf.eth0 = eth0
+        b.get_all_components()  # build index of the tree
+
+        # objects changed through references held outside of the tree do not change the clone
+        cloned = b.clone()
+        eth0.mac = 'ff:ff:ff:ff:ff:ff'
+        self.assertEqual(cloned.intf.eth0.mac, '00:11:22:33:44:55')
+
+        # neither when the tree shares them with its copy or merged tree
+        copied = b.copy()
+        merged = bundles.Bundle() + b
+        cloned = b.clone()
+        copied.intf.eth0.test_attr = 'changed'
+        merged.intf.eth0.mac = '00:00:00:00:00:00'
+        self.assertFalse(hasattr(cloned.intf.eth0, 'test_attr'))
+        self.assertEqual(cloned.intf.eth0.mac, 'ff:ff:ff:ff:ff:ff')
+
+    def test_deep_tree_write(self):
+        b = bundles.Bundle()
+        node = b
+        for i in range(200):
+            node = getattr(node, f'n{i}')
+        copied = b.copy()
+        node.add_component(system.Package('wget'))
+        self.assertEqual(len(b), 1)
+        self.assertEqual(len(copied), 0)
+
+    def test_find_components(self):
+        eth0 = network.EthernetInterface('eth0', '00:11:22:33:44:55')
+        team0 = network.TeamMasterInterface('team0')
+        wget = system.Package('wget')
+
+        b = bundles.Bundle()
+        b.intf.eth0 = eth0
+        b.intf.add_component(team0)
+        b.pkgs.wget = wget
+
+        self.assertEqual(b.find_components(m_class=network.Interface), [team0, eth0])
+        self.assertEqual(b.find_components(m_type=network.EthernetInterface), [eth0])
+        self.assertEqual(b.find_components(m_class=network.Interface, exclude=True), [wget])
+
+        # index has to be invalidated after each change of the tree
+        iperf3 = system.Package('iperf3')
+        b.pkgs.deep.iperf3 = iperf3
+        self.assertEqual(b.find_components(m_type=system.Package), [wget, iperf3])
+
+        del b.pkgs.deep
+        self.assertEqual(b.find_components(m_type=system.Package), [wget])
+
+        b += bundles.Bundle().add_component(iperf3)
+        self.assertEqual(b.find_components(m_type=system.Package), [iperf3, wget])
+
+        subset = b.get_subset(m_class=network.Interface)
+        self.assertEqual(subset.get_all_components(), [team0, eth0])
+        self.assertFalse(subset.has_node('pkgs'))
+        self.assertIs(subset.intf.eth0, eth0)
+
+    def test_subset_view(self):
+        wget = system.Package('wget')
+        eth0 = network.EthernetInterface('eth0', '00:11:22:33:44:55')
+
+        b = bundles.Bundle()
+        b.pkgs.wget = wget
+        b.intf.eth0 = eth0
+
+        pkgs = b.get_subset(m_class=system.Package)
+        self.assertIsInstance(pkgs, bundles.BundleView)
+        self.assertEqual(len(pkgs), 1)
+        self.assertIs(pkgs[0], wget)
+        self.assertIs(pkgs.pkgs.wget, wget)
+        self.assertEqual(len(pkgs.intf), 0)
+
+        # reading of missing subtrees does not change viewed tree
+        self.assertEqual(len(pkgs.missing.subtree), 0)
+        self.assertFalse(b.has_node('missing'))
+
+        # view is evaluated lazily
+        iperf3 = system.Package('iperf3')
+        b.pkgs.iperf3 = iperf3
+        self.assertEqual(list(pkgs), [wget, iperf3])
+
+        # modification creates standalone bundle
+        gcc = system.Package('gcc')
+        pkgs.pkgs.gcc = gcc
+        self.assertIn(gcc, pkgs)
+        self.assertNotIn(gcc, b)
+        self.assertNotIn(eth0, pkgs)
+
 
 class TestMergeBundles(TestCase):
     def test_merge_no_key_over_lap(self):
@@ -668,6 +793,56 @@ class TestMergeBundles(TestCase):
         print()
         print(b2.str_tree())
 
+    def test_tree_writer(self):
+        b = bundles.Bundle()
+        b.pkgs.wget = system.Package('wget')
+        b.pkgs.add_component(system.Package('vim'))
+        b.intf.eth0.sub = system.SystemService('NetworkManager')
+        b.intf.loop = b.intf
+
+        self.assertEqual(
+            b.str_tree(),
+            '\n'.join(
+                [
+                    'RootBundle',
+                    '├── pkgs',
+                    '|   ├── wget -> Package(value=\'wget\')',
+                    "|   └── legacy component list  #<class 'list'>",
+                    '|       └── 0 -> Package(value=\'vim\')',
+                    '└── intf',
+                    '    ├── eth0',
+                    '    |   └── sub -> SystemService(name=\'NetworkManager\', enable=True)',
+                    '    └── loop -> intf [cycle]',
+                ]
+            ),
+        )
+
+        depth_limited = list(bundles.TreeWriter(max_depth=1).lines(b))
+        self.assertEqual(depth_limited, ['RootBundle', '├── pkgs', '└── intf'])
+
+        filtered = list(bundles.TreeWriter(selectors=[ComponentSelector('Package[value=vim]')]).lines(b))
+        self.assertEqual(
+            filtered,
+            [
+                'RootBundle',
+                "└── pkgs",
+                "    └── legacy component list  #<class 'list'>",
+                "        └── 0 -> Package(value='vim')",
+            ],
+        )
+
+        records = [json.loads(line) for line in bundles.TreeWriter().json_lines(b)]
+        self.assertEqual(records[0], {'depth': 0, 'path': '', 'kind': 'root'})
+        self.assertIn(
+            {'depth': 2, 'path': 'pkgs.wget', 'kind': 'component', 'type': 'Package', 'value': "Package(value='wget')"},
+            records,
+        )
+        self.assertIn({'depth': 2, 'path': 'intf.loop', 'kind': 'cycle', 'target': 'intf'}, records)
+
+        stream = io.StringIO()
+        bundles.TreeWriter().write(b, stream)
+        self.assertEqual(stream.getvalue(), b.str_tree() + '\n')
+
 
 class TestSyncHost(TestCase):
     def test_sync_all(self):
@@ -683,3 +858,43 @@ class TestSyncHost(TestCase):
 
         self.assertIsInstance(getattr(h3, st)[0], bundles.SyncHost)
         self.assertIsInstance(getattr(h3, st)[1], bundles.SyncHost)
+
+
+class TestHostBundleFactory(TestCase):
+    def test_factory(self):
+        built = []
+
+        @bundles.HostBundle.factory('factory.host.org', 'Lazy')
+        def lazy_conf(conf):
+            built.append(conf)
+            conf.packages.wget = system.Package('wget')
+
+        bundles.HostBundle.register_factory('factory.host.org', 'Other', lambda conf: built.append(conf))
+
+        self.assertEqual(built, [])
+        with self.assertRaises(bundles.DupliciteConfException):
+            bundles.HostBundle('factory.host.org', 'Lazy')
+
+        conf = bundles.HostBundle.find('factory.host.org', 'Lazy')
+        self.assertEqual(built, [conf])
+        self.assertEqual(conf.packages.wget, system.Package('wget'))
+        self.assertIs(bundles.HostBundle.find('factory.host.org', 'Lazy'), conf)
+
+        confs = bundles.HostBundle.filter_conf(hostname='factory.host.org')
+        self.assertEqual(len(built), 2)
+        self.assertEqual(set(confs), set(built))
+
+    def test_conf_hosts_index(self):
+        bundles.HostBundle('index1.host.org', 'IndexA')
+        bundles.HostBundle('index2.host.org', 'IndexA')
+        bundles.HostBundle('index2.host.org', 'IndexB')
+        bundles.HostBundle.register_factory('index3.host.org', 'IndexA', lambda conf: None)
+
+        self.assertEqual(bundles.HostBundle.hosts('IndexA'), ['index1.host.org', 'index2.host.org', 'index3.host.org'])
+        self.assertEqual(bundles.HostBundle.hosts('IndexB'), ['index2.host.org'])
+        self.assertEqual(bundles.HostBundle.hosts('IndexC'), [])
+        self.assertEqual(bundles.HostBundle.conf_names('index2.host.org'), ['IndexA', 'IndexB'])
+        self.assertIn('IndexB', bundles.HostBundle.conf_names())
+
+        confs = bundles.HostBundle.filter_conf(conf_name='IndexA')
+        self.assertEqual([conf.hostname for conf in confs], bundles.HostBundle.hosts('IndexA'))
@@ -5,6 +5,7 @@ from nepta.core.model.network import NetperfNet4, NetperfNet6
 from nepta.core.model.network import IPv4Configuration, IPv6Configuration
 from nepta.core.model import network, schedule
 from nepta.core.distribution.conf_files import Route4File
+from nepta.core.model.slots import fields_dict
 
 
 class NetFormatterTest(TestCase):
@@ -133,3 +134,13 @@ class RouteTest(TestCase):
         self.assertIn(self.local_route1, self.local_int1._routes['Route4'])
         self.assertIn(self.local_route2, self.local_int2._routes['Route4'])
         self.assertNotIn(self.local_route2, self.local_int2._routes['Route6'])
+
+
+class TunnelTest(TestCase):
+    def test_custom_attributes(self):
+        tunnel = network.WireGuardTunnel(ia.ip_interface('10.0.0.1/24'), 'private')
+        tunnel.note = 'custom'
+        context = fields_dict(tunnel)
+        self.assertEqual(context['note'], 'custom')
+        self.assertEqual(context['private_key'], 'private')
+        self.assertNotIn('private_key', tunnel.__dict__)
@@ -1,3 +1,5 @@
+import pickle
+from copy import deepcopy
 from unittest import TestCase
 from uuid import UUID
 from ipaddress import IPv4Interface as IPv4
@@ -45,3 +47,46 @@ class ParallelPathListTest(TestCase):
             self.assertIsInstance(pl.dict(), dict)
             self.assertIsInstance(pl.hw_inventory, list)
             self.assertIsInstance(pl.sw_inventory, list)
+
+
+class PathIdentityTest(TestCase):
+    def setUp(self) -> None:
+        self.ip1 = IPv4('192.168.0.1/24')
+        self.ip2 = IPv4('192.168.0.2/24')
+
+    def test_path_id_is_stable(self):
+        path = Path(self.ip1, self.ip2, [Sw('ipv4'), Hw('mlx5')])
+        self.assertEqual(path.id, UUID('{}'.format(path.id)))
+        self.assertEqual(path.id, Path(self.ip1, self.ip2, [Hw('mlx5'), Sw('ipv4')]).id)
+        self.assertEqual(path.desc, 'Path 192.168.0.1/24 <=> 192.168.0.2/24, tags:[mlx5, ipv4]')
+
+    def test_path_invalidation(self):
+        path = Path(self.ip1, self.ip2, [Sw('ipv4')])
+        old_id = path.id
+        path.tags = [Sw('ipv6')]
+        self.assertNotEqual(path.id, old_id)
+        self.assertEqual(path.sw_inventory, [Sw('ipv6')])
+
+        path.mine_ip = IPv4('192.168.0.3/24')
+        self.assertIn('192.168.0.3/24', path.desc)
+
+    def test_path_list_aggregates(self):
+        path_list = PathList([Path(self.ip1, self.ip2, [Sw('ipv4'), Hw('mlx5')])])
+        old_id = path_list.id
+
+        path_list.append(Path(self.ip1, self.ip2, [Sw('ipv4'), Hw('ixgbe')]))
+        self.assertEqual(sorted(map(str, path_list.hw_inventory)), ['ixgbe', 'mlx5'])
+        self.assertEqual(path_list.sw_inventory, [Sw('ipv4')])
+
+        path_list[1].tags = [Sw('vlan')]
+        self.assertEqual(path_list.hw_inventory, [Hw('mlx5')])
+
+        path_list.pop()
+        self.assertEqual(path_list.id, old_id)
+
+    def test_custom_attributes(self):
+        path = Path(self.ip1, self.ip2, [Sw('ipv4')])
+        path.note = 'custom'
+        self.assertEqual(deepcopy(path).note, 'custom')
+        self.assertEqual(pickle.loads(pickle.dumps(path)).note, 'custom')
+        self.assertNotIn('_mine_ip', path.__dict__)
@@ -0,0 +1,53 @@
+from unittest import TestCase
+
+from nepta.core.model import bundles, system
+from nepta.core.model.selector import ComponentSelector, PathSelector, SelectorError
+
+
+class SelectorTest(TestCase):
+    def test_path_selector(self):
+        self.assertTrue(PathSelector('intf.eth*').matches('intf.eth0'))
+        self.assertFalse(PathSelector('intf.eth*').matches('intf.eth0.vlan'))
+        self.assertTrue(PathSelector('**.vlan').matches('intf.eth0.vlan'))
+        self.assertTrue(PathSelector('**.vlan').matches('vlan'))
+        self.assertTrue(PathSelector('intf.**').matches('intf.eth0.vlan'))
+        self.assertTrue(PathSelector('intf.eth[0-1]').matches('intf.eth1'))
+        self.assertFalse(PathSelector('intf.eth[!0-1]').matches('intf.eth1'))
+
+    def test_component_selector(self):
+        self.assertTrue(ComponentSelector('Package').matches('', system.Package('wget')))
+        self.assertFalse(ComponentSelector('Value').matches('', system.Package('wget')))
+        self.assertTrue(ComponentSelector('Value+').matches('', system.Package('wget')))
+        self.assertTrue(ComponentSelector('*Package[value~=^wg]').matches('', system.Package('wget')))
+        self.assertFalse(ComponentSelector('Package[value!=wget]').matches('', system.Package('wget')))
+        self.assertFalse(ComponentSelector('Package[name=wget]').matches('', system.Package('wget')))
+        self.assertTrue(ComponentSelector('packages.*:Package').matches('packages.wget', system.Package('wget')))
+        self.assertRaises(SelectorError, ComponentSelector, 'Package[value]')
+        self.assertRaises(SelectorError, PathSelector, 'intf..eth0')
+
+    def test_predicate_with_comma(self):
+        selector = ComponentSelector('Package[value~=^w{1,3}get$,value!=vim]')
+        self.assertEqual(len(selector.predicates), 2)
+        self.assertTrue(selector.matches('', system.Package('wget')))
+        self.assertFalse(selector.matches('', system.Package('wwwwget')))
+        self.assertTrue(ComponentSelector('Package[value~=^[,w]get$]').matches('', system.Package(',get')))
+        self.assertTrue(ComponentSelector('Package[value~=^a\\,b$]').matches('', system.Package('a,b')))
+
+    def test_prune(self):
+        b = bundles.Bundle()
+        b.packages.wget = system.Package('wget')
+        b.packages.add_multiple_components(system.Package('vim'), system.Package('iperf3'))
+        b.services.add_component(system.SystemService('sshd'))
+        b.intf.eth0.add_component(system.Package('eth0'))
+        b.intf.eth1.add_component(system.Package('eth1'))
+        b.intf.lo.add_component(system.Package('lo'))
+
+        selectors = [ComponentSelector('Package[value~=^(vim|wget)$]'), ComponentSelector('Service')]
+        b.prune(selectors, [PathSelector('intf.eth*')])
+
+        self.assertEqual(
+            b.get_all_components(), [system.Package('iperf3'), system.SystemService('sshd'), system.Package('lo')]
+        )
+        self.assertFalse(b.packages.has_node('wget'))
+        self.assertEqual(selectors[0].hits, 2)
+        self.assertEqual(selectors[1].hits, 0)
@@ -0,0 +1,81 @@
+import os
+import sys
+import time
+import tempfile
+from unittest import TestCase
+
+from nepta.core.model import bundles, system
+from nepta.core.model.snapshot import ConfigurationSnapshot
+from nepta.core.distribution.env import Environment
+
+CONF_MODULE = '''
+from nepta.core.model import bundles, system
+
+conf = bundles.HostBundle('snapshot.host.org', 'Snapshot')
+conf.packages.wget = system.Package('wget')
+'''
+
+
+class SnapshotTest(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.module_path = os.path.join(self.tmp.name, 'snapshot_conf.py')
+        with open(self.module_path, 'w') as f:
+            f.write(CONF_MODULE)
+        self.snapshot = ConfigurationSnapshot(os.path.join(self.tmp.name, 'cache'), [['snapshot_conf', self.tmp.name]])
+
+    def tearDown(self):
+        self.forget_configuration()
+        self.tmp.cleanup()
+
+    @staticmethod
+    def forget_configuration():
+        sys.modules.pop('snapshot_conf', None)
+        bundles.HostBundle._all_confs_register.pop('snapshot.host.org', None)
+        hosts = bundles.HostBundle._conf_hosts_register.get('Snapshot')
+        if hosts is not None:
+            hosts.pop('snapshot.host.org', None)
+            if not hosts:
+                del bundles.HostBundle._conf_hosts_register['Snapshot']
+
+    def test_snapshot_is_used(self):
+        self.assertFalse(self.snapshot.load())
+        self.snapshot.import_configuration()
+        self.assertIn('snapshot_conf', sys.modules)
+        self.assertTrue(os.path.isfile(self.snapshot.path))
+
+        self.forget_configuration()
+        self.snapshot.import_configuration()
+        self.assertNotIn('snapshot_conf', sys.modules)
+
+        conf = bundles.HostBundle.find('snapshot.host.org', 'Snapshot')
+        self.assertIsInstance(conf, bundles.HostBundle)
+        self.assertEqual(conf.packages.wget, system.Package('wget'))
+
+    def test_changed_module_invalidates_snapshot(self):
+        self.snapshot.import_configuration()
+        self.forget_configuration()
+
+        mtime = time.time() + 10
+        os.utime(self.module_path, (mtime, mtime))
+        self.assertFalse(self.snapshot.load())
+
+    def test_environment_is_part_of_key(self):
+        self.snapshot.import_configuration()
+        path = self.snapshot.path
+
+        fqdn = Environment.fqdn
+        Environment.fqdn = 'other.host.org'
+        try:
+            self.assertNotEqual(self.snapshot.path, path)
+        finally:
+            Environment.fqdn = fqdn
+
+        os.environ['NEPTA_SNAPSHOT_TEST'] = 'changed'
+        try:
+            self.assertNotEqual(self.snapshot.path, path)
+            self.forget_configuration()
+            self.assertFalse(self.snapshot.load())
+        finally:
+            del os.environ['NEPTA_SNAPSHOT_TEST']
+        self.assertEqual(self.snapshot.path, path)
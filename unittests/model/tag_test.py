@@ -0,0 +1,31 @@
+import copy
+import pickle
+from unittest import TestCase
+
+from nepta.core.model import system
+from nepta.core.model.tag import SoftwareInventoryTag as Sw, HardwareInventoryTag as Hw
+
+
+class TagTest(TestCase):
+    def test_interning(self):
+        self.assertIs(Sw('IPsec'), Sw('IPsec'))
+        self.assertIs(Sw('ESN', 'yes'), Sw('ESN', 'yes'))
+        self.assertIsNot(Sw('IPsec'), Hw('IPsec'))
+        self.assertIsNot(Sw('ReplayWindow', 1), Sw('ReplayWindow', True))
+        self.assertEqual(str(Sw('ReplayWindow', 1)), 'ReplayWindow-1')
+
+    def test_copy(self):
+        tag = Hw('gso', 'offload')
+        self.assertIs(copy.copy(tag), tag)
+        self.assertIs(copy.deepcopy([tag])[0], tag)
+        self.assertIs(pickle.loads(pickle.dumps(tag)), tag)
+
+    def test_slots(self):
+        self.assertFalse(hasattr(Sw('IPsec'), '__dict__'))
+        self.assertFalse(hasattr(system.Package('wget'), '__dict__'))
+        self.assertFalse(hasattr(system.SysctlVariable('net.core.rmem_max', 1), '__dict__'))
+
+    def test_frozen_slotted_copy(self):
+        pkg = system.SpecialPackage('kernel', [system.Repository('a', 'url')])
+        self.assertEqual(copy.deepcopy(pkg), pkg)
+        self.assertEqual(pickle.loads(pickle.dumps(pkg)), pkg)
@@ -0,0 +1,78 @@
+import math
+import statistics
+from unittest import TestCase
+
+from nepta.dataformat import Section
+
+from nepta.core.scenarios.generic.adaptive import AdaptiveRuns
+from nepta.core.scenarios.generic.scenario import StreamGeneric
+
+
+class FakePath:
+    id = 'path-id'
+    cpu_pinning = None
+
+
+class FakeStream(StreamGeneric):
+    def __init__(self, throughputs, **kwargs):
+        super().__init__([], 10, 5, [1024], None, 5201, 1, 0, **kwargs)
+        self.throughputs = iter(throughputs)
+
+    def run_instance(self, path, size):
+        throughput = next(self.throughputs)
+        if throughput is None:
+            return Section('failed-test')
+        section = Section('run')
+        section.subsections.append(Section('item', key='throughput', value=str(throughput)))
+        return section
+
+
+class AdaptiveRunsTest(TestCase):
+    def test_half_width(self):
+        runs = AdaptiveRuns(confidence=0.95)
+        values = [100.0, 102.0, 98.0]
+        expected = 100 * 4.303 * statistics.stdev(values) / math.sqrt(3) / 100
+        self.assertAlmostEqual(runs.half_width(values), expected)
+        self.assertEqual(runs.half_width([100.0]), math.inf)
+        self.assertEqual(runs.t_value(100), AdaptiveRuns.T_TABLE[0.95][-1])
+
+    def test_is_done(self):
+        runs = AdaptiveRuns(precision=1, min_runs=3, max_runs=5)
+        self.assertFalse(runs.is_done([100.0, 100.0], 2))
+        self.assertTrue(runs.is_done([100.0, 100.1, 99.9], 3))
+        self.assertFalse(runs.is_done([100.0, 120.0, 80.0], 3))
+        self.assertTrue(runs.is_done([100.0, 120.0, 80.0], 5))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            AdaptiveRuns(confidence=0.5)
+        with self.assertRaises(ValueError):
+            AdaptiveRuns(min_runs=5, max_runs=3)
+
+
+class AdaptiveStreamTest(TestCase):
+    @staticmethod
+    def settings(test_case):
+        items = test_case.subsections.filter('test_settings')[0].subsections
+        return {item.params['key']: item.params['value'] for item in items}
+
+    def run_test_case(self, throughputs, adaptive_runs=None):
+        test_case = FakeStream(throughputs, adaptive_runs=adaptive_runs).run_msg_size(FakePath(), 1024)
+        return len(test_case.subsections.filter('runs')[0].subsections), self.settings(test_case)
+
+    def test_fixed_runs(self):
+        runs, settings = self.run_test_case([100] * 5)
+        self.assertEqual(runs, 5)
+        self.assertNotIn('achieved_precision', settings)
+
+    def test_stable(self):
+        runs, settings = self.run_test_case([100, 100.5, 99.5, 100], AdaptiveRuns(precision=2, max_runs=10))
+        self.assertEqual(runs, 3)
+        self.assertEqual(settings['runs'], 3)
+        self.assertLessEqual(settings['achieved_precision'], 2)
+
+    def test_noisy(self):
+        runs, settings = self.run_test_case([100, 150, 50, 120, None, 80, 90], AdaptiveRuns(precision=2, max_runs=6))
+        self.assertEqual(runs, 6)
+        self.assertGreater(settings['achieved_precision'], 2)
+        self.assertEqual((settings['confidence'], settings['target_precision']), (0.95, 2))
@@ -10,8 +10,7 @@ class IRQBalanceScenarioTest(TestCase):
     def setUp(self):
         example_str = open(os.path.join(_LOCAL_DIR, 'example_interrupt_out.txt'), 'r').read()
         self.scenario = IRQBalanceCheck([])
-        self.scenario.interrupt_cmd.run = lambda: None
-        self.scenario.interrupt_cmd.watch_output = lambda: (example_str, 0)
+        self.scenario.read_interrupts = lambda: example_str
 
     def test_parser(self):
         table = self.scenario.get_parsed_interrupts(True)
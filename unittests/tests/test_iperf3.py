@@ -2,7 +2,9 @@ from unittest import TestCase
 import json
 import os
 
-from nepta.core.tests.iperf3 import Iperf3TCPTestResult, Iperf3Test
+import numpy as np
+
+from nepta.core.tests.iperf3 import Iperf3TCPTestResult, Iperf3Test, Iperf3ResultMatrix
 
 
 class Iperf3TestResultTest(TestCase):
@@ -70,3 +72,46 @@ class Iperf3TestResultTest(TestCase):
             result['throughput'],
             100,
         )
+
+
+class Iperf3ResultMatrixTest(TestCase):
+    MPSTAT = {
+        'sys': 1.0,
+        'usr': 2.0,
+        'irq': 0.5,
+        'soft': 0.5,
+        'nice': 0,
+        'iowait': 0,
+        'steal': 0,
+        'guest': 0,
+        'gnice': 0,
+    }
+
+    def setUp(self) -> None:
+        self.json_data = json.load(open(Iperf3TestResultTest.JSON_FILENAME))
+        self.results = [Iperf3TCPTestResult.from_json(self.json_data) for _ in range(4)]
+        for i, result in enumerate(self.results):
+            result['throughput'] = i + 1
+        self.matrix = Iperf3ResultMatrix.from_results(self.results)
+
+    def test_columns(self):
+        self.assertEqual(self.matrix.columns, ['throughput', 'local_cpu', 'remote_cpu'])
+        self.assertEqual(self.matrix.array.shape, (4, 3))
+        self.assertEqual(self.matrix['throughput'].tolist(), [1, 2, 3, 4])
+
+    def test_reductions(self):
+        self.assertEqual(self.matrix.total()['throughput'], sum(self.results)['throughput'])
+        self.assertEqual(self.matrix.mean()['throughput'], 2.5)
+        up, down = self.matrix.group_totals([0, 1, 0, 1])
+        self.assertEqual((up['throughput'], down['throughput']), (4, 6))
+        self.assertIsInstance(up, Iperf3TCPTestResult)
+
+    def test_mpstat_does_not_change_class(self):
+        total = self.matrix.total()
+        total._mpstat_from_dict(dict(self.MPSTAT, idle=96), dict(self.MPSTAT, idle=90))
+
+        self.assertEqual(total['mpstat_remote_idle'], 90)
+        self.assertEqual(len(dict(total)), 3 + 20)
+        self.assertNotIn('mpstat_local_sys', Iperf3TCPTestResult._DIMENSIONS)
+        self.assertEqual(len(dict(Iperf3TCPTestResult.from_json(self.json_data))), 3)
+        np.testing.assert_array_equal(self.matrix.total()._array, total._array[:3])
@@ -0,0 +1,69 @@
+from unittest import TestCase
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from nepta.core.tests.iperf3 import Iperf3Test, Iperf3TCPTestResult
+from nepta.core.tests.iperf3_intervals import Iperf3Intervals, Iperf3StreamCapture
+
+
+class Iperf3IntervalsTest(TestCase):
+    JSON_FILENAME = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'sample_json.json')
+
+    def setUp(self) -> None:
+        with open(self.JSON_FILENAME) as f:
+            self.json_data = json.load(f)
+        self.stream_output = b''.join(
+            json.dumps({'event': name, 'data': data}).encode() + b'\n'
+            for name, data in [('start', self.json_data['start'])]
+            + [('interval', interval) for interval in self.json_data['intervals']]
+            + [('end', self.json_data['end'])]
+        )
+
+    def test_from_json(self):
+        intervals = Iperf3Intervals.from_json(self.json_data['intervals'])
+        reports = self.json_data['intervals']
+        streams = intervals.streams()
+
+        self.assertEqual(len(intervals), len(reports))
+        self.assertEqual(streams.shape, (len(reports[0]['streams']), len(reports), len(Iperf3Intervals.FIELDS)))
+        np.testing.assert_allclose(intervals['bits_per_second'], [r['sum']['bits_per_second'] for r in reports])
+        np.testing.assert_allclose(intervals['snd_cwnd'], streams[:, :, 4].sum(axis=0))
+        np.testing.assert_allclose(intervals['rtt'], intervals.streams('rtt').mean(axis=0))
+
+    def test_missing_values(self):
+        intervals = Iperf3Intervals.from_json([{'streams': [{'socket': 5, 'bits_per_second': 1.0}], 'sum': {}}])
+        self.assertEqual(intervals.streams('bits_per_second').tolist(), [[1.0]])
+        self.assertTrue(np.isnan(intervals['rtt'][0]))
+
+    def test_stream_capture(self):
+        capture = Iperf3StreamCapture()
+        for i in range(0, len(self.stream_output), 1000):
+            capture.write(self.stream_output[i : i + 1000])
+        capture.write(b'iperf3: interrupt - the client has terminated\n')
+
+        expected = Iperf3Intervals.from_json(self.json_data['intervals'])
+        np.testing.assert_array_equal(capture.intervals.aggregate, expected.aggregate)
+        np.testing.assert_array_equal(capture.intervals.streams(), expected.streams())
+        self.assertEqual(capture.text, ['iperf3: interrupt - the client has terminated'])
+        self.assertEqual(json.loads(capture.getvalue())['end'], self.json_data['end'])
+
+    def test_iperf3_json_stream(self):
+        with tempfile.NamedTemporaryFile() as output:
+            output.write(self.stream_output)
+            output.flush()
+
+            class CatIperf3(Iperf3Test):
+                def _make_cmd(self):
+                    return f'cat {output.name}'
+
+            self.assertIn('--json-stream', Iperf3Test(client='localhost', json_stream=True)._make_cmd())
+            test = CatIperf3(client='localhost', json_stream=True).run()
+            intervals = test.get_intervals()
+
+        self.assertEqual(len(intervals), len(self.json_data['intervals']))
+        result = test.get_result(Iperf3TCPTestResult.ThroughputFormat.BPS)
+        self.assertIsInstance(result, Iperf3TCPTestResult)
+        self.assertEqual(result['throughput'], Iperf3TCPTestResult.from_json(self.json_data)['throughput'])
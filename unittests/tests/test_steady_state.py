@@ -0,0 +1,61 @@
+from unittest import TestCase
+import json
+import os
+
+import numpy as np
+
+from nepta.core.scenarios.iperf3.generic import GenericIPerf3Stream
+from nepta.core.tests.iperf3 import Iperf3Test
+from nepta.core.tests.iperf3_intervals import Iperf3Intervals
+from nepta.core.tests.steady_state import SteadyState
+
+
+class SteadyStateTest(TestCase):
+    JSON_FILENAME = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'sample_json.json')
+
+    def setUp(self) -> None:
+        # slow start followed by stable throughput with small noise and drop at the end
+        rng = np.random.default_rng(0)
+        self.values = np.concatenate([[1, 3, 6, 8], 10 + rng.normal(0, 0.1, 20), [4]])
+
+    def test_rolling_cv(self):
+        values = np.array([1.0, 1.0, 2.0, 2.0])
+        cv = SteadyState.rolling_cv(values, 2)
+        np.testing.assert_allclose(cv, [0, np.std([1, 2]) / 1.5, 0])
+
+    def test_detect(self):
+        result = SteadyState(cooldown=1).detect(self.values)
+        self.assertTrue(result.detected)
+        self.assertEqual((result.first, result.last), (4, 24))
+        self.assertAlmostEqual(result.mean, 10, places=1)
+        self.assertLess(result.cv, 0.05)
+        self.assertEqual((result.start, result.end), (4.0, 24.0))
+
+    def test_warmup(self):
+        result = SteadyState(warmup=6, cooldown=1).detect(self.values)
+        self.assertEqual(result.first, 6)
+
+    def test_not_detected(self):
+        values = np.tile([1.0, 10.0], 10)
+        result = SteadyState(warmup=2, cooldown=2).detect(values)
+        self.assertFalse(result.detected)
+        self.assertEqual((result.first, result.last), (2, 18))
+        self.assertEqual(result.mean, 5.5)
+
+    def test_analyze(self):
+        with open(self.JSON_FILENAME) as f:
+            intervals = Iperf3Intervals.from_json(json.load(f)['intervals'])
+        result = SteadyState(warmup=1, window=3, max_cv=1).analyze(intervals)
+        self.assertTrue(result.detected)
+        self.assertEqual(result.start, intervals['start'][result.first])
+
+    def test_scenario_results(self):
+        test, other = Iperf3Test(), Iperf3Test()
+        with open(self.JSON_FILENAME) as f:
+            test._output = other._output = f.read()
+        scenario = GenericIPerf3Stream(steady_state=SteadyState(window=3, max_cv=1))
+        raw = scenario.parse_steady_state([test])
+        doubled = scenario.parse_steady_state([test, other])
+
+        self.assertEqual(raw['steady_detected'], True)
+        self.assertAlmostEqual(float(doubled['steady_throughput']), 2 * float(raw['steady_throughput']), places=1)